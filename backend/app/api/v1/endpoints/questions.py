@@ -2,6 +2,7 @@
 Question generation API endpoints
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 
 from app.schemas.question import (
@@ -10,6 +11,7 @@ from app.schemas.question import (
 )
 from app.services.question_generator import question_generator
 from app.services.scraping.orchestrator import scraping_orchestrator
+from app.services.post_store import post_store
 
 router = APIRouter()
 
@@ -22,8 +24,10 @@ async def generate_questions(request: QuestionGenerateRequest):
     Uses OpenAI to generate binary prediction questions based on
     recent scraped content.
     """
-    # Get scraped posts
+    # Get scraped posts (latest run, else most recent history from the post store)
     posts = scraping_orchestrator.get_posts()
+    if not posts and request.use_recent_posts:
+        posts, _ = await asyncio.to_thread(post_store.query, limit=50)
     
     if not posts and request.use_recent_posts:
         raise HTTPException(
@@ -2,16 +2,32 @@
 Scraping API endpoints
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Optional, List
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse, JSONResponse
+from typing import Optional, List, Literal
 
+from app.core.config import settings
 from app.schemas.scraping import (
     ScrapeRequest,
     ScrapeProgress,
+    ScrapeJobInfo,
+    BackfillRequest,
+    BackfillInfo,
     SourceType,
 )
 from app.schemas.common import BaseResponse
-from app.services.scraping.orchestrator import scraping_orchestrator
+from app.services.scraping.orchestrator import ScrapeRun, scraping_orchestrator
+from app.services.scraping.jobs import scrape_jobs
+from app.services.scraping.scheduler import ingestion_scheduler
+from app.services.scraping.backfill import backfill_manager
+from app.services.post_store import post_store
+from app.services.search_index import search_index
+from app.services.corpus import corpus_exporter
+from app.services.polymarket_mirror import polymarket_mirror
 
 router = APIRouter()
 
@@ -21,78 +37,404 @@ async def scrape_sync(request: ScrapeRequest):
     """
     Run scraping synchronously and return posts.
     Use this when the client needs posts in a single request (e.g. frontend scrape-all).
+    
+    Posts are collected from the scrape's events rather than from the run,
+    whose in-memory posts are bounded by retention, so the response always
+    carries all `total` of them.
     """
-    result = await scraping_orchestrator.scrape_all(
+    result = {}
+    # Post id -> JSON-ready post, in emission order; representatives are replaced as duplicates fold in
+    posts_data = {}
+    async for event in scraping_orchestrator.stream_all(
         request.sources,
         request.days_back,
         request.max_items_per_source,
-    )
-    # Include posts in response for sync usage
-    posts_data = [p.model_dump(mode="json") for p in scraping_orchestrator.get_posts()]
-    return {
+        request.incremental,
+        run=ScrapeRun(),
+    ):
+        if event["type"] == "posts":
+            posts_data.update((p.id, p.to_dict()) for p in event["posts"])
+        elif event["type"] == "duplicates":
+            posts_data.update((p.id, p.to_dict()) for p in event["posts"] if p.id in posts_data)
+        elif event["type"] == "done":
+            result = event
+    
+    # Already JSON-ready, so skip re-encoding
+    return JSONResponse({
         "success": result.get("success", True),
         "total": result.get("total", 0),
+        "duplicates": result.get("duplicates", 0),
         "stats": result.get("stats", {}),
         "errors": result.get("errors"),
-        "posts": posts_data,
-    }
+        "posts": list(posts_data.values()),
+    })
 
 
-@router.post("/start")
-async def start_scraping(
+@router.post("/scrape/stream")
+async def scrape_stream(
     request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
 ):
     """
-    Start scraping from specified sources
+    Run scraping and stream posts to the client as each scraper yields them.
     
-    This endpoint initiates scraping in the background and returns immediately.
-    Use GET /progress to check status.
+    Emits one {"type": "posts"} event per batch, a {"type": "duplicates"} event
+    with the updated representatives when a batch folds into earlier posts,
+    one {"type": "source_done"} event per finished source, and ends with a
+    {"type": "done"} trailer that carries total, duplicates, stats and errors. format=ndjson writes one JSON object per
+    line; format=sse writes Server-Sent Events.
     """
-    # Start scraping in background
-    background_tasks.add_task(
-        scraping_orchestrator.scrape_all,
-        request.sources,
-        request.days_back,
-        request.max_items_per_source,
+    async def _events():
+        async for event in scraping_orchestrator.stream_all(
+            request.sources,
+            request.days_back,
+            request.max_items_per_source,
+            request.incremental,
+        ):
+            if event["type"] in ("posts", "duplicates"):
+                event = {**event, "posts": [p.to_dict() for p in event["posts"]]}
+            line = json.dumps(event)
+            if stream_format == "sse":
+                yield f"event: {event['type']}\ndata: {line}\n\n"
+            else:
+                yield line + "\n"
+    
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@router.post("/start")
+async def start_scraping(request: ScrapeRequest):
+    """
+    Start scraping from specified sources
+    
+    This endpoint submits a scrape job and returns immediately.
+    Use GET /jobs/{job_id} (or GET /progress for the latest scrape) to check status.
+    """
+    job = scrape_jobs.submit(request)
     
     return BaseResponse(
         success=True,
         message="Scraping started",
-        data={"status": "initiated"},
+        data={"status": "initiated", "job_id": job.id},
     )
 
 
 @router.get("/progress")
 async def get_scraping_progress() -> ScrapeProgress:
-    """Get current scraping progress"""
+    """Get progress of the most recently started scrape"""
     return scraping_orchestrator.get_progress()
 
 
+@router.post("/jobs")
+async def submit_scrape_job(request: ScrapeRequest) -> ScrapeJobInfo:
+    """
+    Submit a scrape job
+    
+    Jobs run concurrently up to SCRAPE_MAX_CONCURRENT_JOBS (later ones wait
+    as "queued"), each with its own progress and posts.
+    """
+    return scrape_jobs.submit(request).info()
+
+
+@router.get("/jobs")
+async def list_scrape_jobs() -> List[ScrapeJobInfo]:
+    """Running, queued and recently finished scrape jobs, newest first"""
+    return [job.info() for job in scrape_jobs.list_jobs()]
+
+
+@router.get("/jobs/{job_id}")
+async def get_scrape_job(job_id: str) -> ScrapeJobInfo:
+    """Status and progress of a scrape job"""
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job.info()
+
+
+@router.get("/jobs/{job_id}/posts")
+async def get_scrape_job_posts(
+    job_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Posts gathered by a scrape job (so far, while it is still running)
+    
+    Only posts still held in memory are listed; evicted posts (see
+    RETENTION_POSTS_*) are available from GET /posts.
+    
+    Args:
+        limit: Maximum number of posts to return
+        offset: Number of posts to skip
+    """
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    
+    posts = job.posts[offset:offset + limit]
+    return JSONResponse({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "in_memory": len(job.posts),
+        "evicted": job.posts.evicted,
+        "posts": [p.to_dict() for p in posts],
+    })
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_scrape_job(job_id: str) -> ScrapeJobInfo:
+    """Cancel a queued or running scrape job; posts gathered so far are kept"""
+    job = await scrape_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job.info()
+
+
+@router.post("/backfill")
+async def submit_backfill(request: BackfillRequest) -> BackfillInfo:
+    """
+    Backfill post history over a date range
+    
+    Twitter is fetched in day slices per account and Telegram channels are
+    walked back page by page, on parallel workers within each provider's
+    rate limits. Finished slices are checkpointed: submitting the same
+    range again (or POST /backfill/{id}/resume) continues where it stopped.
+    """
+    try:
+        return backfill_manager.submit(request).info()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/backfill")
+async def list_backfills() -> List[BackfillInfo]:
+    """Backfills, newest first"""
+    return [backfill.info() for backfill in backfill_manager.list_backfills()]
+
+
+@router.get("/backfill/{backfill_id}")
+async def get_backfill(backfill_id: str) -> BackfillInfo:
+    """Status and per-source progress of a backfill"""
+    backfill = backfill_manager.get(backfill_id)
+    if backfill is None:
+        raise HTTPException(status_code=404, detail="Backfill not found")
+    return backfill.info()
+
+
+@router.post("/backfill/{backfill_id}/resume")
+async def resume_backfill(backfill_id: str) -> BackfillInfo:
+    """Continue a cancelled, incomplete or failed backfill from its checkpoints"""
+    backfill = backfill_manager.resume(backfill_id)
+    if backfill is None:
+        raise HTTPException(status_code=404, detail="Backfill not found")
+    return backfill.info()
+
+
+@router.post("/backfill/{backfill_id}/cancel")
+async def cancel_backfill(backfill_id: str) -> BackfillInfo:
+    """Stop a backfill; finished slices stay checkpointed for a later resume"""
+    backfill = await backfill_manager.cancel(backfill_id)
+    if backfill is None:
+        raise HTTPException(status_code=404, detail="Backfill not found")
+    return backfill.info()
+
+
+@router.get("/corpus")
+async def get_corpus_stats():
+    """Parquet corpus on disk (files, bytes and days per source) and the last export"""
+    return {
+        "success": True,
+        **await asyncio.to_thread(corpus_exporter.stats),
+    }
+
+
+@router.post("/corpus/export")
+async def export_corpus():
+    """Append posts written since the last export to the Parquet corpus now"""
+    if not settings.CORPUS_EXPORT_ENABLED:
+        raise HTTPException(status_code=503, detail="Corpus export is disabled")
+    try:
+        result = await asyncio.to_thread(corpus_exporter.export)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "success": True,
+        **result,
+    }
+
+
+@router.get("/ingest")
+async def get_ingestion_status():
+    """
+    Continuous ingestion status: every polled source with its adaptive
+    interval, estimated publishing rate and next poll
+    """
+    return {
+        "success": True,
+        **ingestion_scheduler.get_status(),
+    }
+
+
+@router.get("/rss/stats")
+async def get_rss_feed_stats():
+    """Per-feed fetch latency, size and bytes saved by conditional requests"""
+    return {
+        "success": True,
+        "feeds": scraping_orchestrator.rss_scraper.get_feed_stats(),
+    }
+
+
+@router.get("/polymarket/markets")
+async def get_polymarket_markets(
+    limit: int = Query(50, ge=1, le=1000),
+    category: Optional[str] = None,
+    slug: Optional[str] = None,
+    ending_within_hours: Optional[float] = Query(None, gt=0),
+    min_volume: Optional[float] = None,
+    include_closed: bool = False,
+    order_by: Literal["volume", "end_date"] = "volume",
+):
+    """
+    Query the local Polymarket catalog mirror (no API calls)
+
+    Args:
+        limit: Maximum number of markets to return
+        category: Filter by category
+        slug: Filter by market slug
+        ending_within_hours: Only markets ending between now and now + N hours
+        min_volume: Only markets with at least this much volume
+        include_closed: Include closed / inactive markets
+        order_by: "volume" (highest first) or "end_date" (soonest first)
+    """
+    now = datetime.utcnow()
+    markets = await asyncio.to_thread(
+        polymarket_mirror.query,
+        category=category,
+        slug=slug,
+        ending_after=now if ending_within_hours else None,
+        ending_before=now + timedelta(hours=ending_within_hours) if ending_within_hours else None,
+        min_volume=min_volume,
+        active_only=not include_closed,
+        order_by=order_by,
+        limit=limit,
+    )
+    return {
+        "success": True,
+        "total": len(markets),
+        "markets": markets,
+        "mirror": await asyncio.to_thread(polymarket_mirror.stats),
+    }
+
+
+@router.post("/polymarket/sync")
+async def sync_polymarket_markets():
+    """Refresh the catalog mirror with markets updated since the last sync"""
+    changed = await polymarket_mirror.sync()
+    return {
+        "success": True,
+        "changed": changed,
+        "mirror": await asyncio.to_thread(polymarket_mirror.stats),
+    }
+
+
 @router.get("/posts")
 async def get_scraped_posts(
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     source: Optional[SourceType] = None,
+    source_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
 ):
     """
-    Get scraped posts
+    Get scraped posts from the persistent post store, newest first
 
     Args:
         limit: Maximum number of posts to return
         source: Filter by source type
+        source_id: Filter by account / feed / topic
+        since: Only posts dated at or after this time
+        until: Only posts dated before this time
+        cursor: next_cursor from the previous page
     """
-    posts = scraping_orchestrator.get_posts()
+    try:
+        posts, next_cursor = await asyncio.to_thread(
+            post_store.query,
+            source=source,
+            source_id=source_id,
+            since=since,
+            until=until,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Filter by source if specified
-    if source:
-        posts = [p for p in posts if p.source == source]
+    return JSONResponse({
+        "success": True,
+        "total": len(posts),
+        "posts": [p.to_dict() for p in posts],
+        "next_cursor": next_cursor,
+    })
 
-    # Limit results
-    posts = posts[:limit]
 
-    return {
+@router.get("/search")
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=500),
+    source: Optional[SourceType] = None,
+    source_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+):
+    """
+    Full-text search over recent posts (last SEARCH_INDEX_DAYS days), best match first
+
+    Posts are ranked with BM25 over title and text; any query term may match.
+
+    Args:
+        q: Search query
+        source: Filter by source type
+        source_id: Filter by account / feed / topic
+        since: Only posts dated at or after this time
+        until: Only posts dated before this time
+        limit: Page size
+        offset: Number of results to skip
+    """
+    if not settings.SEARCH_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="Search index is disabled")
+
+    started = time.perf_counter()
+    hits, total = search_index.search(
+        q,
+        source=source,
+        source_id=source_id,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset,
+    )
+    took_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    posts = await asyncio.to_thread(post_store.get_many, [post_id for post_id, _ in hits])
+    results = [
+        {**posts[post_id].to_dict(), "score": round(score, 4)}
+        for post_id, score in hits
+        if post_id in posts
+    ]
+    return JSONResponse({
         "success": True,
-        "total": len(posts),
-        "posts": posts,
-    }
+        "query": q,
+        "total": total,
+        "offset": offset,
+        "took_ms": took_ms,
+        "posts": results,
+    })
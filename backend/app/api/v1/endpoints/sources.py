@@ -1,10 +1,20 @@
 """
-Sources API: CRUD for Telegram channels, Twitter accounts, RSS feeds, Polymarket topics.
+Sources API: CRUD and bulk NDJSON/CSV import/export for Telegram channels, Twitter accounts,
+RSS feeds and Polymarket topics.
 All source config is stored in the FastAPI backend (data/sources.json).
 """
 
-from fastapi import APIRouter, HTTPException
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Tuple
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.core.config import settings
 from app.schemas.sources import (
     TelegramChannelOut,
     TelegramChannelAdd,
@@ -29,20 +39,20 @@ async def list_telegram_channels():
 @router.post("/telegram", response_model=dict)
 async def add_telegram_channel(body: TelegramChannelAdd):
     try:
-        return sources_store.add_telegram_channel(body.url)
+        return await sources_store.apply(sources_store.add_telegram_channel, body.url)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/telegram/{channel_id}")
 async def delete_telegram_channel(channel_id: str):
-    sources_store.delete_telegram_channel(channel_id)
+    await sources_store.apply(sources_store.delete_telegram_channel, channel_id)
     return {"success": True}
 
 
 @router.patch("/telegram/{channel_id}/toggle")
 async def toggle_telegram_channel(channel_id: str):
-    ch = sources_store.toggle_telegram_channel_enabled(channel_id)
+    ch = await sources_store.apply(sources_store.toggle_telegram_channel_enabled, channel_id)
     if not ch:
         raise HTTPException(status_code=404, detail="Channel not found")
     return ch
@@ -57,7 +67,8 @@ async def list_twitter_accounts():
 @router.post("/twitter", response_model=dict)
 async def add_twitter_account(body: TwitterAccountAdd):
     try:
-        return sources_store.add_twitter_account(
+        return await sources_store.apply(
+            sources_store.add_twitter_account,
             username=body.username,
             display_name=body.display_name,
             account_type=body.account_type,
@@ -70,13 +81,13 @@ async def add_twitter_account(body: TwitterAccountAdd):
 
 @router.delete("/twitter/{account_id}")
 async def delete_twitter_account(account_id: str):
-    sources_store.delete_twitter_account(account_id)
+    await sources_store.apply(sources_store.delete_twitter_account, account_id)
     return {"success": True}
 
 
 @router.patch("/twitter/{account_id}/toggle")
 async def toggle_twitter_account(account_id: str):
-    acc = sources_store.toggle_twitter_account_enabled(account_id)
+    acc = await sources_store.apply(sources_store.toggle_twitter_account_enabled, account_id)
     if not acc:
         raise HTTPException(status_code=404, detail="Account not found")
     return acc
@@ -91,7 +102,8 @@ async def list_rss_feeds():
 @router.post("/rss", response_model=dict)
 async def add_rss_feed(body: RSSFeedAdd):
     try:
-        return sources_store.add_rss_feed(
+        return await sources_store.apply(
+            sources_store.add_rss_feed,
             name=body.name,
             url=body.url,
             category=body.category,
@@ -103,13 +115,13 @@ async def add_rss_feed(body: RSSFeedAdd):
 
 @router.delete("/rss/{feed_id}")
 async def delete_rss_feed(feed_id: str):
-    sources_store.delete_rss_feed(feed_id)
+    await sources_store.apply(sources_store.delete_rss_feed, feed_id)
     return {"success": True}
 
 
 @router.patch("/rss/{feed_id}/toggle")
 async def toggle_rss_feed(feed_id: str):
-    f = sources_store.toggle_rss_feed_enabled(feed_id)
+    f = await sources_store.apply(sources_store.toggle_rss_feed_enabled, feed_id)
     if not f:
         raise HTTPException(status_code=404, detail="Feed not found")
     return f
@@ -123,7 +135,8 @@ async def list_polymarket_topics():
 
 @router.post("/polymarket", response_model=dict)
 async def add_polymarket_topic(body: PolymarketTopicAdd):
-    return sources_store.add_polymarket_topic(
+    return await sources_store.apply(
+        sources_store.add_polymarket_topic,
         name=body.name,
         keywords=body.keywords,
         category=body.category,
@@ -133,13 +146,232 @@ async def add_polymarket_topic(body: PolymarketTopicAdd):
 
 @router.delete("/polymarket/{topic_id}")
 async def delete_polymarket_topic(topic_id: str):
-    sources_store.delete_polymarket_topic(topic_id)
+    await sources_store.apply(sources_store.delete_polymarket_topic, topic_id)
     return {"success": True}
 
 
 @router.patch("/polymarket/{topic_id}/toggle")
 async def toggle_polymarket_topic(topic_id: str):
-    t = sources_store.toggle_polymarket_topic_enabled(topic_id)
+    t = await sources_store.apply(sources_store.toggle_polymarket_topic_enabled, topic_id)
     if not t:
         raise HTTPException(status_code=404, detail="Topic not found")
     return t
+
+
+# ----- Bulk import / export -----
+# Path name -> (store kind, row schema, export schema)
+BULK_KINDS = {
+    "telegram": ("telegram_channels", TelegramChannelAdd, TelegramChannelOut),
+    "twitter": ("twitter_accounts", TwitterAccountAdd, TwitterAccountOut),
+    "rss": ("rss_feeds", RSSFeedAdd, RSSFeedOut),
+    "polymarket": ("polymarket_topics", PolymarketTopicAdd, PolymarketTopicOut),
+}
+
+BulkKind = Literal["telegram", "twitter", "rss", "polymarket"]
+BulkFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+
+def _build_source(kind: str, body: Any, enabled: bool) -> Dict[str, Any]:
+    if kind == "telegram":
+        return sources_store.new_telegram_channel(body.url, enabled)
+    if kind == "twitter":
+        return sources_store.new_twitter_account(
+            body.username, body.display_name, body.account_type, body.user_id, enabled
+        )
+    if kind == "rss":
+        return sources_store.new_rss_feed(body.name, body.url, body.category, enabled)
+    return sources_store.new_polymarket_topic(body.name, body.keywords, body.category, enabled)
+
+
+class UploadTooLarge(Exception):
+    """The import body went past SOURCES_IMPORT_MAX_BYTES"""
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body line by line as it arrives, up to SOURCES_IMPORT_MAX_BYTES"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > settings.SOURCES_IMPORT_MAX_BYTES:
+            raise UploadTooLarge()
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _from_csv(header: List[str], values: List[str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for name, value in zip(header, values):
+        value = value.strip()
+        if value == "":
+            continue  # Empty cells fall back to the schema defaults
+        if name == "keywords":
+            record[name] = [k.strip() for k in value.split(";") if k.strip()]
+        else:
+            record[name] = value
+    return record
+
+
+async def _iter_records(request: Request, fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row number, record dict or error message) from an NDJSON or CSV body
+
+    CSV needs a header row; list cells (keywords) are separated by ";".
+    Quoted CSV fields may span lines.
+    """
+    row = 0
+    header: Optional[List[str]] = None
+    buffered = ""
+    async for line in _iter_lines(request):
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row, f"Invalid JSON: {e}"
+                continue
+            yield row, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+
+        # CSV: a record is complete once its quotes are balanced
+        buffered = f"{buffered}\n{line}" if buffered else line
+        if buffered.count('"') % 2:
+            continue
+        text, buffered = buffered, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row += 1
+        yield row, _from_csv(header, values)
+
+    if buffered:
+        yield row + 1, "Unterminated quoted field"
+
+
+@router.post("/{kind}/import")
+async def import_sources(
+    kind: BulkKind,
+    request: Request,
+    fmt: BulkFormat = Query("ndjson", alias="format"),
+):
+    """
+    Bulk-add sources from an NDJSON or CSV upload (streamed, stored in batches)
+
+    Rows are validated with the same schemas as the single-add endpoints and
+    deduplicated against the store and the rest of the upload. The response
+    counts every row as added, duplicate or invalid, and lists the outcome of
+    the first SOURCES_IMPORT_MAX_REPORT_ROWS rows.
+    """
+    store_kind, schema, _ = BULK_KINDS[kind]
+    max_bytes = settings.SOURCES_IMPORT_MAX_BYTES
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload larger than {max_bytes} bytes")
+
+    counts = {status: 0 for status in ("added", "duplicate", "invalid")}
+    report: List[Dict[str, Any]] = []
+    batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+    def record(entry: Dict[str, Any]) -> None:
+        if len(report) < settings.SOURCES_IMPORT_MAX_REPORT_ROWS:
+            report.append(entry)
+
+    async def store_batch() -> None:
+        added = await sources_store.apply(sources_store.import_sources, store_kind, [item for _, item in batch])
+        for (entry, _), is_new in zip(batch, added):
+            if not is_new:
+                entry["status"] = "duplicate"
+                del entry["id"]
+            counts[entry["status"]] += 1
+        batch.clear()
+
+    try:
+        async for row, raw in _iter_records(request, fmt):
+            if isinstance(raw, str):
+                counts["invalid"] += 1
+                record({"row": row, "status": "invalid", "error": raw})
+                continue
+            try:
+                body = schema.model_validate(raw)
+                enabled = str(raw.get("enabled", True)).strip().lower() in TRUE_VALUES
+                item = _build_source(kind, body, enabled)
+            except (ValidationError, ValueError) as e:
+                error = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                ) if isinstance(e, ValidationError) else str(e)
+                counts["invalid"] += 1
+                record({"row": row, "status": "invalid", "error": error})
+                continue
+            entry = {"row": row, "status": "added", "id": item["id"]}
+            record(entry)
+            batch.append((entry, item))
+            if len(batch) >= settings.SOURCES_IMPORT_BATCH_SIZE:
+                await store_batch()
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload larger than {max_bytes} bytes; stopped after adding {counts['added']} sources",
+        )
+
+    if batch:
+        await store_batch()
+
+    total = sum(counts.values())
+    return {
+        "success": True,
+        "total": total,
+        **counts,
+        "rows": report,
+        "rows_truncated": len(report) < total,
+    }
+
+
+@router.get("/{kind}/export")
+async def export_sources(
+    kind: BulkKind,
+    fmt: BulkFormat = Query("ndjson", alias="format"),
+):
+    """Download all sources of a kind as NDJSON or CSV (re-importable)"""
+    store_kind, _, schema = BULK_KINDS[kind]
+    items = sources_store.list_sources(store_kind)
+    columns = list(schema.model_fields)
+
+    def rows() -> Iterator[str]:
+        if fmt == "csv":
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(columns)
+        for item in items:
+            if fmt == "ndjson":
+                yield json.dumps({c: item.get(c) for c in columns}) + "\n"
+                continue
+            writer.writerow([
+                ";".join(item.get(c) or []) if c == "keywords" else ("" if item.get(c) is None else item.get(c))
+                for c in columns
+            ])
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        if fmt == "csv" and not items:
+            yield out.getvalue()
+
+    return StreamingResponse(
+        rows(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}_sources.{fmt}"'},
+    )
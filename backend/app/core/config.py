@@ -53,10 +53,99 @@ class Settings(BaseSettings):
     # Twitter/X (RapidAPI)
     RAPIDAPI_KEY: str = ""
     RAPIDAPI_HOST: str = "twitter154.p.rapidapi.com"
+    TWITTER_MAX_CONCURRENT_ACCOUNTS: int = 8
+    TWITTER_REQUEST_BUDGET_PER_RUN: int = 300
+    
+    # Telegram (public channel web previews; point at a local server for fixtures)
+    TELEGRAM_PREVIEW_BASE_URL: str = "https://t.me/s"
+    TELEGRAM_MAX_CONCURRENT_CHANNELS: int = 5
+    TELEGRAM_MAX_PAGES_PER_CHANNEL: int = 3
     
     # RSS
     RSS_FETCH_TIMEOUT: int = 30
     RSS_MAX_ITEMS: int = 100
+    RSS_MAX_CONCURRENT_FEEDS: int = 10
+    FEED_PARSER_WORKERS: int = 0  # processes; 0 = CPU count, -1 = parse in a thread instead
+    
+    # Polymarket catalog sync (one paginated pass over active markets per run)
+    POLYMARKET_CATALOG_PAGE_SIZE: int = 500
+    POLYMARKET_CATALOG_MAX_PAGES: int = 40
+    # Local market catalog mirror (SQLite); empty means backend/data/polymarket.db
+    POLYMARKET_MIRROR_PATH: str = ""
+    
+    # Scraping orchestration (per-source time budgets in seconds)
+    SCRAPE_MAX_CONCURRENT_SOURCES: int = 3
+    SCRAPE_TELEGRAM_TIMEOUT_SECONDS: int = 60
+    SCRAPE_TWITTER_TIMEOUT_SECONDS: int = 90
+    SCRAPE_RSS_TIMEOUT_SECONDS: int = 60
+    SCRAPE_POLYMARKET_TIMEOUT_SECONDS: int = 45
+    # Scrape jobs (/scraping/jobs): concurrent jobs, per-job budget (0 = none), finished jobs kept
+    SCRAPE_MAX_CONCURRENT_JOBS: int = 2
+    SCRAPE_JOB_TIMEOUT_SECONDS: int = 900
+    SCRAPE_JOB_HISTORY: int = 50
+    # Historical backfill (/scraping/backfill): Twitter is fetched in day slices per account,
+    # Telegram channels are walked back page by page; every page is checkpointed and units
+    # stopped at their page cap stay pending until the backfill is resumed
+    BACKFILL_SLICE_DAYS: int = 1
+    BACKFILL_TWITTER_MAX_PAGES_PER_SLICE: int = 10
+    BACKFILL_TWITTER_REQUEST_BUDGET: int = 5000
+    BACKFILL_TELEGRAM_MAX_PAGES_PER_CHANNEL: int = 500
+    BACKFILL_RESUME_ON_STARTUP: bool = True
+    
+    # Continuous ingestion: each feed / account / channel is polled on its own interval,
+    # adapted to its publishing rate (aiming for INGEST_TARGET_ITEMS_PER_POLL new items per poll)
+    INGEST_ENABLED: bool = False
+    INGEST_DEFAULT_INTERVAL_SECONDS: int = 900
+    INGEST_MIN_INTERVAL_SECONDS: int = 60
+    INGEST_MAX_INTERVAL_SECONDS: int = 21600
+    INGEST_TARGET_ITEMS_PER_POLL: float = 3.0
+    INGEST_DAYS_BACK: int = 1
+    INGEST_MAX_ITEMS_PER_SOURCE: int = 200
+    
+    # In-memory retention (0 = unlimited); evicted posts stay in the post store.
+    # Count and age apply per scrape run / job, the byte budget to all of them together.
+    RETENTION_POSTS_MAX_ITEMS: int = 20000
+    RETENTION_POSTS_MAX_AGE_SECONDS: int = 86400
+    RETENTION_POSTS_MAX_MB: int = 128
+    RETENTION_SIGNALS_MAX_ITEMS: int = 500
+    RETENTION_SIGNALS_MAX_AGE_SECONDS: int = 21600
+    RETENTION_SIGNALS_MAX_MB: int = 4
+    
+    # Full-text search (/scraping/search): in-memory BM25 index over the last N days of posts
+    SEARCH_INDEX_ENABLED: bool = True
+    SEARCH_INDEX_DAYS: int = 7
+    
+    # Near-duplicate merging of scraped posts (MinHash/LSH); bands must divide num_perm
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.6
+    DEDUP_NUM_PERM: int = 64
+    DEDUP_BANDS: int = 16
+    # Scrapes share one index: clusters not extended for this long, or beyond this many, are forgotten
+    DEDUP_WINDOW_HOURS: float = 24
+    DEDUP_WINDOW_MAX_POSTS: int = 50000
+    
+    # Sources store: "json" (data/sources.json) or "sqlite" (indexed, for large source lists)
+    SOURCES_BACKEND: str = "json"
+    # SQLite sources database; empty means backend/data/sources.db
+    SOURCES_DB_PATH: str = ""
+    # JSON backend: mutations within this window are written together
+    SOURCES_WRITE_DELAY_SECONDS: float = 0.5
+    # Bulk import: largest accepted upload, rows validated and stored per batch, rows listed in the report
+    SOURCES_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    SOURCES_IMPORT_BATCH_SIZE: int = 1000
+    SOURCES_IMPORT_MAX_REPORT_ROWS: int = 1000
+    
+    # Scraped post history (SQLite); empty means backend/data/posts.db
+    POST_STORE_PATH: str = ""
+    # Incremental scrape cursors (SQLite); empty means backend/data/scrape_state.db
+    SCRAPE_STATE_PATH: str = ""
+    # Parquet corpus of scraped posts, partitioned by source and day (needs pyarrow);
+    # empty path means backend/data/corpus. Exports run after scrapes, at most once per interval
+    CORPUS_EXPORT_ENABLED: bool = True
+    CORPUS_EXPORT_MIN_INTERVAL_SECONDS: int = 300
+    CORPUS_PATH: str = ""
+    # Part files replaced by a compaction are kept this long, for readers that already listed them
+    CORPUS_COMPACTION_GRACE_SECONDS: int = 3600
     
     # Crypto APIs
     BINANCE_API_KEY: str = ""
@@ -100,6 +189,23 @@ class Settings(BaseSettings):
     API_REQUEST_TIMEOUT: int = 30
     API_MAX_RETRIES: int = 3
     API_RETRY_DELAY: int = 1
+    API_RETRY_MAX_DELAY: int = 30
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_SECONDS: int = 60
+    
+    # Outbound rate limits (requests per second, per host)
+    RAPIDAPI_REQUESTS_PER_SECOND: float = 2.0
+    POLYMARKET_REQUESTS_PER_SECOND: float = 10.0
+    BINANCE_REQUESTS_PER_SECOND: float = 10.0
+    OUTBOUND_DEFAULT_REQUESTS_PER_SECOND: float = 20.0
+    
+    # Outbound HTTP connection pools (shared clients, see app/core/http_client.py)
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    # Every other host (RSS feeds, user-supplied proof URLs) shares one client with this many connections
+    HTTP_MAX_CONNECTIONS_SHARED: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = False
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -0,0 +1,147 @@
+"""
+Shared outbound HTTP clients
+Process-wide registry of pooled httpx clients, opened and closed by the
+FastAPI lifespan. The configured API hosts get their own client (pool
+limits apply per host, timeouts are tuned per host); every other host,
+including arbitrary user-supplied URLs, shares one default client, so the
+number of pools stays bounded.
+"""
+
+import logging
+import time
+from typing import Dict, Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "*"
+
+POLYMARKET_GAMMA_HOST = "gamma-api.polymarket.com"
+
+
+def _host_timeouts() -> Dict[str, httpx.Timeout]:
+    """The hosts with their own client and their timeouts; other hosts use API_REQUEST_TIMEOUT"""
+    default = httpx.Timeout(settings.API_REQUEST_TIMEOUT)
+    timeouts = {
+        settings.RAPIDAPI_HOST: httpx.Timeout(settings.API_REQUEST_TIMEOUT, connect=10.0),
+        POLYMARKET_GAMMA_HOST: httpx.Timeout(15.0, connect=5.0),
+    }
+    telegram_host = urlsplit(settings.TELEGRAM_PREVIEW_BASE_URL).hostname
+    if telegram_host:
+        timeouts.setdefault(telegram_host, default)
+    return timeouts
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport that records request counts, errors and latency"""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_ms += (time.monotonic() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        connections = getattr(self._pool, "connections", [])
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "avg_latency_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+        }
+
+
+class HTTPClientRegistry:
+    """Pooled, keep-alive httpx clients shared by every scraper and resolver"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, _CountingTransport] = {}
+        self._timeouts = _host_timeouts()
+        self._http2 = False
+
+    async def start(self) -> None:
+        """Open clients for the known API hosts (called from the lifespan)"""
+        self._http2 = settings.HTTP2_ENABLED and _http2_available()
+        if settings.HTTP2_ENABLED and not self._http2:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+        for host in list(self._timeouts) + [DEFAULT_HOST]:
+            self._client_for(host)
+        logger.info(f"HTTP client pools ready ({len(self._clients)} hosts, http2={self._http2})")
+
+    async def aclose(self) -> None:
+        """Close every pooled client (called from the lifespan)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._transports.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {e}")
+
+    def get(self, url_or_host: str) -> httpx.AsyncClient:
+        """
+        Borrow the pooled client for a URL or host
+
+        The client is shared and must not be closed by the caller.
+        """
+        host = urlsplit(url_or_host).hostname if "://" in url_or_host else url_or_host
+        return self._client_for(host if host in self._timeouts else DEFAULT_HOST)
+
+    def _client_for(self, host: str) -> httpx.AsyncClient:
+        client = self._clients.get(host)
+        if client is not None and not client.is_closed:
+            return client
+
+        shared = host == DEFAULT_HOST
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_SHARED if shared else settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        transport = _CountingTransport(limits=limits, http2=self._http2)
+        client = httpx.AsyncClient(
+            transport=transport,
+            timeout=self._timeouts.get(host, httpx.Timeout(settings.API_REQUEST_TIMEOUT)),
+            follow_redirects=True,
+        )
+        self._clients[host] = client
+        self._transports[host] = transport
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Pool usage per host"""
+        return {host: transport.stats() for host, transport in self._transports.items()}
+
+
+# Global instance
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,294 @@
+"""
+Outbound request policy
+Per-host token buckets, retries with jittered exponential backoff
+(honouring Retry-After) and circuit breakers, driven by the API_* settings.
+All scrapers and AI Curator modules send external requests through here.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Callable, TypeVar
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.http_client import http_clients, POLYMARKET_GAMMA_HOST
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BINANCE_HOST = "api.binance.com"
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit breaker is open and the request is not sent"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}; retry in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it (FIFO across waiters)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for this host, e.g. after a 429 with Retry-After"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> one half-open probe per cool-down"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Cool-down elapsed: let a single probe through and restart the window,
+        # so a probe that never reports back (e.g. cancelled) cannot wedge the breaker
+        self.state = "half_open"
+        self.opened_at = now
+        return True
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state == "closed":
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class RequestBudget:
+    """Caps the number of requests a single run (e.g. one scrape) may spend"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.spent = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.spent >= self.limit
+
+    def try_spend(self, cost: int = 1) -> bool:
+        """Reserve `cost` requests; False (and nothing reserved) if over budget"""
+        if self.spent + cost > self.limit:
+            self.spent = max(self.spent, self.limit)
+            return False
+        self.spent += cost
+        return True
+
+
+class _HostPolicy:
+    def __init__(self, rate: float):
+        self.bucket = TokenBucket(rate, max(1.0, rate))
+        self.breaker = CircuitBreaker(
+            settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            settings.CIRCUIT_BREAKER_RESET_SECONDS,
+        )
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+
+
+def _host_rates() -> Dict[str, float]:
+    """Per-host request rates matched to provider quotas"""
+    return {
+        settings.RAPIDAPI_HOST: settings.RAPIDAPI_REQUESTS_PER_SECOND,
+        POLYMARKET_GAMMA_HOST: settings.POLYMARKET_REQUESTS_PER_SECOND,
+        BINANCE_HOST: settings.BINANCE_REQUESTS_PER_SECOND,
+    }
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, base * 2^attempt), capped"""
+    ceiling = min(settings.API_RETRY_MAX_DELAY, settings.API_RETRY_DELAY * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class OutboundRequester:
+    """Rate-limited, retrying, circuit-broken access to external hosts"""
+
+    def __init__(self):
+        self._rates = _host_rates()
+        self._policies: Dict[str, _HostPolicy] = {}
+
+    def _policy(self, host: str) -> _HostPolicy:
+        policy = self._policies.get(host)
+        if policy is None:
+            policy = _HostPolicy(self._rates.get(host, settings.OUTBOUND_DEFAULT_REQUESTS_PER_SECOND))
+            self._policies[host] = policy
+        return policy
+
+    async def _admit(self, host: str, policy: _HostPolicy) -> None:
+        if not policy.breaker.allow():
+            policy.rejected += 1
+            raise CircuitOpenError(host, policy.breaker.retry_in())
+        await policy.bucket.acquire()
+        policy.requests += 1
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the pooled client for its host
+
+        Retries transport errors and 429/5xx responses up to API_MAX_RETRIES
+        times. The last response is returned as-is once retries run out, so
+        callers keep handling non-200 statuses themselves.
+
+        Raises:
+            CircuitOpenError: the host is failing and requests are paused
+            httpx.TransportError: the final attempt failed at transport level
+        """
+        host = urlsplit(url).hostname or url
+        policy = self._policy(host)
+        client = http_clients.get(url)
+        attempts = settings.API_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            await self._admit(host, policy)
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                policy.breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                delay = _backoff(attempt)
+                logger.warning(f"{method} {host} failed ({e!r}); retry {attempt + 1} in {delay:.1f}s")
+                policy.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                policy.breaker.record_success()
+                return response
+
+            if response.status_code >= 500:
+                policy.breaker.record_failure()
+            else:
+                # 429: the host is healthy, we are just over quota
+                policy.breaker.record_success()
+
+            if attempt == attempts - 1:
+                return response
+
+            retry_after = _retry_after(response)
+            if retry_after is not None and retry_after > settings.API_RETRY_MAX_DELAY:
+                logger.warning(f"{host} asked to retry after {retry_after:.0f}s; giving up")
+                return response
+            if retry_after is not None and response.status_code == 429:
+                policy.bucket.pause(retry_after)
+
+            delay = retry_after if retry_after is not None else _backoff(attempt)
+            logger.warning(f"{method} {host} returned {response.status_code}; retry {attempt + 1} in {delay:.1f}s")
+            policy.retries += 1
+            await asyncio.sleep(delay)
+
+        return response
+
+    async def call(self, host: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking SDK call (e.g. ccxt) in a thread under the host's policy
+
+        Any exception counts as a failure and is retried with backoff.
+        """
+        policy = self._policy(host)
+        attempts = settings.API_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            await self._admit(host, policy)
+            try:
+                result = await asyncio.to_thread(fn, *args, **kwargs)
+            except Exception as e:
+                policy.breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                delay = _backoff(attempt)
+                logger.warning(f"Call to {host} failed ({e!r}); retry {attempt + 1} in {delay:.1f}s")
+                policy.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            policy.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limiter and breaker state per host"""
+        return {
+            host: {
+                "circuit": policy.breaker.state,
+                "consecutive_failures": policy.breaker.failures,
+                "rate_per_second": policy.bucket.rate,
+                "requests": policy.requests,
+                "retries": policy.retries,
+                "rejected": policy.rejected,
+            }
+            for host, policy in self._policies.items()
+        }
+
+
+# Global instance
+outbound = OutboundRequester()
@@ -0,0 +1,209 @@
+"""
+Bounded in-memory retention
+Arrival-ordered buffers capped by item count, age and bytes, optionally
+sharing one byte budget, so a long-running process keeps a predictable
+footprint. Evicted items stay available from their on-disk stores.
+"""
+
+import sys
+import time
+import weakref
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Generic, Iterable, Iterator, List, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+MB = 1024 * 1024
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (Linux), None where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    import resource
+
+    return pages * resource.getpagesize()
+
+
+class RetentionPool:
+    """
+    Byte budget shared by several buffers
+
+    When the buffers together exceed the budget, the oldest buffer (e.g. a
+    finished scrape) gives up its oldest items first.
+    """
+
+    def __init__(self, name: str, max_bytes: int = 0):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._buffers: List[weakref.ref] = []
+
+    def register(self, buffer: "BoundedBuffer") -> None:
+        self._buffers.append(weakref.ref(buffer))
+
+    def buffers(self) -> List["BoundedBuffer"]:
+        live = [b for b in (ref() for ref in self._buffers) if b is not None]
+        if len(live) != len(self._buffers):
+            self._buffers = [weakref.ref(b) for b in live]
+        return live
+
+    def resize(self, items: Iterable[Any]) -> None:
+        """Re-measure items changed in place in any of the buffers, then enforce the budget"""
+        items = list(items)
+        for buffer in self.buffers():
+            buffer.resize(items, enforce=False)
+        self.enforce()
+
+    def enforce(self) -> None:
+        if not self.max_bytes:
+            return
+        buffers = self.buffers()
+        excess = sum(b.bytes for b in buffers) - self.max_bytes
+        for buffer in buffers:
+            if excess <= 0:
+                break
+            excess -= buffer.evict_bytes(excess)
+
+    def stats(self) -> Dict[str, Any]:
+        buffers = self.buffers()
+        return {
+            "buffers": len(buffers),
+            "items": sum(len(b) for b in buffers),
+            "bytes": sum(b.bytes for b in buffers),
+            "max_bytes": self.max_bytes or None,
+            "evicted": sum(b.evicted for b in buffers),
+        }
+
+
+class BoundedBuffer(Generic[T]):
+    """
+    Append-only, arrival-ordered buffer with oldest-first eviction
+
+    Supports the list operations the callers use (append, extend, len,
+    iteration, indexing and slicing). Limits of 0 / None are unlimited.
+    Sizes are measured on insert; items that later grow in place are
+    re-measured with resize().
+
+    Args:
+        max_items: Keep at most this many items
+        max_bytes: Keep at most this many (estimated) bytes
+        max_age_seconds: Drop items older than this
+        size_of: Estimated size of one item in bytes
+        pool: Shared byte budget this buffer counts against
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        size_of: Callable[[T], int] = sys.getsizeof,
+        pool: Optional[RetentionPool] = None,
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.size_of = size_of
+        self.pool = pool
+        # [arrival, size, item]; _entries finds an item's entry by identity for resize()
+        self._items: Deque[List[Any]] = deque()
+        self._entries: Dict[int, List[Any]] = {}
+        self.bytes = 0
+        self.evicted = 0
+        if pool is not None:
+            pool.register(self)
+
+    def append(self, item: T) -> None:
+        self._push(item)
+        self._enforce()
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self._push(item)
+        self._enforce()
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._entries.clear()
+        self.bytes = 0
+
+    def resize(self, items: Iterable[T], enforce: bool = True) -> None:
+        """Re-measure held items that changed in place (items not held are ignored)"""
+        for item in items:
+            entry = self._entries.get(id(item))
+            if entry is None or entry[2] is not item:
+                continue
+            size = self.size_of(item)
+            self.bytes += size - entry[1]
+            entry[1] = size
+        if enforce:
+            self._enforce()
+
+    def evict_bytes(self, amount: int) -> int:
+        """Evict oldest items until at least amount bytes are freed; returns bytes freed"""
+        freed = 0
+        while self._items and freed < amount:
+            freed += self._popleft()
+        return freed
+
+    def _push(self, item: T) -> None:
+        size = self.size_of(item)
+        entry = [time.monotonic(), size, item]
+        self._items.append(entry)
+        self._entries[id(item)] = entry
+        self.bytes += size
+
+    def _popleft(self) -> int:
+        entry = self._items.popleft()
+        _, size, item = entry
+        if self._entries.get(id(item)) is entry:
+            del self._entries[id(item)]
+        self.bytes -= size
+        self.evicted += 1
+        return size
+
+    def _expire(self) -> None:
+        if not self.max_age_seconds:
+            return
+        cutoff = time.monotonic() - self.max_age_seconds
+        while self._items and self._items[0][0] < cutoff:
+            self._popleft()
+
+    def _enforce(self) -> None:
+        self._expire()
+        while self.max_items and len(self._items) > self.max_items:
+            self._popleft()
+        while self.max_bytes and self.bytes > self.max_bytes and self._items:
+            self._popleft()
+        if self.pool is not None:
+            self.pool.enforce()
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        self._expire()
+        return (entry[2] for entry in self._items)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        self._expire()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            return [entry[2] for entry in islice(self._items, start, stop, step)]
+        return self._items[index][2]
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            "items": len(self._items),
+            "bytes": self.bytes,
+            "evicted": self.evicted,
+            "max_items": self.max_items or None,
+            "max_bytes": self.max_bytes or None,
+            "max_age_seconds": self.max_age_seconds or None,
+        }
@@ -0,0 +1,55 @@
+"""
+Embedded SQLite helper
+One WAL-mode connection per thread, schema (and migration) applied on first use
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteDatabase:
+    """Lazily-initialized SQLite database shared across threads"""
+
+    def __init__(
+        self,
+        path: Path,
+        schema: str,
+        migrate: Optional[Callable[[sqlite3.Connection], None]] = None,
+    ):
+        self.path = path
+        self.schema = schema
+        # Brings databases created by older versions up to the schema; runs after it, once per process
+        self.migrate = migrate
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the file and schema if needed"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        with self._init_lock:
+            if not self._initialized:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            conn = sqlite3.connect(str(self.path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+
+            if not self._initialized:
+                conn.executescript(self.schema)
+                if self.migrate is not None:
+                    with conn:
+                        self.migrate(conn)
+                self._initialized = True
+
+        self._local.conn = conn
+        return conn
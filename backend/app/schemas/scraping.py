@@ -21,15 +21,77 @@ class ScrapeRequest(BaseModel):
     sources: Optional[List[SourceType]] = Field(None, description="Specific sources to scrape, or all if None")
     days_back: int = Field(2, ge=1, le=30)
     max_items_per_source: int = Field(100, ge=10, le=500)
+    incremental: bool = Field(
+        False,
+        description="Only fetch items newer than each source's last scrape. Off by default: the "
+                    "ingestion scheduler advances the same cursors, so an incremental scrape returns "
+                    "only what arrived since its last pass",
+    )
+
+
+class SourceProgress(BaseModel):
+    """Scraping progress of a single source"""
+    status: str = Field("pending", description="pending, scraping, completed, error, timeout, skipped")
+    posts: int = 0
+    elapsed_ms: Optional[int] = None
+    error: Optional[str] = None
 
 
 class ScrapeProgress(BaseModel):
     """Scraping progress status"""
-    status: str = Field(..., description="idle, scraping, completed, error")
+    status: str = Field(..., description="idle, scraping, completed, cancelled, error")
     progress: int = Field(0, ge=0, le=100)
-    current_source: Optional[str] = None
+    current_source: Optional[str] = Field(None, description="Most recently started source still scraping")
     message: Optional[str] = None
     stats: Optional[Dict[str, int]] = None
+    sources: Dict[str, SourceProgress] = Field(default_factory=dict, description="Progress keyed by source")
+
+
+class ScrapeJobInfo(BaseModel):
+    """A scrape job submitted to the job manager"""
+    id: str
+    status: str = Field(..., description="queued, running, completed, cancelled, timeout, error")
+    request: ScrapeRequest
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: ScrapeProgress
+    total: int = 0
+    duplicates: int = 0
+    errors: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+class BackfillRequest(BaseModel):
+    """Request to backfill post history over a date range"""
+    sources: Optional[List[SourceType]] = Field(None, description="Specific sources to backfill, or all if None")
+    days_back: int = Field(30, ge=1, le=365, description="Range length when start is not given")
+    start: Optional[datetime] = Field(None, description="Start of the range (UTC); end - days_back if None")
+    end: Optional[datetime] = Field(None, description="End of the range (UTC); now if None")
+
+
+class BackfillSourceProgress(BaseModel):
+    """Backfill progress of a single source"""
+    units: int = Field(0, description="Slices (Twitter) / channels (Telegram) / snapshots (RSS, Polymarket)")
+    done: int = 0
+    failed: int = 0
+    posts: int = 0
+
+
+class BackfillInfo(BaseModel):
+    """A historical backfill and its checkpointed progress"""
+    id: str
+    status: str = Field(..., description="queued, running, completed, incomplete, cancelled, error")
+    sources: List[SourceType]
+    start: datetime
+    end: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Dict[str, BackfillSourceProgress] = Field(default_factory=dict, description="Progress keyed by source")
+    duplicates: int = 0
+    errors: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
 
 
 class ScrapedPost(BaseModel):
@@ -8,10 +8,10 @@ Handles market resolution and proof verification.
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
-import httpx
 import ccxt
 
 from app.core.config import settings
+from app.core.outbound import outbound, BINANCE_HOST
 
 logger = logging.getLogger(__name__)
 
@@ -225,24 +225,23 @@ class MarketJudge:
         logger.info(f"Verifying external proof: {proof_url}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(proof_url)
-                
-                if response.status_code != 200:
-                    return {
-                        "verified": False,
-                        "error": f"HTTP {response.status_code}",
-                    }
-                
-                # In production: parse HTML/JSON to verify outcome
-                # For now: return mock verification
-                
+            response = await outbound.request("GET", proof_url)
+            
+            if response.status_code != 200:
                 return {
-                    "verified": True,
-                    "outcome": expected_outcome,
-                    "proof_url": proof_url,
-                    "timestamp_checked": datetime.utcnow().isoformat(),
+                    "verified": False,
+                    "error": f"HTTP {response.status_code}",
                 }
+            
+            # In production: parse HTML/JSON to verify outcome
+            # For now: return mock verification
+            
+            return {
+                "verified": True,
+                "outcome": expected_outcome,
+                "proof_url": proof_url,
+                "timestamp_checked": datetime.utcnow().isoformat(),
+            }
         
         except Exception as e:
             logger.error(f"Error verifying external proof: {e}", exc_info=True)
@@ -260,8 +259,8 @@ class MarketJudge:
     ) -> list:
         """Fetch OHLCV data from exchange"""
         try:
-            import asyncio
-            ohlcv = await asyncio.to_thread(
+            ohlcv = await outbound.call(
+                BINANCE_HOST,
                 self.exchange.fetch_ohlcv,
                 symbol,
                 timeframe,
@@ -8,12 +8,15 @@ Listens to external data sources and detects signals for market generation.
 import logging
 import asyncio
 import random
+from functools import partial
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import httpx
 import ccxt
 
 from app.core.config import settings
+from app.core.retention import BoundedBuffer, MB
+from app.core.outbound import outbound, BINANCE_HOST
+from app.services.scraping.scheduler import ingestion_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +38,10 @@ class Signal:
         self.confidence = confidence
         self.source = source
         self.timestamp = timestamp
+    
+    def approx_bytes(self) -> int:
+        """Estimated memory held by this signal"""
+        return 400 + len(str(self.data))
 
 
 class Watchtower:
@@ -51,7 +58,13 @@ class Watchtower:
     
     def __init__(self):
         self.is_running = False
-        self.signals: List[Signal] = []
+        # Unconsumed signals; stale ones are dropped rather than turned into markets
+        self.signals: BoundedBuffer[Signal] = BoundedBuffer(
+            max_items=settings.RETENTION_SIGNALS_MAX_ITEMS,
+            max_bytes=settings.RETENTION_SIGNALS_MAX_MB * MB,
+            max_age_seconds=settings.RETENTION_SIGNALS_MAX_AGE_SECONDS,
+            size_of=Signal.approx_bytes,
+        )
         self.exchange: Optional[ccxt.Exchange] = None
         
         # Initialize exchange (Binance)
@@ -72,23 +85,42 @@ class Watchtower:
         logger.info("👁️ Starting Watchtower...")
         self.is_running = True
         
-        # Start background monitoring tasks
-        asyncio.create_task(self._monitor_crypto())
-        asyncio.create_task(self._monitor_social())
+        if settings.INGEST_ENABLED:
+            # Checks share the ingestion scheduler and speed up while they keep finding signals
+            ingestion_scheduler.register(
+                "watchtower:crypto", partial(self._run_check, self._check_crypto_signals),
+                interval=900, min_interval=300, max_interval=1800,
+            )
+            ingestion_scheduler.register(
+                "watchtower:social", partial(self._run_check, self._check_social_signals),
+                interval=300, min_interval=60, max_interval=900,
+            )
+        else:
+            # Start background monitoring tasks
+            asyncio.create_task(self._monitor_crypto())
+            asyncio.create_task(self._monitor_social())
         
         logger.info("✅ Watchtower started")
     
     async def stop(self):
         """Stop the Watchtower"""
         self.is_running = False
+        ingestion_scheduler.unregister("watchtower:crypto")
+        ingestion_scheduler.unregister("watchtower:social")
         logger.info("Watchtower stopped")
     
     async def get_signals(self) -> List[Signal]:
         """Get accumulated signals and clear the buffer"""
-        signals = self.signals.copy()
-        self.signals = []
+        signals = list(self.signals)
+        self.signals.clear()
         return signals
     
+    async def _run_check(self, check) -> int:
+        """Run one check for the ingestion scheduler; returns the number of new signals"""
+        started = datetime.utcnow()
+        await check()
+        return sum(1 for s in self.signals if s.timestamp >= started)
+    
     async def _monitor_crypto(self):
         """Monitor crypto sources (15-minute cycle)"""
         while self.is_running:
@@ -121,8 +153,8 @@ class Watchtower:
         try:
             if self.exchange:
                 # Get BTC and ETH ticker data
-                btc_ticker = await asyncio.to_thread(self.exchange.fetch_ticker, 'BTC/USDT')
-                eth_ticker = await asyncio.to_thread(self.exchange.fetch_ticker, 'ETH/USDT')
+                btc_ticker = await outbound.call(BINANCE_HOST, self.exchange.fetch_ticker, 'BTC/USDT')
+                eth_ticker = await outbound.call(BINANCE_HOST, self.exchange.fetch_ticker, 'ETH/USDT')
                 
                 # Check for significant moves
                 if btc_ticker['percentage'] and abs(btc_ticker['percentage']) > 3.0:
@@ -0,0 +1,472 @@
+"""
+Scraped post corpus: Parquet files partitioned by source and day
+Posts written to the post store are appended to backend/data/corpus as
+source=<source>/day=<YYYY-MM-DD>/part-*.parquet (hive layout) after each
+scrape, so months of history can be queried offline, one partition and
+column at a time, without going through the live backend.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services.cursor_store import cursor_store
+from app.services.post_store import post_store
+
+logger = logging.getLogger(__name__)
+
+# Rows read from the post store per batch, and buffered before part files are written
+READ_BATCH_SIZE = 5000
+ROWS_PER_FLUSH = 50000
+# Rows refreshed in the last few seconds may still be committing; they go with the next export
+SETTLE_MS = 5000
+
+FILE_COLUMNS = [
+    "id", "source_id", "source_name", "title", "text", "date_iso",
+    "url", "metadata", "first_seen", "last_seen",
+]
+PARTITION_COLUMNS = ["source", "day"]
+# Per-partition record of compactions: {compacted file: {"replaces": [part files], "at": epoch seconds}}
+MANIFEST_NAME = "_compaction.json"
+
+
+def _arrow():
+    """pyarrow modules, imported on first use so the backend runs without them"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("The post corpus needs pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _corpus_path() -> Path:
+    if settings.CORPUS_PATH:
+        return Path(settings.CORPUS_PATH)
+    base = Path(__file__).resolve().parent.parent.parent
+    return base / "data" / "corpus"
+
+
+def _file_schema():
+    pa = _arrow()
+    timestamp = pa.timestamp("ms", tz="UTC")
+    return pa.schema([
+        ("id", pa.string()),
+        ("source_id", pa.string()),
+        ("source_name", pa.string()),
+        ("title", pa.string()),
+        ("text", pa.string()),
+        ("date_iso", timestamp),
+        ("url", pa.string()),
+        ("metadata", pa.string()),  # JSON
+        ("first_seen", timestamp),
+        ("last_seen", timestamp),
+    ])
+
+
+def _to_ms(value: datetime) -> int:
+    """Epoch milliseconds (UTC). Naive datetimes are treated as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _day(date_ts: int) -> str:
+    return datetime.fromtimestamp(date_ts / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _read_manifest(day_dir: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads((day_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable corpus manifest in {day_dir}: {e}")
+        return {}
+
+
+def _live_files(day_dir: Path) -> List[Path]:
+    """
+    A partition's part files, minus those replaced by a compacted file
+
+    The directory is listed before the manifest is read: the manifest entry
+    is written before its compacted file appears, so a listing without the
+    compacted file keeps the parts it replaces, and one with it drops them.
+    """
+    files = sorted(day_dir.glob("*.parquet"))
+    names = {f.name for f in files}
+    replaced = {
+        name
+        for compacted, entry in _read_manifest(day_dir).items()
+        if compacted in names
+        for name in entry.get("replaces", [])
+    }
+    return [f for f in files if f.name not in replaced]
+
+
+def _latest_only(table):
+    """Keep the most recently seen version of every post id"""
+    pa = _arrow()
+    if table.num_rows == 0:
+        return table
+    order = pa.compute.sort_indices(table, sort_keys=[("id", "ascending"), ("last_seen", "descending")])
+    table = table.take(order)
+    ids = table.column("id").to_numpy(zero_copy_only=False)
+    keep = np.ones(len(ids), dtype=bool)
+    keep[1:] = ids[1:] != ids[:-1]
+    return table.filter(pa.array(keep))
+
+
+class CorpusExporter:
+    """
+    Appends new and refreshed posts from the post store to the corpus
+
+    A (changed_ts, id) watermark in the cursor store marks what has been
+    exported; it only advances after the part files are on disk, so an
+    interrupted export is simply repeated. A post whose content changed gets
+    a new row in a later part file (one that was only seen again does not);
+    readers keep the latest one, and partitions of past days are compacted
+    into a single deduplicated file. The parts a compaction replaces are
+    deleted CORPUS_COMPACTION_GRACE_SECONDS later, so scans that listed
+    them before the compaction can still read them.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root or _corpus_path()
+        self.last_export: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._pending = False
+        self._last_run = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._unavailable = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CORPUS_EXPORT_ENABLED and not self._unavailable
+
+    def schedule(self) -> None:
+        """
+        Export soon after a scrape
+
+        Runs at most once per CORPUS_EXPORT_MIN_INTERVAL_SECONDS, so frequent
+        small polls are batched into fewer, larger part files.
+        """
+        if not self.enabled:
+            return
+        self._pending = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_pending())
+
+    async def _run_pending(self) -> None:
+        while self._pending:
+            # Give the scrape's last writes time to settle, so this export includes them
+            wait = self._last_run + settings.CORPUS_EXPORT_MIN_INTERVAL_SECONDS - time.monotonic()
+            await asyncio.sleep(max(wait, SETTLE_MS / 1000))
+            self._pending = False
+            try:
+                await asyncio.to_thread(self.export)
+            except Exception as e:
+                logger.error(f"Corpus export failed: {e}", exc_info=True)
+            self._last_run = time.monotonic()
+
+    async def shutdown(self) -> None:
+        """Write whatever is still pending (application shutdown, after scrapes have stopped)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.wait({self._task})
+        if self._pending and self.enabled:
+            self._pending = False
+            try:
+                await asyncio.to_thread(self.export, 0)
+            except Exception as e:
+                logger.error(f"Corpus export failed: {e}", exc_info=True)
+
+    def export(self, settle_ms: int = SETTLE_MS) -> Dict[str, Any]:
+        """
+        Append posts written since the last export (runs in a worker thread)
+
+        Args:
+            settle_ms: Leave rows refreshed within this many ms for the next export
+
+        Returns:
+            Rows and files written, partitions compacted and the time taken
+        """
+        try:
+            pa = _arrow()
+        except RuntimeError as e:
+            self._unavailable = True
+            logger.warning(f"{e}; corpus export disabled")
+            raise
+
+        with self._lock:
+            started = time.monotonic()
+            watermark = cursor_store.get("corpus", "export")
+            # Watermarks written before changed_ts existed hold last_seen_ts, which it was seeded from
+            after_ts = watermark.get("changed_ts", watermark.get("last_seen_ts", 0))
+            after_id = watermark.get("id", "")
+            until_ts = int(time.time() * 1000) - settle_ms
+
+            buffer: Dict[Tuple[str, str], List[tuple]] = defaultdict(list)
+            buffered = rows_written = files_written = 0
+            for rows in post_store.iter_changed(after_ts, after_id, until_ts, READ_BATCH_SIZE):
+                for row in rows:
+                    buffer[(row[1], _day(row[6]))].append(row)
+                buffered += len(rows)
+                after_ts, after_id = rows[-1][11], rows[-1][0]
+                if buffered >= ROWS_PER_FLUSH:
+                    files_written += self._write_parts(pa, buffer)
+                    rows_written += buffered
+                    buffer.clear()
+                    buffered = 0
+                    cursor_store.set("corpus", "export", {"changed_ts": after_ts, "id": after_id})
+            if buffered:
+                files_written += self._write_parts(pa, buffer)
+                rows_written += buffered
+                cursor_store.set("corpus", "export", {"changed_ts": after_ts, "id": after_id})
+
+            compacted = self._compact(pa)
+            self.last_export = {
+                "rows": rows_written,
+                "files": files_written,
+                "compacted_partitions": compacted,
+                "elapsed_ms": int((time.monotonic() - started) * 1000),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }
+            if rows_written or compacted:
+                logger.info(
+                    f"Corpus export: {rows_written} rows in {files_written} files, "
+                    f"{compacted} partitions compacted ({self.last_export['elapsed_ms']}ms)"
+                )
+            return self.last_export
+
+    def _partition_dir(self, source: str, day: str) -> Path:
+        return self.root / f"source={source}" / f"day={day}"
+
+    def _write_parts(self, pa, buffer: Dict[Tuple[str, str], List[tuple]]) -> int:
+        """One part file per partition in the buffer"""
+        schema = _file_schema()
+        for (source, day), rows in buffer.items():
+            columns = list(zip(*rows))
+            table = pa.Table.from_arrays(
+                [
+                    pa.array(columns[0], pa.string()),
+                    pa.array(columns[2], pa.string()),
+                    pa.array(columns[3], pa.string()),
+                    pa.array(columns[4], pa.string()),
+                    pa.array(columns[5], pa.string()),
+                    pa.array(columns[6], pa.int64()).cast(schema.field("date_iso").type),
+                    pa.array(columns[7], pa.string()),
+                    pa.array(columns[8], pa.string()),
+                    pa.array(columns[9], pa.int64()).cast(schema.field("first_seen").type),
+                    pa.array(columns[10], pa.int64()).cast(schema.field("last_seen").type),
+                ],
+                schema=schema,
+            )
+            self._write(pa, table, self._partition_dir(source, day), f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}")
+        return len(buffer)
+
+    @staticmethod
+    def _write(pa, table, directory: Path, name: str) -> Path:
+        """Write a file atomically (readers never see a partial file)"""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{name}.parquet"
+        tmp = directory / f".{name}.tmp"
+        pa.parquet.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def _write_manifest(day_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+        path = day_dir / MANIFEST_NAME
+        if not manifest:
+            path.unlink(missing_ok=True)
+            return
+        tmp = day_dir / f".{MANIFEST_NAME}.tmp"
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _compact(self, pa) -> int:
+        """
+        Merge the live part files of every past day into one deduplicated, date-sorted file
+
+        The replaced parts are recorded in the partition's manifest before
+        the compacted file appears and deleted once the grace period has
+        passed; the manifest entry is dropped one grace period after that,
+        when no reader can still hold a listing that includes them. An entry
+        whose compacted file is still missing after the grace period is
+        dropped and its parts are kept.
+        """
+        if not self.root.exists():
+            return 0
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        grace = settings.CORPUS_COMPACTION_GRACE_SECONDS
+        now = time.time()
+        compacted = 0
+        for source_dir in self.root.glob("source=*"):
+            for day_dir in source_dir.glob("day=*"):
+                if day_dir.name[len("day="):] >= today:
+                    continue
+
+                manifest = _read_manifest(day_dir)
+                changed = False
+                for name, entry in list(manifest.items()):
+                    age = now - entry.get("at", 0)
+                    if age < grace:
+                        continue
+                    if not (day_dir / name).exists():
+                        # Its compacted file was never written (e.g. a crash): the parts are still the data
+                        logger.warning(f"Dropping corpus compaction {day_dir / name}: file missing")
+                        del manifest[name]
+                        changed = True
+                        continue
+                    for replaced in entry.get("replaces", []):
+                        (day_dir / replaced).unlink(missing_ok=True)
+                    if age >= 2 * grace:
+                        del manifest[name]
+                        changed = True
+
+                parts = _live_files(day_dir)
+                if len(parts) >= 2:
+                    table = pa.concat_tables([pa.parquet.read_table(p, schema=_file_schema()) for p in parts])
+                    table = _latest_only(table)
+                    table = table.take(pa.compute.sort_indices(table, sort_keys=[("date_iso", "ascending"), ("id", "ascending")]))
+                    name = f"compacted-{int(now * 1000)}"
+                    manifest[f"{name}.parquet"] = {"replaces": [p.name for p in parts], "at": now}
+                    self._write_manifest(day_dir, manifest)
+                    self._write(pa, table, day_dir, name)
+                    compacted += 1
+                elif changed:
+                    self._write_manifest(day_dir, manifest)
+        return compacted
+
+    def stats(self) -> Dict[str, Any]:
+        """Live files, bytes and days per source on disk, plus the last export"""
+        sources: Dict[str, Dict[str, Any]] = {}
+        if self.root.exists():
+            for source_dir in sorted(self.root.glob("source=*")):
+                files = [f for day_dir in source_dir.glob("day=*") for f in _live_files(day_dir)]
+                days = sorted({f.parent.name[len("day="):] for f in files})
+                sources[source_dir.name[len("source="):]] = {
+                    "files": len(files),
+                    "bytes": sum(f.stat().st_size for f in files),
+                    "days": len(days),
+                    "first_day": days[0] if days else None,
+                    "last_day": days[-1] if days else None,
+                }
+        return {
+            "enabled": self.enabled,
+            "path": str(self.root),
+            "sources": sources,
+            "last_export": self.last_export,
+        }
+
+
+class CorpusReader:
+    """
+    Reads the corpus for analysis (needs pyarrow; pandas for to_pandas)
+
+    Only the partition directories matching the requested sources and
+    days are opened, and only the requested columns are read from them.
+
+    Example:
+        reader = CorpusReader()
+        table = reader.scan(sources=[SourceType.TWITTER], since=datetime(2026, 9, 1), columns=["id", "text"])
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root or _corpus_path()
+
+    def partitions(
+        self,
+        sources: Optional[Iterable[SourceType]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Path]:
+        """Partition directories overlapping the sources and [since, until)"""
+        wanted = {s.value for s in sources} if sources is not None else None
+        first_day = _day(_to_ms(since)) if since is not None else None
+        last_day = _day(_to_ms(until) - 1) if until is not None else None
+        found = []
+        for source_dir in sorted(self.root.glob("source=*")):
+            if wanted is not None and source_dir.name[len("source="):] not in wanted:
+                continue
+            for day_dir in sorted(source_dir.glob("day=*")):
+                day = day_dir.name[len("day="):]
+                if (first_day is None or day >= first_day) and (last_day is None or day <= last_day):
+                    found.append(day_dir)
+        return found
+
+    def scan(
+        self,
+        sources: Optional[Iterable[SourceType]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+        latest: bool = True,
+    ):
+        """
+        Posts as a pyarrow Table
+
+        Args:
+            sources: Only these sources (all if None)
+            since: Only posts dated at or after this time (naive = UTC)
+            until: Only posts dated before this time
+            columns: Columns to read (all if None); "source" and "day" come from the partition
+            latest: Drop older versions of refreshed posts (reads id and last_seen as well)
+
+        Returns:
+            pyarrow.Table
+        """
+        pa = _arrow()
+        ds = pa.dataset
+        files = [str(f) for d in self.partitions(sources, since, until) for f in _live_files(d)]
+        partitioning = ds.partitioning(pa.schema([("source", pa.string()), ("day", pa.string())]), flavor="hive")
+        schema = pa.unify_schemas([_file_schema(), partitioning.schema])
+        dataset = ds.dataset(
+            files,
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=str(self.root),
+        )
+
+        wanted = list(columns) if columns is not None else FILE_COLUMNS + PARTITION_COLUMNS
+        unknown = [c for c in wanted if c not in schema.names]
+        if unknown:
+            raise ValueError(f"Unknown corpus columns: {unknown}")
+        read = wanted + [c for c in ("id", "last_seen") if latest and c not in wanted]
+
+        date_type = schema.field("date_iso").type
+        condition = None
+        if since is not None:
+            condition = ds.field("date_iso") >= pa.scalar(_to_ms(since), pa.int64()).cast(date_type)
+        if until is not None:
+            before = ds.field("date_iso") < pa.scalar(_to_ms(until), pa.int64()).cast(date_type)
+            condition = before if condition is None else condition & before
+
+        table = dataset.to_table(columns=read, filter=condition)
+        if latest:
+            table = _latest_only(table).select(wanted)
+        return table
+
+    def to_pandas(self, *args: Any, **kwargs: Any):
+        """scan() as a pandas DataFrame"""
+        return self.scan(*args, **kwargs).to_pandas()
+
+
+# Global instance
+corpus_exporter = CorpusExporter()
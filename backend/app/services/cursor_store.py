@@ -0,0 +1,94 @@
+"""
+Cursor store: per-source high-water marks for incremental scraping.
+One JSON value per (source, key), e.g. the newest tweet id of an account,
+a feed's ETag/Last-Modified, or the last-seen Polymarket market id of a topic.
+Persisted in SQLite under backend/data and cached in memory.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_cursors (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+"""
+
+
+def _state_path() -> Path:
+    if settings.SCRAPE_STATE_PATH:
+        return Path(settings.SCRAPE_STATE_PATH)
+    base = Path(__file__).resolve().parent.parent.parent
+    return base / "data" / "scrape_state.db"
+
+
+class CursorStore:
+    """Persisted per-(source, key) scrape cursors with a write-through cache"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.db = SQLiteDatabase(path or _state_path(), _SCHEMA)
+        self._cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _load_source(self, source: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            cached = self._cache.get(source)
+            if cached is not None:
+                return cached
+
+            rows = self.db.connect().execute(
+                "SELECT key, value FROM scrape_cursors WHERE source = ?", (source,)
+            ).fetchall()
+            cursors = {}
+            for key, value in rows:
+                try:
+                    cursors[key] = json.loads(value)
+                except ValueError:
+                    logger.warning(f"Dropping unreadable cursor {source}/{key}")
+            self._cache[source] = cursors
+            return cursors
+
+    def get(self, source: str, key: str) -> Dict[str, Any]:
+        """Cursor for one account / feed / topic ({} if never scraped)"""
+        return dict(self._load_source(source).get(key, {}))
+
+    def get_all(self, source: str) -> Dict[str, Dict[str, Any]]:
+        """All cursors of a source, keyed by account / feed / topic"""
+        return {key: dict(value) for key, value in self._load_source(source).items()}
+
+    def set(self, source: str, key: str, value: Dict[str, Any]) -> None:
+        """Replace the cursor for one account / feed / topic"""
+        cursors = self._load_source(source)
+        with self._lock:
+            conn = self.db.connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO scrape_cursors (source, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(source, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    (source, key, json.dumps(value), datetime.utcnow().isoformat() + "Z"),
+                )
+            cursors[key] = dict(value)
+
+    def update(self, source: str, key: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the cursor for one account / feed / topic"""
+        value = self.get(source, key)
+        value.update(fields)
+        self.set(source, key, value)
+        return value
+
+
+# Global instance
+cursor_store = CursorStore()
@@ -0,0 +1,341 @@
+"""
+Polymarket catalog mirror
+Local SQLite copy of Gamma markets, indexed by end date, volume, slug and
+category, and refreshed incrementally by `updatedAt` so market lookups are
+answered locally instead of with another round of API calls. The sync
+watermark is kept apart from the rows and only moves after a full pass.
+"""
+
+import json
+import logging
+import sqlite3
+import asyncio
+from pathlib import Path
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.http_client import POLYMARKET_GAMMA_HOST
+from app.core.outbound import outbound
+from app.core.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    slug TEXT,
+    question TEXT NOT NULL,
+    category TEXT,
+    active INTEGER NOT NULL,
+    closed INTEGER NOT NULL,
+    end_ts INTEGER,
+    volume REAL NOT NULL DEFAULT 0,
+    updated_ts INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_markets_end ON markets (end_ts);
+CREATE INDEX IF NOT EXISTS idx_markets_volume ON markets (volume);
+CREATE INDEX IF NOT EXISTS idx_markets_slug ON markets (slug);
+CREATE INDEX IF NOT EXISTS idx_markets_category_volume ON markets (category, volume);
+CREATE INDEX IF NOT EXISTS idx_markets_updated ON markets (updated_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO markets (id, slug, question, category, active, closed, end_ts, volume, updated_ts, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    slug = excluded.slug,
+    question = excluded.question,
+    category = excluded.category,
+    active = excluded.active,
+    closed = excluded.closed,
+    end_ts = excluded.end_ts,
+    volume = excluded.volume,
+    updated_ts = excluded.updated_ts,
+    data = excluded.data
+"""
+
+ORDER_COLUMNS = {"volume": "volume DESC", "end_date": "end_ts ASC"}
+
+
+def _mirror_path() -> Path:
+    if settings.POLYMARKET_MIRROR_PATH:
+        return Path(settings.POLYMARKET_MIRROR_PATH)
+    base = Path(__file__).resolve().parent.parent.parent
+    return base / "data" / "polymarket.db"
+
+
+def _parse_ts(value: Any) -> Optional[int]:
+    """Epoch milliseconds from a Gamma ISO timestamp; None if missing or malformed"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _category(market: Dict[str, Any]) -> Optional[str]:
+    """Markets carry a category directly or through their parent event"""
+    if market.get("category"):
+        return market["category"]
+    for event in market.get("events") or []:
+        if isinstance(event, dict) and event.get("category"):
+            return event["category"]
+    return None
+
+
+class PolymarketMirror:
+    """SQLite-backed mirror of the Gamma market catalog"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.db = SQLiteDatabase(path or _mirror_path(), _SCHEMA)
+        self.base_url = f"https://{POLYMARKET_GAMMA_HOST}"
+        self.last_sync: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect()
+
+    def upsert_many(self, markets: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or refresh markets in a single transaction
+
+        Markets without a usable `updatedAt` are skipped (and counted in the
+        log): the sync watermark is built from it.
+
+        Returns:
+            Number of rows written
+        """
+        markets = [m for m in markets if m.get("id") is not None]
+        dated = [m for m in markets if _parse_ts(m.get("updatedAt")) is not None]
+        if len(dated) < len(markets):
+            logger.warning(f"Skipped {len(markets) - len(dated)} Polymarket markets without updatedAt")
+        rows = [
+            (
+                str(m["id"]),
+                m.get("slug"),
+                m.get("question") or "",
+                _category(m),
+                int(bool(m.get("active"))),
+                int(bool(m.get("closed"))),
+                _parse_ts(m.get("endDate") or m.get("end_date_iso")),
+                _to_float(m.get("volumeNum", m.get("volume"))),
+                _parse_ts(m.get("updatedAt")),
+                json.dumps(m, default=str),
+            )
+            for m in dated
+        ]
+        if not rows:
+            return 0
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def high_water_mark(self) -> Optional[int]:
+        """Newest `updatedAt` already mirrored (epoch ms), None when empty"""
+        return self._connect().execute("SELECT MAX(updated_ts) FROM markets").fetchone()[0]
+
+    def sync_state(self) -> Dict[str, Any]:
+        """
+        Catalog sync progress
+
+        "synced_through" is the `updatedAt` (epoch ms) up to which every
+        change is mirrored; "pass" is the unfinished pass, if any, with the
+        `updatedAt` it started at ("through"), the next page "offset" and
+        whether it is the initial "seed" of active markets.
+        """
+        row = self._connect().execute("SELECT value FROM sync_state WHERE name = 'catalog'").fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        # Mirrors written before the sync state existed start from their newest row
+        return {"synced_through": self.high_water_mark(), "pass": None}
+
+    def _save_sync_state(self, state: Dict[str, Any]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) VALUES ('catalog', ?)",
+                (json.dumps(state),),
+            )
+
+    async def refresh(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Pull markets changed since the last sync and store them
+
+        Pages are requested most recently updated first, down to the sync
+        watermark. The watermark only moves once a pass gets there; a pass
+        cut short (page cap, API error, caller stopping) records its offset
+        and the next refresh resumes it. Markets updated meanwhile move to
+        the top, so resuming by offset can repeat rows but never skip one.
+        An empty mirror is seeded from active markets only; later refreshes
+        also pick up markets that closed. Each stored page is yielded so
+        callers can act on the changes.
+
+        The sync lock is held while suspended at a yield: callers that may
+        stop early iterate under contextlib.aclosing so it is released then.
+        """
+        async with self._lock:
+            state = await asyncio.to_thread(self.sync_state)
+            synced_through = state.get("synced_through")
+            current = state.get("pass") or {"through": None, "offset": 0, "seed": synced_through is None}
+            page_size = max(1, settings.POLYMARKET_CATALOG_PAGE_SIZE)
+            params: Dict[str, Any] = {"limit": page_size, "order": "updatedAt", "ascending": False}
+            if current["seed"]:
+                params.update({"active": True, "closed": False})
+
+            for _ in range(settings.POLYMARKET_CATALOG_MAX_PAGES):
+                try:
+                    response = await outbound.request(
+                        "GET",
+                        f"{self.base_url}/markets",
+                        params={**params, "offset": current["offset"]},
+                    )
+                    if response.status_code != 200:
+                        logger.warning(f"Failed to fetch Polymarket markets: {response.status_code}")
+                        return
+
+                    data = response.json()
+                    markets = data if isinstance(data, list) else data.get("markets", [])
+                except Exception as e:
+                    logger.error(f"Error syncing Polymarket catalog (offset {current['offset']}): {e}")
+                    return
+
+                stamps = [_parse_ts(m.get("updatedAt")) for m in markets]
+                if current["through"] is None:
+                    current["through"] = max((ts for ts in stamps if ts is not None), default=None)
+                # Equal timestamps are re-applied: upserts are idempotent
+                changed = [
+                    m for m, ts in zip(markets, stamps)
+                    if ts is not None and (synced_through is None or ts >= synced_through)
+                ]
+                if None in stamps:
+                    logger.warning(f"Skipped {stamps.count(None)} Polymarket markets without updatedAt")
+                reached = synced_through is not None and any(ts is not None and ts < synced_through for ts in stamps)
+
+                if changed:
+                    await asyncio.to_thread(self.upsert_many, changed)
+                current["offset"] += len(markets)
+                if reached or len(markets) < page_size:
+                    # Full pass: every change up to where it started is mirrored
+                    state = {"synced_through": current["through"] or synced_through, "pass": None}
+                else:
+                    state = {"synced_through": synced_through, "pass": current}
+                await asyncio.to_thread(self._save_sync_state, state)
+                self.last_sync = datetime.utcnow().isoformat() + "Z"
+
+                if changed:
+                    yield changed
+                if state["pass"] is None:
+                    return
+
+            logger.warning(
+                f"Polymarket catalog sync stopped at {settings.POLYMARKET_CATALOG_MAX_PAGES} pages; "
+                f"the next refresh resumes at offset {current['offset']}"
+            )
+
+    async def sync(self) -> int:
+        """Run a refresh to completion; returns the number of markets changed"""
+        changed = 0
+        async for markets in self.refresh():
+            changed += len(markets)
+        logger.info(f"Polymarket mirror synced: {changed} markets changed")
+        return changed
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        slug: Optional[str] = None,
+        ending_after: Optional[datetime] = None,
+        ending_before: Optional[datetime] = None,
+        min_volume: Optional[float] = None,
+        active_only: bool = True,
+        order_by: str = "volume",
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query mirrored markets using the local indexes
+
+        Args:
+            category: Exact category match
+            slug: Exact slug match
+            ending_after: Only markets ending at or after this time
+            ending_before: Only markets ending before this time
+            min_volume: Only markets with at least this much volume
+            active_only: Skip closed / inactive markets
+            order_by: "volume" (highest first) or "end_date" (soonest first)
+            limit: Maximum number of markets
+
+        Returns:
+            Raw Gamma market dicts
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"order_by must be one of {sorted(ORDER_COLUMNS)}")
+
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if slug is not None:
+            clauses.append("slug = ?")
+            params.append(slug)
+        if ending_after is not None:
+            clauses.append("end_ts >= ?")
+            params.append(_parse_ts(ending_after.isoformat()))
+        if ending_before is not None:
+            clauses.append("end_ts < ?")
+            params.append(_parse_ts(ending_before.isoformat()))
+        if min_volume is not None:
+            clauses.append("volume >= ?")
+            params.append(min_volume)
+        if active_only:
+            clauses.append("active = 1 AND closed = 0")
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT data FROM markets {where} ORDER BY {ORDER_COLUMNS[order_by]}, id LIMIT ?"
+        params.append(limit)
+
+        return [json.loads(row[0]) for row in self._connect().execute(sql, params).fetchall()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Mirror size and freshness"""
+        conn = self._connect()
+        total, active = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(active = 1 AND closed = 0), 0) FROM markets"
+        ).fetchone()
+        high_water = self.high_water_mark()
+        synced_through = self.sync_state().get("synced_through")
+        return {
+            "markets": total,
+            "active_markets": active,
+            "updated_through": (
+                datetime.fromtimestamp(high_water / 1000, tz=timezone.utc).isoformat() if high_water else None
+            ),
+            "synced_through": (
+                datetime.fromtimestamp(synced_through / 1000, tz=timezone.utc).isoformat() if synced_through else None
+            ),
+            "last_sync": self.last_sync,
+        }
+
+
+# Global instance
+polymarket_mirror = PolymarketMirror()
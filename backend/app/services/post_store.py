@@ -0,0 +1,288 @@
+"""
+Post store: persistent history of scraped posts.
+SQLite (WAL mode) under backend/data, keyed by post id and indexed
+by source, source_id and date so history queries stay fast as it grows.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.sqlite import SQLiteDatabase
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    title TEXT,
+    text TEXT NOT NULL,
+    date_ts INTEGER NOT NULL,
+    date_iso TEXT NOT NULL,
+    url TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    first_seen_ts INTEGER NOT NULL,
+    last_seen_ts INTEGER NOT NULL,
+    changed_ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_date ON posts (date_ts, id);
+CREATE INDEX IF NOT EXISTS idx_posts_source_date ON posts (source, date_ts, id);
+CREATE INDEX IF NOT EXISTS idx_posts_source_id_date ON posts (source_id, date_ts, id);
+"""
+
+# changed_ts only moves when the content (not the metadata, e.g. engagement
+# counts) of a post changes, so re-seeing a post does not make it "changed"
+_UPSERT = """
+INSERT INTO posts (
+    id, source, source_id, source_name, title, text,
+    date_ts, date_iso, url, metadata, first_seen_ts, last_seen_ts, changed_ts
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    source_name = excluded.source_name,
+    title = excluded.title,
+    text = excluded.text,
+    url = excluded.url,
+    metadata = excluded.metadata,
+    last_seen_ts = excluded.last_seen_ts,
+    changed_ts = CASE
+        WHEN posts.source_name IS excluded.source_name AND posts.title IS excluded.title
+            AND posts.text IS excluded.text AND posts.url IS excluded.url
+        THEN posts.changed_ts
+        ELSE excluded.changed_ts
+    END
+"""
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add changed_ts to post stores created before it existed"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(posts)")}
+    if "changed_ts" not in columns:
+        logger.info("Adding changed_ts to the post store")
+        conn.execute("ALTER TABLE posts ADD COLUMN changed_ts INTEGER NOT NULL DEFAULT 0")
+        conn.execute("UPDATE posts SET changed_ts = last_seen_ts")
+    conn.execute("DROP INDEX IF EXISTS idx_posts_last_seen")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_changed ON posts (changed_ts, id)")
+
+
+def _posts_path() -> Path:
+    if settings.POST_STORE_PATH:
+        return Path(settings.POST_STORE_PATH)
+    base = Path(__file__).resolve().parent.parent.parent
+    return base / "data" / "posts.db"
+
+
+def _to_ts(value: datetime) -> int:
+    """Epoch milliseconds (UTC). Naive datetimes are treated as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _encode_cursor(date_ts: int, post_id: str) -> str:
+    raw = f"{date_ts}:{post_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        date_ts, post_id = raw.split(":", 1)
+        return int(date_ts), post_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class PostStore:
+    """SQLite-backed store of scraped posts"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.db = SQLiteDatabase(path or _posts_path(), _SCHEMA, _migrate)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.db.connect()
+
+    def upsert_many(self, posts: Iterable[PostRecord]) -> int:
+        """
+        Insert or refresh posts in a single transaction
+
+        Returns:
+            Number of rows written
+        """
+        now_ts = _to_ts(datetime.utcnow())
+        rows = [
+            (
+                p.id,
+                p.source.value,
+                p.source_id,
+                p.source_name,
+                p.title,
+                p.text,
+                _to_ts(p.date_iso),
+                p.date_iso.isoformat(),
+                p.url,
+                json.dumps(p.metadata, default=str),
+                now_ts,
+                now_ts,
+                now_ts,
+            )
+            for p in posts
+        ]
+        if not rows:
+            return 0
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def query(
+        self,
+        source: Optional[SourceType] = None,
+        source_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[PostRecord], Optional[str]]:
+        """
+        Query posts newest-first using keyset (cursor) pagination
+
+        Args:
+            source: Filter by source type
+            source_id: Filter by source id (account, feed or topic name)
+            since: Only posts dated at or after this time
+            until: Only posts dated before this time
+            limit: Page size
+            cursor: Opaque cursor returned by the previous page
+
+        Returns:
+            Tuple of (posts, next cursor or None when exhausted)
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source.value)
+        if source_id is not None:
+            clauses.append("source_id = ?")
+            params.append(source_id)
+        if since is not None:
+            clauses.append("date_ts >= ?")
+            params.append(_to_ts(since))
+        if until is not None:
+            clauses.append("date_ts < ?")
+            params.append(_to_ts(until))
+        if cursor:
+            cursor_ts, cursor_id = _decode_cursor(cursor)
+            clauses.append("(date_ts < ? OR (date_ts = ? AND id < ?))")
+            params.extend([cursor_ts, cursor_ts, cursor_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT id, source, source_id, source_name, title, text, date_ts, date_iso, url, metadata "
+            f"FROM posts {where} ORDER BY date_ts DESC, id DESC LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last[6], last[0])
+
+        return [self._row_to_post(row) for row in rows], next_cursor
+
+    def get_many(self, ids: List[str]) -> Dict[str, PostRecord]:
+        """Posts by id (ids that are not stored are left out)"""
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self._connect().execute(
+            "SELECT id, source, source_id, source_name, title, text, date_ts, date_iso, url, metadata "
+            f"FROM posts WHERE id IN ({placeholders})",
+            list(ids),
+        ).fetchall()
+        return {row[0]: self._row_to_post(row) for row in rows}
+
+    def iter_since(self, since: datetime, batch_size: int = 1000) -> Iterator[List[PostRecord]]:
+        """Posts dated at or after since, oldest first, in batches"""
+        last_ts, last_id = _to_ts(since), ""
+        conn = self._connect()
+        while True:
+            rows = conn.execute(
+                "SELECT id, source, source_id, source_name, title, text, date_ts, date_iso, url, metadata "
+                "FROM posts WHERE (date_ts > ? OR (date_ts = ? AND id > ?)) ORDER BY date_ts, id LIMIT ?",
+                (last_ts, last_ts, last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield [self._row_to_post(row) for row in rows]
+            last_ts, last_id = rows[-1][6], rows[-1][0]
+
+    def iter_changed(
+        self,
+        after_ts: int,
+        after_id: str,
+        until_ts: int,
+        batch_size: int = 5000,
+    ) -> Iterator[List[tuple]]:
+        """
+        Raw rows inserted or changed after (after_ts, after_id), oldest change first
+
+        Rows are (id, source, source_id, source_name, title, text, date_ts,
+        url, metadata, first_seen_ts, last_seen_ts, changed_ts), batched and
+        bounded by changed_ts <= until_ts so a caller can keep (changed_ts, id)
+        of the last row as its watermark. Posts that were only seen again,
+        with the same content, are not included.
+        """
+        conn = self._connect()
+        while True:
+            rows = conn.execute(
+                "SELECT id, source, source_id, source_name, title, text, date_ts, url, metadata, "
+                "first_seen_ts, last_seen_ts, changed_ts "
+                "FROM posts WHERE (changed_ts > ? OR (changed_ts = ? AND id > ?)) AND changed_ts <= ? "
+                "ORDER BY changed_ts, id LIMIT ?",
+                (after_ts, after_ts, after_id, until_ts, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            after_ts, after_id = rows[-1][11], rows[-1][0]
+
+    def count(self, source: Optional[SourceType] = None) -> int:
+        """Number of stored posts, optionally for one source"""
+        conn = self._connect()
+        if source is None:
+            return conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM posts WHERE source = ?", (source.value,)).fetchone()[0]
+
+    @staticmethod
+    def _row_to_post(row: tuple) -> PostRecord:
+        post_id, source, source_id, source_name, title, text, _, date_iso, url, metadata = row
+        return PostRecord(
+            id=post_id,
+            source=SourceType(source),
+            source_id=source_id,
+            source_name=source_name,
+            title=title,
+            text=text,
+            date_iso=datetime.fromisoformat(date_iso),
+            url=url,
+            metadata=json.loads(metadata) if metadata else {},
+        )
+
+
+# Global instance
+post_store = PostStore()
@@ -10,7 +10,7 @@ import openai
 
 from app.core.config import settings
 from app.schemas.question import QuestionResponse
-from app.schemas.scraping import ScrapedPost
+from app.services.records import PostRecord
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +25,7 @@ class QuestionGenerator:
     
     async def generate_questions(
         self,
-        posts: List[ScrapedPost],
+        posts: List[PostRecord],
         min_questions: int = 10,
         max_questions: int = 50,
     ) -> List[QuestionResponse]:
@@ -50,6 +50,9 @@ class QuestionGenerator:
             logger.warning("No posts provided for question generation")
             return []
         
+        # Stories carried by several sources first (stable, so recency order is kept otherwise)
+        posts = sorted(posts, key=lambda p: p.metadata.get("duplicate_count", 0), reverse=True)
+        
         # Prepare context from posts
         context = self._prepare_context(posts[:50])  # Limit to 50 posts
         
@@ -81,12 +84,14 @@ class QuestionGenerator:
             logger.error(f"Error generating questions with OpenAI: {e}", exc_info=True)
             return self._generate_mock_questions(min_questions)
     
-    def _prepare_context(self, posts: List[ScrapedPost]) -> str:
+    def _prepare_context(self, posts: List[PostRecord]) -> str:
         """Prepare context string from posts"""
         context_parts = []
         
         for post in posts[:30]:  # Limit to 30 posts
             source = f"[{post.source.value.upper()}]"
+            if post.metadata.get("duplicate_count"):
+                source += f" (reported {post.metadata['duplicate_count'] + 1}x)"
             title = f"{post.title}: " if post.title else ""
             text = post.text[:200]  # Limit text length
             context_parts.append(f"{source} {title}{text}")
@@ -110,7 +115,7 @@ Format each question on a new line, starting with a number:
 2. [Question text]
 ..."""
     
-    def _parse_questions(self, text: str, source_posts: List[ScrapedPost]) -> List[QuestionResponse]:
+    def _parse_questions(self, text: str, source_posts: List[PostRecord]) -> List[QuestionResponse]:
         """Parse questions from OpenAI response"""
         questions = []
         lines = text.strip().split('\n')
@@ -0,0 +1,105 @@
+"""
+Compact scraped post records
+Plain __slots__ objects for the scrape -> dedupe -> persist -> generate path;
+validated ScrapedPost models are only built when posts leave through the API.
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from app.schemas.scraping import ScrapedPost, SourceType
+
+# Slots object plus its datetime
+_RECORD_OVERHEAD = 152
+
+
+def _json_datetime(value: datetime) -> str:
+    """Same format as Pydantic's JSON mode (UTC as "Z")"""
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+class PostRecord:
+    """
+    A scraped post with the same attributes as ScrapedPost
+
+    Scrapers build records from values they already parsed, so no per-field
+    validation runs per post. Source ids and names are interned: a large
+    scrape repeats the same few hundred of them across every post.
+    """
+
+    __slots__ = ("id", "source", "source_id", "source_name", "title", "text", "date_iso", "url", "metadata")
+
+    def __init__(
+        self,
+        id: str,
+        source: SourceType,
+        source_id: str,
+        source_name: str,
+        text: str,
+        date_iso: datetime,
+        url: str,
+        title: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.source = source
+        self.source_id = sys.intern(source_id)
+        self.source_name = sys.intern(source_name)
+        self.title = title
+        self.text = text
+        self.date_iso = date_iso
+        self.url = url
+        self.metadata = metadata if metadata is not None else {}
+
+    def approx_bytes(self) -> int:
+        """Estimated memory held by this post (interned names are shared and not counted)"""
+        size = _RECORD_OVERHEAD + sys.getsizeof(self.id) + sys.getsizeof(self.text) + sys.getsizeof(self.url)
+        if self.title:
+            size += sys.getsizeof(self.title)
+        if self.metadata:
+            size += sys.getsizeof(self.metadata) + sum(sys.getsizeof(v) for v in self.metadata.values())
+        return size
+
+    def to_model(self) -> ScrapedPost:
+        """ScrapedPost for the API (fields are already typed, so validation is skipped)"""
+        return ScrapedPost.model_construct(
+            id=self.id,
+            source=self.source,
+            source_id=self.source_id,
+            source_name=self.source_name,
+            title=self.title,
+            text=self.text,
+            date_iso=self.date_iso,
+            url=self.url,
+            metadata=self.metadata,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict, identical to ScrapedPost.model_dump(mode="json")"""
+        return {
+            "id": self.id,
+            "source": self.source.value,
+            "source_id": self.source_id,
+            "source_name": self.source_name,
+            "title": self.title,
+            "text": self.text,
+            "date_iso": _json_datetime(self.date_iso),
+            "url": self.url,
+            "metadata": self.metadata,
+        }
+
+    def snapshot(self) -> "PostRecord":
+        """
+        Copy to hand to a worker thread: the dedup index keeps extending a
+        representative's metadata (sources, duplicate_count) on the event loop
+        """
+        metadata = {k: list(v) if isinstance(v, list) else v for k, v in self.metadata.items()}
+        return PostRecord(
+            self.id, self.source, self.source_id, self.source_name, self.text, self.date_iso, self.url,
+            self.title, metadata,
+        )
+
+    def __repr__(self) -> str:
+        return f"PostRecord(id={self.id!r}, source={self.source.value!r}, source_id={self.source_id!r})"
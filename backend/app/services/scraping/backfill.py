@@ -0,0 +1,491 @@
+"""
+Historical backfill
+Splits a date range into work units (per-account day slices on Twitter,
+per-channel history walks on Telegram), runs them on parallel workers per
+provider and checkpoints every page, so an interrupted backfill resumes
+where it left off.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.outbound import RequestBudget
+from app.schemas.scraping import SourceType, BackfillRequest, BackfillInfo, BackfillSourceProgress
+from app.services.corpus import corpus_exporter
+from app.services.cursor_store import cursor_store
+from app.services.records import PostRecord
+from app.services.scraping.dedup import NearDuplicateIndex
+from app.services.scraping.orchestrator import ScrapeRun, ScrapingOrchestrator, scraping_orchestrator
+
+logger = logging.getLogger(__name__)
+
+# cursor_store source holding backfill definitions; unit checkpoints live under "backfill:<id>"
+STATE_SOURCE = "backfill"
+# Statuses an interrupted process leaves behind; resumed at startup
+UNFINISHED_STATUSES = {"queued", "running"}
+# Feeds and the Polymarket catalog only expose their current items, so they
+# are fetched once per backfill with a cap that never binds in practice
+SNAPSHOT_MAX_ITEMS = 10000
+# Most recent unit errors kept on a backfill
+MAX_ERRORS = 20
+
+ALL_SOURCES = [SourceType.TWITTER, SourceType.TELEGRAM, SourceType.RSS, SourceType.POLYMARKET]
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive datetimes are treated as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def day_slices(start: datetime, end: datetime, days: int = 1) -> List[Tuple[datetime, datetime]]:
+    """[start, end) cut at UTC midnights every `days` days, newest slice first"""
+    step = timedelta(days=max(1, days))
+    boundary = start.replace(hour=0, minute=0, second=0, microsecond=0) + step
+    slices = []
+    lower = start
+    while lower < end:
+        upper = min(boundary, end)
+        slices.append((lower, upper))
+        lower, boundary = upper, boundary + step
+    slices.reverse()
+    return slices
+
+
+class BackfillUnit:
+    """One checkpointed piece of a backfill"""
+
+    def __init__(
+        self,
+        source: SourceType,
+        key: str,
+        start: datetime,
+        end: datetime,
+        target: Optional[Dict[str, Any]] = None,
+    ):
+        self.source = source
+        self.key = key
+        self.start = start
+        self.end = end
+        self.target = target
+
+
+class Backfill:
+    """A backfill over [start, end) and its progress"""
+
+    def __init__(
+        self,
+        backfill_id: str,
+        sources: List[SourceType],
+        start: datetime,
+        end: datetime,
+        created_at: Optional[datetime] = None,
+    ):
+        self.id = backfill_id
+        self.sources = sources
+        self.start = start
+        self.end = end
+        self.status = "queued"
+        self.created_at = created_at or datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.progress: Dict[str, BackfillSourceProgress] = {}
+        self.duplicates = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def checkpoint_source(self) -> str:
+        return f"{STATE_SOURCE}:{self.id}"
+
+    @property
+    def finished(self) -> bool:
+        return self.task is None or self.task.done()
+
+    def state(self) -> Dict[str, Any]:
+        """Definition and status as persisted in the cursor store"""
+        return {
+            "sources": [s.value for s in self.sources],
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def restore(cls, backfill_id: str, state: Dict[str, Any]) -> "Backfill":
+        backfill = cls(
+            backfill_id,
+            [SourceType(s) for s in state["sources"]],
+            datetime.fromisoformat(state["start"]),
+            datetime.fromisoformat(state["end"]),
+            created_at=datetime.fromisoformat(state["created_at"]),
+        )
+        backfill.status = state.get("status", "queued")
+        return backfill
+
+    def record_error(self, unit: BackfillUnit, error: str) -> None:
+        self.errors.append({"source": unit.source.value, "unit": unit.key, "error": error})
+        del self.errors[:-MAX_ERRORS]
+
+    def info(self) -> BackfillInfo:
+        return BackfillInfo(
+            id=self.id,
+            status=self.status,
+            sources=self.sources,
+            start=self.start,
+            end=self.end,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            progress=self.progress,
+            duplicates=self.duplicates,
+            errors=self.errors or None,
+            error=self.error,
+        )
+
+
+class BackfillManager:
+    """
+    Plans, runs and resumes backfills
+
+    Units of a source are worked off by a pool of workers sized like that
+    source's regular scrape concurrency; every request still goes through
+    the per-host rate limits in app.core.outbound, so a backfill runs at
+    each provider's quota and no faster. Twitter units additionally share
+    BACKFILL_TWITTER_REQUEST_BUDGET. Units left when it runs out, and units
+    stopped at their page cap, stay pending with their paging position
+    checkpointed; the backfill ends "incomplete" and a resume picks them
+    up from there.
+
+    Backfills run one at a time. Submitting the same sources and range
+    again resumes the existing backfill instead of starting over.
+    """
+
+    def __init__(self, orchestrator: ScrapingOrchestrator = scraping_orchestrator):
+        self.orchestrator = orchestrator
+        self._backfills: Dict[str, Backfill] = {}
+        self._loaded = False
+        self._stopping = False
+        # Created on first use so it binds to the running event loop
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _load(self) -> None:
+        """Backfills recorded by earlier processes"""
+        if self._loaded:
+            return
+        self._loaded = True
+        for backfill_id, state in cursor_store.get_all(STATE_SOURCE).items():
+            try:
+                self._backfills.setdefault(backfill_id, Backfill.restore(backfill_id, state))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Dropping unreadable backfill {backfill_id}: {e}")
+
+    def submit(self, request: BackfillRequest) -> Backfill:
+        """Start (or resume) a backfill and return it immediately"""
+        self._load()
+        end = _utc(request.end) if request.end else datetime.now(timezone.utc)
+        start = _utc(request.start) if request.start else end - timedelta(days=request.days_back)
+        if start >= end:
+            raise ValueError("start must be before end")
+        sources = [s for s in ALL_SOURCES if request.sources is None or s in request.sources]
+
+        digest = hashlib.sha1(f"{','.join(s.value for s in sources)}|{start.isoformat()}|{end.isoformat()}".encode())
+        backfill_id = digest.hexdigest()[:12]
+        backfill = self._backfills.get(backfill_id)
+        if backfill is None:
+            backfill = self._backfills[backfill_id] = Backfill(backfill_id, sources, start, end)
+        return self._start(backfill)
+
+    def resume(self, backfill_id: str) -> Optional[Backfill]:
+        """Run an unfinished backfill again from its checkpoints (None if unknown)"""
+        self._load()
+        backfill = self._backfills.get(backfill_id)
+        return self._start(backfill) if backfill is not None else None
+
+    def resume_interrupted(self) -> List[Backfill]:
+        """Resume backfills that were queued or running when the process stopped (startup)"""
+        self._load()
+        interrupted = [b for b in self._backfills.values() if b.status in UNFINISHED_STATUSES and b.finished]
+        for backfill in interrupted:
+            logger.info(f"Resuming interrupted backfill {backfill.id}")
+            self._start(backfill)
+        return interrupted
+
+    def get(self, backfill_id: str) -> Optional[Backfill]:
+        self._load()
+        return self._backfills.get(backfill_id)
+
+    def list_backfills(self) -> List[Backfill]:
+        """Backfills newest first"""
+        self._load()
+        return sorted(self._backfills.values(), key=lambda b: b.created_at, reverse=True)
+
+    async def cancel(self, backfill_id: str) -> Optional[Backfill]:
+        """Stop a backfill; finished units stay checkpointed for a later resume"""
+        backfill = self.get(backfill_id)
+        if backfill is None:
+            return None
+        if not backfill.finished:
+            backfill.task.cancel()
+            await asyncio.wait({backfill.task})
+        return backfill
+
+    async def shutdown(self) -> None:
+        """Stop running backfills (application shutdown) without marking them cancelled"""
+        self._stopping = True
+        tasks = [b.task for b in self._backfills.values() if not b.finished]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def _start(self, backfill: Backfill) -> Backfill:
+        if not backfill.finished or backfill.status == "completed":
+            return backfill
+        backfill.status = "queued"
+        backfill.error = None
+        self._save(backfill)
+        backfill.task = asyncio.create_task(self._run(backfill))
+        logger.info(
+            f"Backfill {backfill.id} submitted: sources={[s.value for s in backfill.sources]}, "
+            f"{backfill.start.isoformat()} -> {backfill.end.isoformat()}"
+        )
+        return backfill
+
+    def _save(self, backfill: Backfill) -> None:
+        cursor_store.set(STATE_SOURCE, backfill.id, backfill.state())
+
+    async def _run(self, backfill: Backfill) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        try:
+            async with self._lock:
+                backfill.status = "running"
+                backfill.started_at = datetime.now(timezone.utc)
+                backfill.finished_at = None
+                backfill.errors = []
+                await asyncio.to_thread(self._save, backfill)
+
+                units = await asyncio.to_thread(self._plan, backfill)
+                checkpoints = await asyncio.to_thread(cursor_store.get_all, backfill.checkpoint_source)
+                pending = self._track(backfill, units, checkpoints)
+
+                dedup = self.orchestrator.new_dedup_index()
+                budget = RequestBudget(settings.BACKFILL_TWITTER_REQUEST_BUDGET)
+                await asyncio.gather(*(
+                    self._work(backfill, source, source_units, dedup, budget)
+                    for source, source_units in pending.items()
+                ))
+
+                complete = all(p.done == p.units for p in backfill.progress.values())
+                backfill.status = "completed" if complete else "incomplete"
+                capped = sum(p.units - p.done - p.failed for p in backfill.progress.values())
+                if budget.exhausted:
+                    backfill.error = f"Twitter request budget ({budget.limit}) exhausted; resume to continue"
+                elif capped:
+                    backfill.error = f"{capped} units stopped at their page cap; resume to continue"
+                logger.info(
+                    f"Backfill {backfill.id} {backfill.status}: "
+                    f"{sum(p.posts for p in backfill.progress.values())} posts"
+                )
+
+        except asyncio.CancelledError:
+            # On shutdown the status stays as it was, so the next startup resumes it
+            if not self._stopping:
+                backfill.status = "cancelled"
+            raise
+
+        except Exception as e:
+            logger.error(f"Backfill {backfill.id} failed: {e}", exc_info=True)
+            backfill.status = "error"
+            backfill.error = str(e)
+
+        finally:
+            backfill.finished_at = datetime.now(timezone.utc)
+            await asyncio.to_thread(self._save, backfill)
+            corpus_exporter.schedule()
+
+    def _plan(self, backfill: Backfill) -> Dict[SourceType, List[BackfillUnit]]:
+        """Work units per source, most recent and most valuable first (runs in a worker thread)"""
+        units: Dict[SourceType, List[BackfillUnit]] = {}
+        start, end = backfill.start, backfill.end
+
+        if SourceType.TWITTER in backfill.sources:
+            scraper = self.orchestrator.twitter_scraper
+            accounts = scraper.prioritize(scraper.get_accounts())
+            units[SourceType.TWITTER] = [
+                BackfillUnit(
+                    SourceType.TWITTER,
+                    f"twitter:{account['username']}:{lower.date().isoformat()}",
+                    lower,
+                    upper,
+                    account,
+                )
+                for lower, upper in day_slices(start, end, settings.BACKFILL_SLICE_DAYS)
+                for account in accounts
+            ]
+
+        if SourceType.TELEGRAM in backfill.sources:
+            units[SourceType.TELEGRAM] = [
+                BackfillUnit(SourceType.TELEGRAM, f"telegram:{channel['username']}", start, end, channel)
+                for channel in self.orchestrator.telegram_scraper.get_channels()
+            ]
+
+        for source in (SourceType.RSS, SourceType.POLYMARKET):
+            if source in backfill.sources:
+                units[source] = [BackfillUnit(source, source.value, start, end)]
+
+        return units
+
+    def _track(
+        self,
+        backfill: Backfill,
+        units: Dict[SourceType, List[BackfillUnit]],
+        checkpoints: Dict[str, Dict[str, Any]],
+    ) -> Dict[SourceType, List[BackfillUnit]]:
+        """Fill progress from the checkpoints; returns the units still to run"""
+        pending: Dict[SourceType, List[BackfillUnit]] = {}
+        for source, source_units in units.items():
+            progress = backfill.progress[source.value] = BackfillSourceProgress(units=len(source_units))
+            pending[source] = []
+            for unit in source_units:
+                checkpoint = checkpoints.get(unit.key, {})
+                progress.posts += checkpoint.get("posts", 0)
+                if checkpoint.get("done"):
+                    progress.done += 1
+                else:
+                    pending[source].append(unit)
+        return pending
+
+    async def _work(
+        self,
+        backfill: Backfill,
+        source: SourceType,
+        units: List[BackfillUnit],
+        dedup: Optional[NearDuplicateIndex],
+        budget: RequestBudget,
+    ) -> None:
+        """Work off one source's units with a pool of workers"""
+        api_key = self.orchestrator.twitter_scraper.api_key
+        if source == SourceType.TWITTER and units and api_key in ("", "your_rapidapi_key_here"):
+            backfill.record_error(units[0], "RapidAPI key not configured")
+            backfill.progress[source.value].failed = len(units)
+            return
+
+        workers = {
+            SourceType.TWITTER: settings.TWITTER_MAX_CONCURRENT_ACCOUNTS,
+            SourceType.TELEGRAM: settings.TELEGRAM_MAX_CONCURRENT_CHANNELS,
+        }.get(source, 1)
+        queue: asyncio.Queue = asyncio.Queue()
+        for unit in units:
+            queue.put_nowait(unit)
+
+        async def _worker() -> None:
+            while not queue.empty() and not (source == SourceType.TWITTER and budget.exhausted):
+                unit = queue.get_nowait()
+                await self._run_unit(backfill, unit, dedup, budget)
+
+        await asyncio.gather(*(_worker() for _ in range(max(1, min(workers, len(units))))))
+
+    async def _run_unit(
+        self,
+        backfill: Backfill,
+        unit: BackfillUnit,
+        dedup: Optional[NearDuplicateIndex],
+        budget: RequestBudget,
+    ) -> None:
+        progress = backfill.progress[unit.source.value]
+        checkpoint: Dict[str, Any] = {}
+        try:
+            # Twitter slices and Telegram channels are paged; each page is
+            # checkpointed with the position of the next one, and a unit cut
+            # short (page cap, budget) stays pending so a resume continues it
+            if unit.source == SourceType.TWITTER:
+                checkpoint = await asyncio.to_thread(cursor_store.get, backfill.checkpoint_source, unit.key)
+                posts = checkpoint.get("posts", 0)
+                pages = self.orchestrator.twitter_scraper.iter_range(
+                    unit.target,
+                    unit.start,
+                    unit.end,
+                    settings.BACKFILL_TWITTER_MAX_PAGES_PER_SLICE,
+                    budget,
+                    continuation_token=checkpoint.get("token"),
+                )
+                async for page, token in pages:
+                    posts += await self._store(backfill, unit, page, dedup)
+                    await self._checkpoint(backfill, unit, done=token is None, posts=posts, token=token)
+
+            elif unit.source == SourceType.TELEGRAM:
+                checkpoint = await asyncio.to_thread(cursor_store.get, backfill.checkpoint_source, unit.key)
+                posts = checkpoint.get("posts", 0)
+                pages = self.orchestrator.telegram_scraper.iter_history(
+                    unit.target,
+                    unit.start,
+                    unit.end,
+                    checkpoint.get("before"),
+                    settings.BACKFILL_TELEGRAM_MAX_PAGES_PER_CHANNEL,
+                )
+                async for page, before in pages:
+                    posts += await self._store(backfill, unit, page, dedup)
+                    await self._checkpoint(backfill, unit, done=before is None, posts=posts, before=before)
+
+            else:
+                run = ScrapeRun(background=True)
+                days_back = max(1, math.ceil((datetime.now(timezone.utc) - unit.start).total_seconds() / 86400))
+                result = await self.orchestrator.scrape_all(
+                    [unit.source], days_back, SNAPSHOT_MAX_ITEMS, incremental=False, run=run
+                )
+                if result.get("errors"):
+                    raise RuntimeError(result["errors"][0]["error"])
+                backfill.duplicates += result.get("duplicates", 0)
+                progress.posts += result.get("total", 0)
+                await self._checkpoint(backfill, unit, done=True, posts=result.get("total", 0))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.warning(f"Backfill {backfill.id} unit {unit.key} failed: {e}")
+            progress.failed += 1
+            backfill.record_error(unit, str(e))
+            if checkpoint.get("token"):
+                # Continuation tokens can expire; the next resume restarts the slice
+                await asyncio.to_thread(
+                    cursor_store.update, backfill.checkpoint_source, unit.key, token=None
+                )
+
+    async def _store(
+        self,
+        backfill: Backfill,
+        unit: BackfillUnit,
+        posts: List[PostRecord],
+        dedup: Optional[NearDuplicateIndex],
+    ) -> int:
+        """Merge near-duplicates and persist a page; returns posts kept"""
+        updated: List[PostRecord] = []
+        if dedup is not None:
+            received = len(posts)
+            posts, updated = self.orchestrator.dedupe(dedup, posts)
+            backfill.duplicates += received - len(posts)
+        if posts or updated:
+            await self.orchestrator.persist(posts + updated)
+        backfill.progress[unit.source.value].posts += len(posts)
+        return len(posts)
+
+    async def _checkpoint(self, backfill: Backfill, unit: BackfillUnit, done: bool, posts: int, **fields: Any) -> None:
+        await asyncio.to_thread(
+            cursor_store.set, backfill.checkpoint_source, unit.key, {"done": done, "posts": posts, **fields}
+        )
+        if done:
+            backfill.progress[unit.source.value].done += 1
+
+
+# Global instance
+backfill_manager = BackfillManager()
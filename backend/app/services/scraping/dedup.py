@@ -0,0 +1,179 @@
+"""
+Near-duplicate detection for scraped posts
+MinHash signatures over word shingles, bucketed with LSH banding, so each
+new post is compared only with the few posts that share a band instead of
+with everything seen so far.
+"""
+
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_URL_RE = re.compile(r"https?://\S+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _shingles(text: str, size: int) -> np.ndarray:
+    """32-bit hashes of the word n-grams of a normalized text"""
+    tokens = _TOKEN_RE.findall(_URL_RE.sub(" ", text.lower()))
+    if len(tokens) < size:
+        grams = {" ".join(tokens)} if tokens else set()
+    else:
+        grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def _item_key(post: PostRecord) -> Optional[str]:
+    """
+    The underlying item of posts that share it on purpose: a Polymarket
+    market matched by several topics is one post per topic
+    (polymarket_<topic>_<market>), and those never fold into each other
+    """
+    if post.source != SourceType.POLYMARKET:
+        return None
+    return str(post.metadata.get("market_id") or post.id.rsplit("_", 1)[-1])
+
+
+class NearDuplicateIndex:
+    """
+    Streaming MinHash/LSH index that clusters near-identical posts
+
+    The first post of a cluster is its representative. Later members are
+    folded into it: metadata["duplicate_count"] counts them and
+    metadata["sources"] lists every source/source_id that carried
+    the story, which doubles as a popularity signal.
+
+    With window_seconds / max_posts the index is a sliding window that can
+    be shared across scrapes: clusters not extended for window_seconds,
+    and the least recently extended beyond max_posts, are forgotten.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.6,
+        shingle_size: int = 3,
+        seed: int = 1,
+        window_seconds: Optional[float] = None,
+        max_posts: Optional[int] = None,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.window_seconds = window_seconds
+        self.max_posts = max_posts
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        # Cluster number -> (signature, representative, last extended), least recently extended first
+        self._clusters: "OrderedDict[int, Tuple[np.ndarray, PostRecord, float]]" = OrderedDict()
+        self._next_cluster = 0
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def _signature(self, post: PostRecord) -> Optional[np.ndarray]:
+        text = f"{post.title or ''} {post.text}"
+        hashes = _shingles(text, self.shingle_size)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, post: PostRecord) -> Tuple[bool, PostRecord]:
+        """
+        Add a post to the index
+
+        A post already in its cluster (the representative or a member seen
+        again by a later scrape) is not counted twice.
+
+        Returns:
+            (True, post) if it starts a new cluster, or
+            (False, representative) if it belongs to an existing one
+        """
+        signature = self._signature(post)
+        if signature is None:
+            return True, post
+
+        now = time.monotonic()
+        self._evict(now)
+        keys = self._band_keys(signature)
+        candidates = {
+            cluster
+            for band, key in enumerate(keys)
+            for cluster in self._buckets[band].get(key, ())
+        }
+        item = _item_key(post)
+        best, best_similarity = None, self.threshold
+        for cluster in candidates:
+            cluster_signature, representative, _ = self._clusters[cluster]
+            if item is not None and representative.id != post.id and _item_key(representative) == item:
+                continue
+            similarity = float(np.mean(cluster_signature == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = cluster, similarity
+
+        if best is not None:
+            cluster_signature, representative, _ = self._clusters[best]
+            if post.id == representative.id:
+                # Re-scraped: take its fresh fields, keep the cluster's
+                representative.metadata.update(
+                    {k: v for k, v in post.metadata.items() if k not in ("sources", "duplicate_count")}
+                )
+            elif not any(s["id"] == post.id for s in representative.metadata.get("sources", ())):
+                _merge(representative, post)
+            self._clusters[best] = (cluster_signature, representative, now)
+            self._clusters.move_to_end(best)
+            return False, representative
+
+        cluster = self._next_cluster
+        self._next_cluster += 1
+        self._clusters[cluster] = (signature, post, now)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(cluster)
+        return True, post
+
+    def _evict(self, now: float) -> None:
+        """Forget clusters outside the window, least recently extended first"""
+        while self._clusters:
+            cluster, (signature, _, extended) = next(iter(self._clusters.items()))
+            expired = self.window_seconds is not None and extended < now - self.window_seconds
+            full = self.max_posts is not None and len(self._clusters) >= self.max_posts
+            if not expired and not full:
+                return
+            del self._clusters[cluster]
+            for band, key in enumerate(self._band_keys(signature)):
+                members = self._buckets[band][key]
+                members.remove(cluster)
+                if not members:
+                    del self._buckets[band][key]
+
+
+def _merge(representative: PostRecord, duplicate: PostRecord) -> None:
+    metadata = representative.metadata
+    sources: List[Dict[str, Any]] = metadata.setdefault(
+        "sources",
+        [{"source": representative.source.value, "source_id": representative.source_id, "id": representative.id}],
+    )
+    sources.append({"source": duplicate.source.value, "source_id": duplicate.source_id, "id": duplicate.id})
+    metadata["duplicate_count"] = metadata.get("duplicate_count", 0) + 1
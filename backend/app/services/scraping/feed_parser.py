@@ -0,0 +1,131 @@
+"""
+Feed parsing stage
+Turns raw feed XML into compact post records in a process pool, so
+large feeds and HTML-heavy summaries are parsed across cores without
+blocking the event loop. Only the small records cross back to the
+main process.
+"""
+
+import asyncio
+import calendar
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Iterable
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 1000
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def html_to_text(html: str, limit: int = MAX_TEXT_LENGTH) -> str:
+    """Strip markup and collapse whitespace, truncated to `limit` characters"""
+    if not html:
+        return ""
+    if "<" not in html and "&" not in html:
+        return " ".join(html.split())[:limit]
+    text = BeautifulSoup(html, "lxml").get_text(" ", strip=True)
+    return " ".join(text.split())[:limit]
+
+
+def parse_feed(
+    body: bytes,
+    content_type: str,
+    cutoff_ts: float,
+    since_ts: Optional[float],
+    seen_ids: Iterable[str],
+    max_entries: int,
+) -> Dict[str, Any]:
+    """
+    Parse one feed into compact records (runs in a worker process)
+
+    Args:
+        body: Raw feed bytes
+        content_type: Response Content-Type (for charset detection)
+        cutoff_ts: Skip entries published before this epoch time
+        since_ts: Skip entries at or before the feed's high-water mark
+        seen_ids: Entry ids already emitted by the previous scrape
+        max_entries: Number of leading entries to consider
+
+    Returns:
+        {"records": [...], "entry_ids": [...], "newest_ts": float | None}
+    """
+    feed = feedparser.parse(body, response_headers={"content-type": content_type})
+    seen = set(seen_ids)
+    records: List[Dict[str, Any]] = []
+    entry_ids: List[str] = []
+    newest_ts: Optional[float] = None
+
+    for entry in feed.entries[:max_entries]:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        pub_ts = calendar.timegm(parsed) if parsed else None
+
+        entry_id = entry.get("id") or entry.get("link", "")
+        entry_ids.append(entry_id)
+        if pub_ts is not None and (newest_ts is None or pub_ts > newest_ts):
+            newest_ts = pub_ts
+
+        if pub_ts is not None and pub_ts < cutoff_ts:
+            continue
+        if entry_id in seen or (since_ts is not None and pub_ts is not None and pub_ts <= since_ts):
+            continue  # Already seen by a previous scrape
+
+        title = entry.get("title", "")
+        text = html_to_text(entry.get("summary", "") or entry.get("description", "")) or title
+        records.append({
+            "entry_id": entry_id,
+            "title": title or "No title",
+            "text": text,
+            "date_ts": pub_ts,
+            "url": entry.get("link", ""),
+            "author": entry.get("author", ""),
+        })
+
+    return {"records": records, "entry_ids": entry_ids, "newest_ts": newest_ts}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        workers = settings.FEED_PARSER_WORKERS or os.cpu_count() or 1
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"Feed parser pool started ({workers} processes)")
+    return _pool
+
+
+async def parse_feed_async(*args: Any) -> Dict[str, Any]:
+    """
+    Run parse_feed in the process pool
+
+    Falls back to a worker thread when the pool is disabled
+    (FEED_PARSER_WORKERS < 0) or has died.
+    """
+    global _pool
+    if settings.FEED_PARSER_WORKERS < 0:
+        return await asyncio.to_thread(parse_feed, *args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), parse_feed, *args)
+    except BrokenProcessPool:
+        logger.warning("Feed parser pool broke; restarting it and parsing in a thread")
+        broken, _pool = _pool, None
+        if broken is not None:
+            broken.shutdown(wait=False)
+        return await asyncio.to_thread(parse_feed, *args)
+
+
+def shutdown_parser_pool() -> None:
+    """Stop the worker processes (called from the lifespan)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,182 @@
+"""
+Scrape job manager
+Runs scrapes as background jobs, each with its own id, progress and posts,
+under a cap on concurrent jobs and a per-job time budget.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.schemas.scraping import ScrapeRequest, ScrapeJobInfo
+from app.services.scraping.orchestrator import ScrapeRun, ScrapingOrchestrator, scraping_orchestrator
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {"completed", "cancelled", "timeout", "error"}
+
+
+class ScrapeJob(ScrapeRun):
+    """One submitted scrape and its isolated state"""
+
+    def __init__(self, request: ScrapeRequest):
+        super().__init__()
+        self.id = uuid.uuid4().hex[:12]
+        self.request = request
+        self.status = "queued"
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def total(self) -> int:
+        """Posts gathered, including those already evicted from memory"""
+        return len(self.posts) + self.posts.evicted
+
+    def info(self) -> ScrapeJobInfo:
+        return ScrapeJobInfo(
+            id=self.id,
+            status=self.status,
+            request=self.request,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            progress=self.progress,
+            total=self.total,
+            duplicates=self.result.get("duplicates", 0),
+            errors=self.result.get("errors"),
+            error=self.error,
+        )
+
+
+class ScrapeJobManager:
+    """
+    Schedules scrape jobs on the orchestrator
+
+    Jobs beyond SCRAPE_MAX_CONCURRENT_JOBS wait in "queued" until a slot
+    frees up, so a targeted scrape can run next to a long backfill without
+    either one seeing the other's posts. The newest SCRAPE_JOB_HISTORY
+    finished jobs are kept for result retrieval.
+    """
+
+    def __init__(self, orchestrator: ScrapingOrchestrator = scraping_orchestrator):
+        self.orchestrator = orchestrator
+        self.max_concurrent_jobs = max(1, settings.SCRAPE_MAX_CONCURRENT_JOBS)
+        self.job_timeout = settings.SCRAPE_JOB_TIMEOUT_SECONDS or None
+        self.history = max(1, settings.SCRAPE_JOB_HISTORY)
+        self._jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        # Created on first use so it binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, request: ScrapeRequest) -> ScrapeJob:
+        """Queue a scrape and return its job immediately"""
+        job = ScrapeJob(request)
+        self._jobs[job.id] = job
+        self._prune()
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Scrape job {job.id} submitted: sources={request.sources}, days_back={request.days_back}")
+        return job
+
+    async def run(self, request: ScrapeRequest) -> ScrapeJob:
+        """Submit a scrape and wait for it to finish"""
+        job = self.submit(request)
+        await asyncio.wait({job.task})
+        return job
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[ScrapeJob]:
+        """Jobs newest first"""
+        return list(reversed(self._jobs.values()))
+
+    async def cancel(self, job_id: str) -> Optional[ScrapeJob]:
+        """
+        Cancel a queued or running job and wait for it to stop
+
+        Posts gathered before cancellation stay available on the job.
+
+        Returns:
+            The job, or None if the id is unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.wait({job.task})
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel every unfinished job (application shutdown)"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _run(self, job: ScrapeJob) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+
+        request = job.request
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = datetime.now(timezone.utc)
+                job.result = await asyncio.wait_for(
+                    self.orchestrator.scrape_all(
+                        request.sources,
+                        request.days_back,
+                        request.max_items_per_source,
+                        request.incremental,
+                        run=job,
+                    ),
+                    timeout=self.job_timeout,
+                )
+                job.status = "completed"
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Scrape job {job.id} exceeded its {self.job_timeout}s budget")
+            job.status = "timeout"
+            job.error = f"Timed out after {self.job_timeout}s"
+
+        except asyncio.CancelledError:
+            logger.info(f"Scrape job {job.id} cancelled")
+            job.status = "cancelled"
+
+        except Exception as e:
+            logger.error(f"Scrape job {job.id} failed: {e}", exc_info=True)
+            job.status = "error"
+            job.error = str(e)
+
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            if job.status in ("cancelled", "timeout"):
+                job.progress.status = "cancelled"
+                job.progress.message = f"Scraping {job.status}. Posts so far: {job.total}"
+            elif job.status == "error":
+                job.progress.status = "error"
+                job.progress.message = job.error
+            self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+
+# Global instance
+scrape_jobs = ScrapeJobManager()
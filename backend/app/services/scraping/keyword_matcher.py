@@ -0,0 +1,80 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick)
+Matches every topic's keywords against a text in a single pass,
+independent of how many topics or keywords are configured.
+"""
+
+from collections import deque
+from typing import Dict, List, Set, Iterable
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive Aho-Corasick automaton mapping keywords to labels
+
+    A keyword only matches at the start of a word ("election" matches
+    "elections" but not "reelection"), which keeps short keywords like
+    "nba" from firing inside unrelated words.
+    """
+
+    def __init__(self, keywords_by_label: Dict[str, Iterable[str]]):
+        # Trie as parallel arrays: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+
+        for label, keywords in keywords_by_label.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    self._add(keyword, label)
+        self._build()
+
+    def _add(self, keyword: str, label: str) -> None:
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(keyword), label))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @property
+    def empty(self) -> bool:
+        return not self._goto[0]
+
+    def match(self, text: str) -> Set[str]:
+        """Labels whose keywords occur in text"""
+        labels: Set[str] = set()
+        if not text or self.empty:
+            return labels
+
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, label in out[node]:
+                start = index - length + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    labels.add(label)
+        return labels
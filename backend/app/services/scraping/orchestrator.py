@@ -4,117 +4,463 @@ Coordinates scraping from multiple sources
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Collection, Set
 from datetime import datetime, timedelta
 import asyncio
 
-from app.schemas.scraping import SourceType, ScrapedPost, ScrapeProgress
+from app.core.config import settings
+from app.core.retention import BoundedBuffer, RetentionPool, MB
+from app.schemas.scraping import SourceType, ScrapeProgress, SourceProgress
+from app.services.post_store import post_store
+from app.services.corpus import corpus_exporter
+from app.services.search_index import search_index
+from app.services.scraping.dedup import NearDuplicateIndex
+from app.services.records import PostRecord
+from app.services.scraping.telegram_scraper import TelegramScraper
 from app.services.scraping.twitter_scraper import TwitterScraper
 from app.services.scraping.rss_scraper import RSSScraper
 from app.services.scraping.polymarket_scraper import PolymarketScraper
 
 logger = logging.getLogger(__name__)
 
+# One byte budget for the posts of every run and job kept in memory
+posts_retention = RetentionPool("posts", settings.RETENTION_POSTS_MAX_MB * MB)
+
+
+def _new_post_buffer() -> BoundedBuffer[PostRecord]:
+    """Posts of one run, oldest evicted first (every post is also in the post store)"""
+    return BoundedBuffer(
+        max_items=settings.RETENTION_POSTS_MAX_ITEMS,
+        max_age_seconds=settings.RETENTION_POSTS_MAX_AGE_SECONDS,
+        size_of=PostRecord.approx_bytes,
+        pool=posts_retention,
+    )
+
+
+class ScrapeRun:
+    """
+    Progress and posts of a single scrape, so overlapping scrapes never share state
+    
+    Background runs (the ingestion scheduler) do not become the orchestrator's
+    last_run, so they never replace what /progress and question generation see.
+    """
+    
+    def __init__(self, background: bool = False):
+        self.background = background
+        self.progress = ScrapeProgress(
+            status="idle",
+            progress=0,
+            message=None,
+            stats=None,
+        )
+        self.posts = _new_post_buffer()
+
 
 class ScrapingOrchestrator:
     """Orchestrates scraping from multiple sources"""
     
     def __init__(self):
+        self.telegram_scraper = TelegramScraper()
         self.twitter_scraper = TwitterScraper()
         self.rss_scraper = RSSScraper()
         self.polymarket_scraper = PolymarketScraper()
         
-        self.progress = ScrapeProgress(
-            status="idle",
-            progress=0,
-            current_source=None,
-            message=None,
-            stats=None,
+        self.scrapers = {
+            SourceType.TELEGRAM: self.telegram_scraper,
+            SourceType.TWITTER: self.twitter_scraper,
+            SourceType.RSS: self.rss_scraper,
+            SourceType.POLYMARKET: self.polymarket_scraper,
+        }
+        
+        # Per-source time budgets (seconds)
+        self.source_timeouts = {
+            SourceType.TELEGRAM: settings.SCRAPE_TELEGRAM_TIMEOUT_SECONDS,
+            SourceType.TWITTER: settings.SCRAPE_TWITTER_TIMEOUT_SECONDS,
+            SourceType.RSS: settings.SCRAPE_RSS_TIMEOUT_SECONDS,
+            SourceType.POLYMARKET: settings.SCRAPE_POLYMARKET_TIMEOUT_SECONDS,
+        }
+        self.max_concurrent_sources = max(1, settings.SCRAPE_MAX_CONCURRENT_SOURCES)
+        
+        # One sliding-window dedup index for every scrape, so stories repeated
+        # across scheduler passes and interactive scrapes still cluster
+        self.dedup_index = self.new_dedup_index(
+            window_seconds=settings.DEDUP_WINDOW_HOURS * 3600,
+            max_posts=settings.DEDUP_WINDOW_MAX_POSTS,
         )
         
-        self.posts: List[ScrapedPost] = []
+        # Most recently started run (what /progress and question generation see)
+        self.last_run = ScrapeRun()
     
     async def scrape_all(
         self,
         sources: Optional[List[SourceType]] = None,
         days_back: int = 2,
         max_items_per_source: int = 100,
+        incremental: bool = True,
+        run: Optional[ScrapeRun] = None,
+        targets: Optional[Dict[SourceType, Collection[str]]] = None,
     ) -> Dict[str, Any]:
         """
-        Scrape from all specified sources
+        Scrape from all specified sources concurrently
+        
+        Each source runs under its own time budget; results are merged as
+        soon as a source yields them, so a slow or failing source does not
+        hold back the others.
         
         Args:
             sources: List of sources to scrape, or None for all
             days_back: Number of days to look back
             max_items_per_source: Maximum items per source
-            
+            incremental: Only fetch items newer than each source's cursor
+            run: State to record progress and posts in (a fresh run if None)
+            targets: Per-source feed names / usernames to limit the scrape to
+        
         Returns:
             Dictionary with scraping results and stats
         """
-        logger.info(f"Starting scraping operation: sources={sources}, days_back={days_back}")
+        result: Dict[str, Any] = {}
+        async for event in self.stream_all(
+            sources, days_back, max_items_per_source, incremental, run, targets
+        ):
+            if event["type"] == "done":
+                result = event
+        
+        return {
+            "success": result.get("success", True),
+            "total": result.get("total", 0),
+            "duplicates": result.get("duplicates", 0),
+            "stats": result.get("stats", {}),
+            "errors": result.get("errors"),
+        }
+    
+    async def stream_all(
+        self,
+        sources: Optional[List[SourceType]] = None,
+        days_back: int = 2,
+        max_items_per_source: int = 100,
+        incremental: bool = True,
+        run: Optional[ScrapeRun] = None,
+        targets: Optional[Dict[SourceType, Collection[str]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scrape from all specified sources concurrently, yielding events as they happen
+        
+        Events:
+            {"type": "posts", "source": str, "posts": List[PostRecord]} for every batch
+            {"type": "duplicates", "posts": List[PostRecord]} representatives whose
+                duplicate_count / sources changed because a batch folded into them
+            {"type": "source_done", "source": str, "status": str, "error": Optional[str]}
+            {"type": "done", "success": bool, "total": int, "duplicates": int, "stats": dict, "errors": list | None} last;
+                success is False when every source failed
         
-        self.progress.status = "scraping"
-        self.progress.progress = 0
-        self.posts = []
+        Near-identical posts (across sources and, within DEDUP_WINDOW_HOURS,
+        across scrapes) are clustered on the fly (DEDUP_ENABLED): only the
+        first post of a cluster is kept, the rest are counted in its
+        metadata. A cluster first seen by an earlier scrape is carried by
+        this one through its representative.
+        
+        Args:
+            sources: List of sources to scrape, or None for all
+            days_back: Number of days to look back
+            max_items_per_source: Maximum items per source
+            incremental: Only fetch items newer than each source's cursor
+            run: State to record progress and posts in (a fresh run if None)
+            targets: Per-source feed names / usernames to limit the scrape to
+        """
+        logger.info(f"Starting scraping operation: sources={sources}, days_back={days_back}")
         
         # Determine which sources to scrape
         if sources is None:
-            sources = [SourceType.TWITTER, SourceType.RSS, SourceType.POLYMARKET]
+            sources = [SourceType.TELEGRAM, SourceType.TWITTER, SourceType.RSS, SourceType.POLYMARKET]
+        
+        run = run or ScrapeRun()
+        if not run.background:
+            self.last_run = run
+        run.posts = _new_post_buffer()
+        run.progress = ScrapeProgress(
+            status="scraping",
+            progress=0,
+            message=f"Scraping {', '.join(s.value for s in sources)}...",
+            stats=None,
+            sources={source.value: SourceProgress() for source in sources},
+        )
         
         stats = {source.value: 0 for source in sources}
         errors = []
+        dedup = self.dedup_index
+        carried: Set[str] = set()
+        duplicates = 0
         
         total_sources = len(sources)
+        # Bounded so a fast producer cannot outrun a slow consumer (e.g. a streaming client)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        semaphore = asyncio.Semaphore(self.max_concurrent_sources)
+        tasks = [
+            asyncio.create_task(
+                self._scrape_source(
+                    source, days_back, max_items_per_source, incremental, semaphore, queue, run.progress,
+                    (targets or {}).get(source),
+                )
+            )
+            for source in sources
+        ]
         
-        for idx, source in enumerate(sources):
-            try:
-                self.progress.current_source = source.value
-                self.progress.message = f"Scraping {source.value}..."
+        completed = False
+        try:
+            done_count = 0
+            while done_count < total_sources:
+                kind, source, payload = await queue.get()
                 
-                if source == SourceType.TWITTER:
-                    posts = await self.twitter_scraper.scrape(days_back, max_items_per_source)
-                elif source == SourceType.RSS:
-                    posts = await self.rss_scraper.scrape(days_back, max_items_per_source)
-                elif source == SourceType.POLYMARKET:
-                    posts = await self.polymarket_scraper.scrape(days_back, max_items_per_source)
-                else:
-                    logger.warning(f"Unknown source: {source}")
+                if kind == "posts":
+                    updated: List[PostRecord] = []
+                    if dedup is not None:
+                        received = payload
+                        payload, updated = self.dedupe(dedup, payload, carried, sources)
+                        kept_ids = {post.id for post in payload}
+                        duplicates += sum(1 for post in received if post.id not in kept_ids)
+                    # Merge as soon as the scraper yields
+                    run.posts.extend(payload)
+                    await self.persist(payload + updated)
+                    # A carried representative counts for its own source, not the one that folded into it
+                    by_source: Dict[str, List[PostRecord]] = {}
+                    for post in payload:
+                        by_source.setdefault(post.source.value, []).append(post)
+                    for name, posts in by_source.items():
+                        stats[name] += len(posts)
+                        yield {"type": "posts", "source": name, "posts": posts}
+                    if updated:
+                        yield {"type": "duplicates", "posts": updated}
                     continue
                 
-                self.posts.extend(posts)
-                stats[source.value] = len(posts)
-                
-                logger.info(f"Scraped {len(posts)} posts from {source.value}")
-                
-            except Exception as e:
-                logger.error(f"Error scraping {source.value}: {e}", exc_info=True)
-                errors.append({
+                done_count += 1
+                if payload:
+                    errors.append({
+                        "source": source.value,
+                        "error": payload,
+                    })
+                run.progress.progress = int((done_count / total_sources) * 100)
+                yield {
+                    "type": "source_done",
                     "source": source.value,
-                    "error": str(e),
-                })
-            
-            self.progress.progress = int(((idx + 1) / total_sources) * 100)
+                    "status": run.progress.sources[source.value].status,
+                    "error": payload,
+                }
+            completed = True
+        finally:
+            if not completed:
+                # Client went away or we were cancelled: stop remaining scrapers
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                run.progress.status = "cancelled"
+                run.progress.current_source = None
+                run.progress.message = f"Scraping cancelled. Posts so far: {sum(stats.values())}"
         
-        self.progress.status = "completed"
-        self.progress.progress = 100
-        self.progress.current_source = None
-        self.progress.message = f"Scraping complete. Total posts: {len(self.posts)}"
-        self.progress.stats = stats
+        run.progress.status = "completed"
+        run.progress.progress = 100
+        run.progress.current_source = None
+        run.progress.message = f"Scraping complete. Total posts: {sum(stats.values())} ({duplicates} duplicates merged)"
+        run.progress.stats = stats
+        if sum(stats.values()) or duplicates:
+            corpus_exporter.schedule()
         
-        return {
-            "success": True,
-            "total": len(self.posts),
+        yield {
+            "type": "done",
+            "success": not errors or len(errors) < total_sources,
+            "total": sum(stats.values()),
+            "duplicates": duplicates,
             "stats": stats,
             "errors": errors if errors else None,
         }
     
+    async def _scrape_source(
+        self,
+        source: SourceType,
+        days_back: int,
+        max_items: int,
+        incremental: bool,
+        semaphore: asyncio.Semaphore,
+        queue: asyncio.Queue,
+        progress: ScrapeProgress,
+        keys: Optional[Collection[str]] = None,
+    ) -> None:
+        """
+        Scrape a single source under the concurrency cap and its time budget
+        
+        Every batch is put on the queue as ("posts", source, posts); a final
+        ("source_done", source, error message or None) always follows.
+        Batches delivered before a timeout are kept. keys, when given, is
+        passed on so the scraper only visits those feeds / accounts.
+        """
+        source_progress = progress.sources[source.value]
+        scraper = self.scrapers.get(source)
+        if scraper is None:
+            logger.warning(f"Unknown source: {source}")
+            source_progress.status = "skipped"
+            await queue.put(("source_done", source, None))
+            return
+        
+        error: Optional[str] = None
+        timeout = self.source_timeouts.get(source)
+        async with semaphore:
+            source_progress.status = "scraping"
+            progress.current_source = source.value
+            started = time.monotonic()
+            try:
+                await self._consume(scraper, source, days_back, max_items, incremental, keys, queue, source_progress, timeout)
+                source_progress.status = "completed"
+                logger.info(f"Scraped {source_progress.posts} posts from {source.value}")
+            
+            except asyncio.TimeoutError:
+                logger.warning(f"Scraping {source.value} exceeded its {timeout}s budget")
+                source_progress.status = "timeout"
+                error = f"Timed out after {timeout}s"
+            
+            except Exception as e:
+                logger.error(f"Error scraping {source.value}: {e}", exc_info=True)
+                source_progress.status = "error"
+                error = str(e)
+            
+            finally:
+                source_progress.elapsed_ms = int((time.monotonic() - started) * 1000)
+                if progress.current_source == source.value:
+                    progress.current_source = next(
+                        (name for name, p in progress.sources.items() if name != source.value and p.status == "scraping"),
+                        None,
+                    )
+        
+        source_progress.error = error
+        await queue.put(("source_done", source, error))
+    
+    async def _consume(
+        self,
+        scraper: Any,
+        source: SourceType,
+        days_back: int,
+        max_items: int,
+        incremental: bool,
+        keys: Optional[Collection[str]],
+        queue: asyncio.Queue,
+        source_progress: SourceProgress,
+        timeout: Optional[float],
+    ) -> None:
+        """
+        Drain a scraper's stream onto the queue
+        
+        The time budget covers fetching only: time spent waiting for room
+        on the (bounded) queue behind a slow consumer extends the deadline.
+        
+        Raises:
+            asyncio.TimeoutError: When fetching exceeded the budget
+        """
+        extra = {"keys": keys} if keys is not None else {}
+        batches = scraper.stream(days_back, max_items, incremental, **extra).__aiter__()
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    batch = await asyncio.wait_for(batches.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    return
+                source_progress.posts += len(batch)
+                blocked = time.monotonic()
+                await queue.put(("posts", source, batch))
+                if deadline is not None:
+                    deadline += time.monotonic() - blocked
+        finally:
+            await batches.aclose()
+    
+    def new_dedup_index(
+        self,
+        window_seconds: Optional[float] = None,
+        max_posts: Optional[int] = None,
+    ) -> Optional[NearDuplicateIndex]:
+        if not settings.DEDUP_ENABLED:
+            return None
+        return NearDuplicateIndex(
+            num_perm=settings.DEDUP_NUM_PERM,
+            bands=settings.DEDUP_BANDS,
+            threshold=settings.DEDUP_SIMILARITY_THRESHOLD,
+            window_seconds=window_seconds,
+            max_posts=max_posts,
+        )
+    
+    def dedupe(
+        self,
+        index: NearDuplicateIndex,
+        posts: List[PostRecord],
+        carried: Optional[Set[str]] = None,
+        sources: Optional[Collection[SourceType]] = None,
+    ) -> Tuple[List[PostRecord], List[PostRecord]]:
+        """
+        Split a batch into new cluster representatives and the existing
+        representatives that absorbed the rest
+        
+        carried, when given, holds the ids of the posts the run already
+        carries (and is updated): a post folding into a cluster from an
+        earlier run brings that cluster's representative into this run once,
+        instead of the story going missing from it. With sources, only
+        representatives from those sources are carried; the others are only
+        reported as updated.
+        
+        Returns:
+            Tuple of (posts to keep, previously kept posts whose metadata changed)
+        """
+        kept: List[PostRecord] = []
+        kept_ids = set()
+        updated: Dict[str, PostRecord] = {}
+        for post in posts:
+            is_new, representative = index.add(post)
+            if is_new:
+                kept.append(post)
+                kept_ids.add(post.id)
+            elif representative.id in kept_ids:
+                continue
+            elif (
+                carried is not None
+                and representative.id not in carried
+                and (sources is None or representative.source in sources)
+            ):
+                kept.append(representative)
+                kept_ids.add(representative.id)
+            else:
+                updated[representative.id] = representative
+        if carried is not None:
+            carried.update(kept_ids)
+        # Their metadata grew since the runs holding them measured it
+        posts_retention.resize(updated.values())
+        return kept, list(updated.values())
+    
+    async def persist(self, posts: List[PostRecord]) -> None:
+        """
+        Upsert a batch into the post store (history survives restarts and
+        later scrapes) and into the search index
+        
+        The worker threads get snapshots taken here on the loop, so a
+        representative extended by another batch meanwhile is never encoded
+        half-updated.
+        """
+        posts = [post.snapshot() for post in posts]
+        try:
+            await asyncio.to_thread(post_store.upsert_many, posts)
+        except Exception as e:
+            logger.error(f"Error persisting {len(posts)} posts: {e}", exc_info=True)
+        
+        if settings.SEARCH_INDEX_ENABLED:
+            try:
+                await asyncio.to_thread(search_index.add_many, posts)
+            except Exception as e:
+                logger.error(f"Error indexing {len(posts)} posts: {e}", exc_info=True)
+    
     def get_progress(self) -> ScrapeProgress:
-        """Get current scraping progress"""
-        return self.progress
+        """Get progress of the most recent scrape"""
+        return self.last_run.progress
     
-    def get_posts(self) -> List[ScrapedPost]:
-        """Get scraped posts"""
-        return self.posts
+    def get_posts(self) -> List[PostRecord]:
+        """Get posts of the most recent scrape still held in memory"""
+        return list(self.last_run.posts)
 
 
 # Global instance
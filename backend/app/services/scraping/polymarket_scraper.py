@@ -2,91 +2,232 @@
 Polymarket scraper service
 """
 
+import asyncio
+import contextlib
 import logging
-from typing import List
-from datetime import datetime, timedelta
-import httpx
-
-from app.schemas.scraping import ScrapedPost, SourceType
+from typing import List, Dict, AsyncIterator, Optional, Set, Tuple
+from datetime import datetime
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services import sources_store
+from app.services.cursor_store import cursor_store
+from app.services.polymarket_mirror import polymarket_mirror
+from app.services.scraping.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
 
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _market_id(market: dict) -> Optional[int]:
+    """Gamma market ids are numeric strings; None if missing or malformed"""
+    return _to_int(market.get("id"))
+
+
 class PolymarketScraper:
     """Polymarket scraper. Uses topics from sources store."""
     
     def __init__(self):
         self.base_url = "https://gamma-api.polymarket.com"
+        self._topics = sources_store.SourceSnapshot("polymarket_topics", build=self._build_topics)
+    
+    @staticmethod
+    def _build_topics(topics) -> Tuple[List[dict], KeywordMatcher]:
+        """Topics plus the keyword matcher compiled over all of them"""
+        topics = list(topics)
+        return topics, KeywordMatcher({t["name"]: t.get("keywords") or [t["name"]] for t in topics})
     
-    def _get_topics(self):
-        """Load topics from sources store."""
+    def get_topics(self) -> Tuple[List[dict], KeywordMatcher]:
+        """Enabled topics and their matcher (rebuilt only when the sources store changes)."""
         try:
-            from app.services import sources_store
-            stored = sources_store.get_polymarket_topics()
-            return [t for t in stored if t.get("enabled", True)]
+            return self._topics.get()
         except Exception as e:
             logger.warning(f"Could not load Polymarket topics from store: {e}")
-            return [
+            return self._build_topics([
                 {"name": "Crypto", "keywords": ["bitcoin", "ethereum", "crypto"]},
                 {"name": "Politics", "keywords": ["election", "president", "politics"]},
-            ]
+            ])
     
-    async def scrape(self, days_back: int, max_items: int) -> List[ScrapedPost]:
+    async def scrape(self, days_back: int, max_items: int, incremental: bool = True) -> List[PostRecord]:
         """Scrape Polymarket markets (from sources store)."""
-        topics = self._get_topics()
+        posts = []
+        async for batch in self.stream(days_back, max_items, incremental):
+            posts.extend(batch)
+        logger.info(f"Scraped {len(posts)} Polymarket posts")
+        return posts
+    
+    async def stream(
+        self,
+        days_back: int,
+        max_items: int,
+        incremental: bool = True,
+    ) -> AsyncIterator[List[PostRecord]]:
+        """
+        Yield matched markets in batches.
+        
+        The local catalog mirror is refreshed once per run (only markets
+        changed since the last sync are fetched) and every market is matched
+        against all topics' keywords in a single pass, so the request count
+        does not grow with the number of topics. A market matching several
+        topics yields one post per topic.
+        
+        With incremental=True a topic only emits markets newer than its
+        last-seen market id. Topics without a cursor (new topics) and
+        non-incremental runs are also matched against the whole mirror,
+        without any further API calls.
+        """
+        topics, matcher = self.get_topics()
         logger.info(f"Scraping Polymarket: {len(topics)} topics")
+        if not topics:
+            return
         
-        posts = []
-        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+        last_seen = {
+            t["name"]: _to_int(cursor_store.get("polymarket", t["name"]).get("last_market_id"))
+            for t in topics
+        }
+        newest = dict(last_seen)
+        emitted_keys: Set[Tuple[str, str]] = set()
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for topic in topics[:max_items]:
-                try:
-                    # Fetch markets (simplified - adjust based on actual API)
-                    response = await client.get(
-                        f"{self.base_url}/markets",
-                        params={
-                            "limit": min(20, max_items),
-                            "active": True,
-                        }
+        try:
+            # Markets changed since the last sync, matched for every topic; closed on
+            # the way out so stopping early releases the mirror's sync lock at once
+            async with contextlib.aclosing(polymarket_mirror.refresh()) as updates:
+                async for markets in updates:
+                    posts = self._match(
+                        markets,
+                        topics,
+                        matcher,
+                        last_seen if incremental else None,
+                        newest,
+                        emitted_keys,
+                        max_items - len(emitted_keys),
                     )
-                    
-                    if response.status_code != 200:
-                        logger.warning(f"Failed to fetch Polymarket markets: {response.status_code}")
-                        continue
-                    
-                    data = response.json()
-                    markets = data if isinstance(data, list) else data.get("markets", [])
-                    
-                    for market in markets[:min(10, max_items)]:
-                        try:
-                            # Parse market data
-                            end_date = datetime.fromisoformat(
-                                market.get("end_date_iso", datetime.utcnow().isoformat()).replace('Z', '+00:00')
-                            )
-                            
-                            post = ScrapedPost(
-                                id=f"polymarket_{market.get('id', hash(market.get('question', '')))}",
-                                source=SourceType.POLYMARKET,
-                                source_id=topic["name"],
-                                source_name=f"Polymarket - {topic['name']}",
-                                title=market.get("question", "No title"),
-                                text=market.get("description", market.get("question", "")),
-                                date_iso=datetime.utcnow(),
-                                url=f"https://polymarket.com/event/{market.get('slug', '')}",
-                                metadata={
-                                    "volume": market.get("volume", 0),
-                                    "end_date": end_date.isoformat(),
-                                    "active": market.get("active", False),
-                                },
-                            )
-                            posts.append(post)
-                            
-                        except Exception as e:
-                            logger.error(f"Error parsing Polymarket market: {e}")
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping Polymarket topic {topic['name']}: {e}")
+                    if posts:
+                        yield posts
+                    if len(emitted_keys) >= max_items:
+                        return
+            
+            # Catch-up pass over the mirror for topics that need the full catalog
+            full_pass = [t for t in topics if not incremental or last_seen[t["name"]] is None]
+            if full_pass and len(emitted_keys) < max_items:
+                posts = await asyncio.to_thread(
+                    self._match_mirror, full_pass, matcher, newest, emitted_keys, max_items - len(emitted_keys)
+                )
+                if posts:
+                    yield posts
+        
+        finally:
+            # Only advance topics past markets that were actually emitted
+            for name, market_id in newest.items():
+                if market_id != last_seen[name]:
+                    await asyncio.to_thread(
+                        cursor_store.update,
+                        "polymarket",
+                        name,
+                        last_market_id=market_id,
+                    )
+    
+    def _match_mirror(
+        self,
+        topics: List[dict],
+        matcher: KeywordMatcher,
+        newest: Dict[str, Optional[int]],
+        emitted_keys: Set[Tuple[str, str]],
+        limit: int,
+    ) -> List[PostRecord]:
+        """Match the mirrored active markets (highest volume first) for the given topics"""
+        markets = polymarket_mirror.query(
+            order_by="volume",
+            limit=settings.POLYMARKET_CATALOG_PAGE_SIZE * settings.POLYMARKET_CATALOG_MAX_PAGES,
+        )
+        return self._match(markets, topics, matcher, None, newest, emitted_keys, limit)
+    
+    def _match(
+        self,
+        markets: List[dict],
+        topics: List[dict],
+        matcher: KeywordMatcher,
+        last_seen: Optional[Dict[str, Optional[int]]],
+        newest: Dict[str, Optional[int]],
+        emitted_keys: Set[Tuple[str, str]],
+        limit: int,
+    ) -> List[PostRecord]:
+        """
+        Turn markets into per-topic posts
+        
+        Args:
+            markets: Raw Gamma markets
+            topics: Topics to emit posts for
+            matcher: Keyword matcher over all topics
+            last_seen: Per-topic market id cursors to skip behind (None = skip nothing)
+            newest: Per-topic newest emitted market id, updated in place
+            emitted_keys: (topic, market id) pairs already emitted this run, updated in place
+            limit: Maximum number of posts
+        """
+        posts = []
+        for market in markets:
+            if len(posts) >= limit:
+                break
+            if not market.get("active", True) or market.get("closed"):
+                continue
+            
+            matched = matcher.match(f"{market.get('question', '')}\n{market.get('description', '')}")
+            if not matched:
+                continue
+            
+            market_id = _market_id(market)
+            for topic in topics:
+                name = topic["name"]
+                key = (name, str(market.get("id")))
+                if name not in matched or key in emitted_keys or len(posts) >= limit:
+                    continue
+                if market_id is not None and last_seen is not None:
+                    if last_seen[name] is not None and market_id <= last_seen[name]:
+                        continue  # Already seen by a previous scrape
+                post = self._to_post(market, topic)
+                if post is None:
+                    continue
+                posts.append(post)
+                emitted_keys.add(key)
+                if market_id is not None and (newest[name] is None or market_id > newest[name]):
+                    newest[name] = market_id
         
-        logger.info(f"Scraped {len(posts)} Polymarket posts")
         return posts
+    
+    def _to_post(self, market: dict, topic: dict) -> Optional[PostRecord]:
+        """Build the post for a market matched to a topic"""
+        market_key = market.get("id") or market.get("slug")
+        if not market_key:
+            return None
+        try:
+            # Parse market data
+            end_date = datetime.fromisoformat(
+                (market.get("endDate") or market.get("end_date_iso") or datetime.utcnow().isoformat()).replace('Z', '+00:00')
+            )
+            
+            return PostRecord(
+                id=f"polymarket_{topic['name']}_{market_key}",
+                source=SourceType.POLYMARKET,
+                source_id=topic["name"],
+                source_name=f"Polymarket - {topic['name']}",
+                title=market.get("question", "No title"),
+                text=market.get("description") or market.get("question", ""),
+                date_iso=datetime.utcnow(),
+                url=f"https://polymarket.com/event/{market.get('slug', '')}",
+                metadata={
+                    "market_id": market.get("id"),
+                    "volume": market.get("volume", 0),
+                    "end_date": end_date.isoformat(),
+                    "active": market.get("active", False),
+                },
+            )
+        
+        except Exception as e:
+            logger.error(f"Error parsing Polymarket market: {e}")
+            return None
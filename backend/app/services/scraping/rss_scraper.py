@@ -2,24 +2,37 @@
 RSS scraper service
 """
 
+import asyncio
+import calendar
 import logging
-from typing import List
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Collection, Tuple
 from datetime import datetime, timedelta
 import feedparser
-from app.schemas.scraping import ScrapedPost, SourceType
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services import sources_store
+from app.services.cursor_store import cursor_store
+from app.services.scraping.feed_parser import parse_feed_async
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = f"StreakAdminBot/1.0 feedparser/{feedparser.__version__}"
+
 
 class RSSScraper:
     """RSS feed scraper. Uses feeds from sources store."""
     
-    def _get_feeds(self):
-        """Load feeds from sources store."""
+    def __init__(self):
+        self.feed_stats: Dict[str, Dict[str, Any]] = {}
+        self._feeds = sources_store.SourceSnapshot("rss_feeds")
+    
+    def get_feeds(self):
+        """Enabled feeds from the sources store (cached until the store changes)."""
         try:
-            from app.services import sources_store
-            stored = sources_store.get_rss_feeds()
-            return [f for f in stored if f.get("enabled", True)]
+            return self._feeds.get()
         except Exception as e:
             logger.warning(f"Could not load RSS feeds from store: {e}")
             return [
@@ -27,62 +40,173 @@ class RSSScraper:
                 {"name": "BBC News", "url": "http://feeds.bbci.co.uk/news/rss.xml", "category": "general"},
             ]
     
-    async def scrape(self, days_back: int, max_items: int) -> List[ScrapedPost]:
+    async def scrape(self, days_back: int, max_items: int, incremental: bool = True) -> List[PostRecord]:
         """Scrape RSS feeds (from sources store)."""
-        feeds = self._get_feeds()
+        posts = []
+        async for batch in self.stream(days_back, max_items, incremental):
+            posts.extend(batch)
+        logger.info(f"Scraped {len(posts)} RSS posts")
+        return posts
+    
+    async def stream(
+        self,
+        days_back: int,
+        max_items: int,
+        incremental: bool = True,
+        keys: Optional[Collection[str]] = None,
+    ) -> AsyncIterator[List[PostRecord]]:
+        """
+        Yield posts in batches, one per feed, in the order feeds finish.
+        
+        Feeds are fetched concurrently (RSS_MAX_CONCURRENT_FEEDS) and parsed in
+        the feed parser process pool. With incremental=True feeds are requested conditionally
+        (ETag / Last-Modified) and entries already seen by the previous scrape
+        are skipped. keys limits the run to the feeds with those names.
+        
+        At most max_items posts are yielded. A feed's cursor only advances
+        once all of its posts are emitted, so a feed cut short by the cap (or
+        not reached) is read again by the next scrape.
+        """
+        feeds = self.get_feeds()
+        if keys is not None:
+            feeds = [f for f in feeds if f["name"] in keys]
         logger.info(f"Scraping RSS feeds: {len(feeds)}")
         
-        posts = []
         cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+        semaphore = asyncio.Semaphore(max(1, settings.RSS_MAX_CONCURRENT_FEEDS))
+        tasks = [
+            asyncio.create_task(self._scrape_feed(feed_config, cutoff_date, max_items, incremental, semaphore))
+            for feed_config in feeds
+        ]
         
-        for feed_config in feeds[:max_items]:
-            try:
-                # Parse feed
-                feed = feedparser.parse(feed_config["url"])
-                
-                if not feed.entries:
-                    logger.warning(f"No entries found in feed: {feed_config['name']}")
-                    continue
-                
-                for entry in feed.entries[:min(20, max_items)]:
-                    try:
-                        # Parse date
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_date = datetime(*entry.published_parsed[:6])
-                        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            pub_date = datetime(*entry.updated_parsed[:6])
-                        else:
-                            pub_date = datetime.utcnow()
-                        
-                        if pub_date < cutoff_date:
-                            continue
-                        
-                        # Extract text content
-                        text = entry.get('summary', '') or entry.get('description', '')
-                        if not text:
-                            text = entry.get('title', '')
-                        
-                        post = ScrapedPost(
-                            id=f"rss_{feed_config['name']}_{entry.get('id', hash(entry.link))}",
-                            source=SourceType.RSS,
-                            source_id=feed_config["name"],
-                            source_name=feed_config["name"],
-                            title=entry.get('title', 'No title'),
-                            text=text[:1000],  # Limit text length
-                            date_iso=pub_date,
-                            url=entry.get('link', ''),
-                            metadata={
-                                "category": feed_config["category"],
-                                "author": entry.get('author', ''),
-                            },
-                        )
-                        posts.append(post)
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing RSS entry: {e}")
-                
-            except Exception as e:
-                logger.error(f"Error scraping RSS feed {feed_config['name']}: {e}")
+        emitted = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                if emitted >= max_items:
+                    break
+                feed_config, posts, cursor_update = await finished
+                if len(posts) > max_items - emitted:
+                    posts = posts[:max_items - emitted]
+                elif cursor_update:
+                    await asyncio.to_thread(cursor_store.update, "rss", feed_config["url"], **cursor_update)
+                if posts:
+                    emitted += len(posts)
+                    yield posts
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _scrape_feed(
+        self,
+        feed_config: Dict[str, Any],
+        cutoff_date: datetime,
+        max_items: int,
+        incremental: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[Dict[str, Any], List[PostRecord], Optional[Dict[str, Any]]]:
+        """
+        Fetch (conditionally), parse and convert a single feed
         
-        logger.info(f"Scraped {len(posts)} RSS posts")
-        return posts
+        Returns:
+            Tuple of (feed, posts, cursor fields to store once the posts are emitted; None if unchanged)
+        """
+        cursor = cursor_store.get("rss", feed_config["url"])
+        since_ts = cursor.get("newest_ts") if incremental else None
+        seen_ids = cursor.get("recent_ids", []) if incremental else []
+        
+        headers = {"User-Agent": USER_AGENT}
+        if incremental and cursor.get("etag"):
+            headers["If-None-Match"] = cursor["etag"]
+        if incremental and cursor.get("modified"):
+            headers["If-Modified-Since"] = cursor["modified"]
+        
+        posts = []
+        try:
+            async with semaphore:
+                started = time.monotonic()
+                response = await outbound.request(
+                    "GET",
+                    feed_config["url"],
+                    headers=headers,
+                    timeout=settings.RSS_FETCH_TIMEOUT,
+                )
+                fetch_ms = int((time.monotonic() - started) * 1000)
+            
+            if response.status_code == 304:
+                saved = cursor.get("last_bytes", 0)
+                self._record_fetch(feed_config, 304, fetch_ms, 0, saved)
+                logger.info(f"RSS feed not modified since last scrape: {feed_config['name']} ({fetch_ms}ms)")
+                return feed_config, [], None
+            
+            if response.status_code != 200:
+                logger.warning(f"Failed to fetch RSS feed {feed_config['name']}: HTTP {response.status_code}")
+                return feed_config, [], None
+            
+            body = response.content
+            # CPU-bound parse + HTML stripping in the process pool
+            parsed = await parse_feed_async(
+                body,
+                response.headers.get("content-type", ""),
+                calendar.timegm(cutoff_date.timetuple()),
+                since_ts,
+                seen_ids,
+                min(20, max_items),
+            )
+            
+            if not parsed["entry_ids"]:
+                logger.warning(f"No entries found in feed: {feed_config['name']}")
+            
+            for record in parsed["records"]:
+                date_ts = record["date_ts"]
+                posts.append(PostRecord(
+                    id=f"rss_{feed_config['name']}_{record['entry_id']}",
+                    source=SourceType.RSS,
+                    source_id=feed_config["name"],
+                    source_name=feed_config["name"],
+                    title=record["title"],
+                    text=record["text"],
+                    date_iso=datetime.utcfromtimestamp(date_ts) if date_ts is not None else datetime.utcnow(),
+                    url=record["url"],
+                    metadata={
+                        "category": feed_config["category"],
+                        "author": record["author"],
+                    },
+                ))
+            
+        except Exception as e:
+            logger.error(f"Error scraping RSS feed {feed_config['name']}: {e}")
+            return feed_config, [], None
+        
+        self._record_fetch(feed_config, 200, fetch_ms, len(body), 0)
+        cursor_update = {
+            "etag": response.headers.get("etag"),
+            "modified": response.headers.get("last-modified"),
+            "newest_ts": max(filter(None, [parsed["newest_ts"], cursor.get("newest_ts")]), default=None),
+            "recent_ids": parsed["entry_ids"][:50],
+            "last_bytes": len(body),
+        }
+        return feed_config, posts, cursor_update
+    
+    def _record_fetch(
+        self,
+        feed_config: Dict[str, Any],
+        status: int,
+        fetch_ms: int,
+        size: int,
+        saved: int,
+    ) -> None:
+        """Keep per-feed fetch latency and bytes saved by conditional requests"""
+        previous = self.feed_stats.get(feed_config["url"], {})
+        self.feed_stats[feed_config["url"]] = {
+            "name": feed_config["name"],
+            "status": status,
+            "fetch_ms": fetch_ms,
+            "bytes": size,
+            "bytes_saved_total": previous.get("bytes_saved_total", 0) + saved,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+        }
+    
+    def get_feed_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-feed fetch stats since startup, keyed by feed URL"""
+        return self.feed_stats
@@ -0,0 +1,352 @@
+"""
+Continuous ingestion scheduler
+Polls every feed, account, channel and the Polymarket catalog on its own
+interval, adapted to how often each one actually publishes, so polling
+cost follows the rate of new content rather than the number of sources.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Set
+
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services import sources_store
+from app.services.cursor_store import cursor_store
+from app.services.scraping.orchestrator import ScrapeRun, ScrapingOrchestrator, scraping_orchestrator
+
+logger = logging.getLogger(__name__)
+
+# One refresh of the Polymarket mirror serves every topic, so the catalog is a single target
+CATALOG_KEY = "*"
+# Weight of the newest poll in the publishing-rate estimate
+RATE_SMOOTHING = 0.3
+# Longest idle sleep, so new sources and registrations are picked up promptly
+MAX_SLEEP_SECONDS = 30.0
+
+
+def _match_key(source: SourceType, source_key: str) -> str:
+    """How a target and a post's source_id are matched (Twitter usernames ignore case)"""
+    return f"{source.value}:{source_key.lower() if source == SourceType.TWITTER else source_key}"
+
+
+class PollTarget:
+    """One polled source (or registered check) and its adaptive interval"""
+
+    def __init__(
+        self,
+        key: str,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        source: Optional[SourceType] = None,
+        source_key: Optional[str] = None,
+        poll: Optional[Callable[[], Awaitable[int]]] = None,
+    ):
+        self.key = key
+        self.source = source
+        self.source_key = source_key
+        self.poll = poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.rate: Optional[float] = None  # New items per second
+        self.next_due = time.monotonic()
+        self.last_polled: Optional[float] = None
+        self.last_polled_at: Optional[str] = None
+        self.polls = 0
+        self.new_items = 0
+        self.last_error: Optional[str] = None
+        self.in_flight = False
+
+    def record(self, new_items: int, now: float) -> None:
+        """
+        Fold one poll into the publishing-rate estimate and schedule the next
+
+        The interval aims for INGEST_TARGET_ITEMS_PER_POLL new items per poll,
+        and moves at most 4x faster / 2x slower per poll so a single burst
+        or quiet spell does not swing it to an extreme.
+        """
+        elapsed = now - self.last_polled if self.last_polled is not None else self.interval
+        sample = new_items / max(elapsed, 1.0)
+        self.rate = sample if self.rate is None else RATE_SMOOTHING * sample + (1 - RATE_SMOOTHING) * self.rate
+
+        wanted = settings.INGEST_TARGET_ITEMS_PER_POLL / self.rate if self.rate > 0 else self.interval * 2
+        wanted = min(max(wanted, self.interval / 4), self.interval * 2)
+        self.interval = min(max(wanted, self.min_interval), self.max_interval)
+
+        self.polls += 1
+        self.new_items += new_items
+        self.last_error = None
+        self._polled(now)
+
+    def record_error(self, error: str, now: float) -> None:
+        """Back off after a failed poll"""
+        self.interval = min(self.interval * 2, self.max_interval)
+        self.polls += 1
+        self.last_error = error
+        self._polled(now)
+
+    def _polled(self, now: float) -> None:
+        self.last_polled = now
+        self.last_polled_at = datetime.utcnow().isoformat() + "Z"
+        self.next_due = now + self.interval
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Resume from a persisted state, keeping the learned interval and due time"""
+        if state.get("interval"):
+            self.interval = min(max(float(state["interval"]), self.min_interval), self.max_interval)
+        self.rate = state.get("rate")
+        self.last_polled_at = state.get("last_polled_at")
+        if state.get("last_polled_ts"):
+            remaining = state["last_polled_ts"] + self.interval - time.time()
+            self.next_due = time.monotonic() + max(0.0, remaining)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "rate": self.rate,
+            "last_polled_at": self.last_polled_at,
+            "last_polled_ts": time.time(),
+        }
+
+    def info(self, now: float) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "interval_seconds": round(self.interval, 1),
+            "new_items_per_hour": round(self.rate * 3600, 2) if self.rate is not None else None,
+            "next_poll_in_seconds": max(0, round(self.next_due - now, 1)),
+            "polls": self.polls,
+            "new_items": self.new_items,
+            "last_polled_at": self.last_polled_at,
+            "last_error": self.last_error,
+            "polling": self.in_flight,
+        }
+
+
+class IngestionScheduler:
+    """
+    Background poller started with the application
+
+    Sources come from the sources store: every RSS feed, Twitter account and
+    Telegram channel is its own target, and the Polymarket catalog is one.
+    Due sources are scraped together in one incremental orchestrator pass
+    (persisted and de-duplicated like any scrape). Other components can
+    register extra checks (see Watchtower) that share the same loop.
+    """
+
+    def __init__(self, orchestrator: ScrapingOrchestrator = scraping_orchestrator):
+        self.orchestrator = orchestrator
+        self.targets: Dict[str, PollTarget] = {}
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        self._polls: Set[asyncio.Task] = set()
+        self._sources_version: Optional[int] = None
+
+    def register(
+        self,
+        key: str,
+        poll: Callable[[], Awaitable[int]],
+        interval: float,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+    ) -> None:
+        """
+        Poll a check on an adaptive interval
+
+        Args:
+            key: Unique target name
+            poll: Coroutine function returning the number of new items found
+            interval: Starting interval in seconds
+            min_interval: Shortest interval (INGEST_MIN_INTERVAL_SECONDS if None)
+            max_interval: Longest interval (INGEST_MAX_INTERVAL_SECONDS if None)
+        """
+        self.targets[key] = PollTarget(
+            key,
+            interval,
+            min_interval if min_interval is not None else settings.INGEST_MIN_INTERVAL_SECONDS,
+            max_interval if max_interval is not None else settings.INGEST_MAX_INTERVAL_SECONDS,
+            poll=poll,
+        )
+
+    def unregister(self, key: str) -> None:
+        self.targets.pop(key, None)
+
+    async def start(self):
+        """Start the scheduler loop"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """Stop the loop and any polls in progress"""
+        if not self.is_running:
+            return
+        self.is_running = False
+
+        tasks = [t for t in [self._task, *self._polls] if t is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+        self._polls.clear()
+        logger.info("Ingestion scheduler stopped")
+
+    async def _run_loop(self):
+        """Main loop: refresh targets, start due polls, sleep until the next one"""
+        logger.info("Ingestion scheduler started")
+
+        while self.is_running:
+            try:
+                version = await asyncio.to_thread(sources_store.version)
+                if version != self._sources_version:
+                    await asyncio.to_thread(self._discover)
+                    self._sources_version = version
+
+                self._dispatch(time.monotonic())
+                await asyncio.sleep(self._sleep_time())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in ingestion scheduler loop: {e}", exc_info=True)
+                await asyncio.sleep(60)
+
+    def _source_keys(self) -> Dict[SourceType, List[str]]:
+        """Current feed names / usernames per source (enabled sources only)"""
+        topics, _ = self.orchestrator.polymarket_scraper.get_topics()
+        return {
+            SourceType.RSS: [f["name"] for f in self.orchestrator.rss_scraper.get_feeds()],
+            SourceType.TWITTER: [a["username"] for a in self.orchestrator.twitter_scraper.get_accounts()],
+            SourceType.TELEGRAM: [c["username"] for c in self.orchestrator.telegram_scraper.get_channels()],
+            SourceType.POLYMARKET: [CATALOG_KEY] if topics else [],
+        }
+
+    def _discover(self) -> None:
+        """Add targets for new sources and drop removed ones (runs in a worker thread)"""
+        current: Set[str] = set()
+        for source, keys in self._source_keys().items():
+            for source_key in keys:
+                key = f"{source.value}:{source_key}"
+                current.add(key)
+                if key in self.targets:
+                    continue
+                target = PollTarget(
+                    key,
+                    settings.INGEST_DEFAULT_INTERVAL_SECONDS,
+                    settings.INGEST_MIN_INTERVAL_SECONDS,
+                    settings.INGEST_MAX_INTERVAL_SECONDS,
+                    source=source,
+                    source_key=source_key,
+                )
+                target.restore(cursor_store.get("ingest", key))
+                self.targets[key] = target
+
+        for key in [k for k, t in self.targets.items() if t.poll is None and k not in current]:
+            del self.targets[key]
+
+    def _dispatch(self, now: float) -> None:
+        due = [t for t in self.targets.values() if not t.in_flight and t.next_due <= now]
+        if not due:
+            return
+        for target in due:
+            target.in_flight = True
+
+        sources = [t for t in due if t.poll is None]
+        if sources:
+            self._spawn(self._poll_sources(sources))
+        for target in due:
+            if target.poll is not None:
+                self._spawn(self._poll_check(target))
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._polls.add(task)
+        task.add_done_callback(self._polls.discard)
+
+    def _sleep_time(self) -> float:
+        now = time.monotonic()
+        waiting = [t.next_due - now for t in self.targets.values() if not t.in_flight]
+        return min(max(min(waiting, default=MAX_SLEEP_SECONDS), 1.0), MAX_SLEEP_SECONDS)
+
+    async def _poll_sources(self, targets: List[PollTarget]) -> None:
+        """Scrape the due sources in one incremental pass and reschedule each by its new items"""
+        keys_by_source: Dict[SourceType, Set[str]] = defaultdict(set)
+        for target in targets:
+            keys_by_source[target.source].add(target.source_key)
+
+        # Posts are matched to the due targets by their source_id; any other post (e.g. a
+        # representative carried from another feed's earlier poll) counts for no target
+        by_match = {_match_key(t.source, t.source_key): t.key for t in targets}
+        counts: Dict[str, int] = defaultdict(int)
+        errors: Dict[str, str] = {}
+        try:
+            async for event in self.orchestrator.stream_all(
+                list(keys_by_source),
+                settings.INGEST_DAYS_BACK,
+                settings.INGEST_MAX_ITEMS_PER_SOURCE,
+                True,
+                ScrapeRun(background=True),
+                {s: keys for s, keys in keys_by_source.items() if s != SourceType.POLYMARKET},
+            ):
+                if event["type"] == "posts":
+                    for post in event["posts"]:
+                        source_key = CATALOG_KEY if post.source == SourceType.POLYMARKET else post.source_id
+                        key = by_match.get(_match_key(post.source, source_key))
+                        if key is not None:
+                            counts[key] += 1
+                elif event["type"] == "source_done" and event["error"]:
+                    errors[event["source"]] = event["error"]
+        except Exception as e:
+            logger.error(f"Ingestion pass failed: {e}", exc_info=True)
+            errors = {t.source.value: str(e) for t in targets}
+        finally:
+            for target in targets:
+                target.in_flight = False
+
+        now = time.monotonic()
+        for target in targets:
+            error = errors.get(target.source.value)
+            if error and not counts.get(target.key):
+                target.record_error(error, now)
+            else:
+                target.record(counts.get(target.key, 0), now)
+
+        total = sum(counts.values())
+        if total:
+            logger.info(f"Ingested {total} new posts from {len(targets)} due sources")
+        await asyncio.to_thread(self._save, targets)
+
+    async def _poll_check(self, target: PollTarget) -> None:
+        try:
+            new_items = await target.poll()
+        except Exception as e:
+            logger.error(f"Scheduled check {target.key} failed: {e}", exc_info=True)
+            target.in_flight = False
+            target.record_error(str(e), time.monotonic())
+            return
+        target.in_flight = False
+        target.record(new_items or 0, time.monotonic())
+
+    def _save(self, targets: List[PollTarget]) -> None:
+        for target in targets:
+            if target.key in self.targets:
+                cursor_store.set("ingest", target.key, target.state())
+
+    def get_status(self) -> Dict[str, Any]:
+        """Targets by interval (busiest first) and the resulting polling rate"""
+        now = time.monotonic()
+        targets = sorted(self.targets.values(), key=lambda t: t.interval)
+        return {
+            "running": self.is_running,
+            "targets": len(targets),
+            "polls_per_hour": round(sum(3600 / t.interval for t in targets), 1),
+            "sources": [t.info(now) for t in targets],
+        }
+
+
+# Global instance
+ingestion_scheduler = IngestionScheduler()
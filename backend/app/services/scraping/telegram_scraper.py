@@ -0,0 +1,363 @@
+"""
+Telegram scraper service
+Reads public channels through their t.me/s/<channel> web previews
+"""
+
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Collection
+from datetime import datetime, timedelta, timezone
+from bs4 import BeautifulSoup
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services import sources_store
+from app.services.cursor_store import cursor_store
+from app.services.scraping.feed_parser import MAX_TEXT_LENGTH
+from app.services.scraping.rss_scraper import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+# Unfilled gaps kept per channel; beyond this the oldest is dropped (and logged)
+MAX_GAPS_PER_CHANNEL = 5
+
+
+def parse_channel_page(html: str) -> Dict[str, Any]:
+    """
+    Parse one web preview page (runs in a worker thread)
+    
+    Returns:
+        {"title": channel title or None,
+         "messages": [{"id", "text", "date_iso", "views", "url"}, ...] oldest first}
+    """
+    soup = BeautifulSoup(html, "lxml")
+    
+    title_node = soup.select_one(".tgme_channel_info_header_title") or soup.find("meta", property="og:title")
+    if title_node is None:
+        title = None
+    elif title_node.name == "meta":
+        title = title_node.get("content")
+    else:
+        title = title_node.get_text(" ", strip=True)
+    
+    messages = []
+    for node in soup.select("div.tgme_widget_message[data-post]"):
+        try:
+            message_id = int(node["data-post"].rsplit("/", 1)[-1])
+        except ValueError:
+            continue
+        
+        text_node = node.select_one(".tgme_widget_message_text")
+        for br in text_node.find_all("br") if text_node else []:
+            br.replace_with("\n")
+        text = text_node.get_text().strip() if text_node else ""
+        
+        time_node = node.select_one(".tgme_widget_message_date time[datetime]") or node.select_one("time[datetime]")
+        views_node = node.select_one(".tgme_widget_message_views")
+        messages.append({
+            "id": message_id,
+            "text": text[:MAX_TEXT_LENGTH],
+            "date_iso": time_node["datetime"] if time_node else None,
+            "views": views_node.get_text(strip=True) if views_node else None,
+            "url": f"https://t.me/{node['data-post']}",
+        })
+    
+    messages.sort(key=lambda m: m["id"])
+    return {"title": title, "messages": messages}
+
+
+class TelegramScraper:
+    """Telegram public channel scraper. Uses channels from sources store."""
+    
+    def __init__(self):
+        self.base_url = settings.TELEGRAM_PREVIEW_BASE_URL.rstrip("/")
+        self._channels = sources_store.SourceSnapshot("telegram_channels")
+    
+    def get_channels(self):
+        """Enabled channels from the sources store (cached until the store changes)."""
+        try:
+            return self._channels.get()
+        except Exception as e:
+            logger.warning(f"Could not load Telegram channels from store: {e}")
+            return []
+    
+    async def scrape(self, days_back: int, max_items: int, incremental: bool = True) -> List[PostRecord]:
+        """Scrape Telegram channels (from sources store)."""
+        posts = []
+        async for batch in self.stream(days_back, max_items, incremental):
+            posts.extend(batch)
+        logger.info(f"Scraped {len(posts)} Telegram posts")
+        return posts
+    
+    async def stream(
+        self,
+        days_back: int,
+        max_items: int,
+        incremental: bool = True,
+        keys: Optional[Collection[str]] = None,
+    ) -> AsyncIterator[List[PostRecord]]:
+        """
+        Yield messages in batches (one per channel) as channels finish.
+        
+        Channels are fetched concurrently (TELEGRAM_MAX_CONCURRENT_CHANNELS).
+        With incremental=True each channel stops at the newest message id seen
+        by the previous scrape. When paging stops early (page or item caps)
+        above it, the unfetched id range is kept as a gap in the channel's
+        cursor and later incremental runs page through it. A channel whose
+        messages would overflow max_items is not emitted and keeps its
+        cursor, so no message ends up below a cursor unseen. keys limits
+        the run to the channels with those usernames.
+        """
+        channels = self.get_channels()
+        if keys is not None:
+            channels = [c for c in channels if c["username"] in keys]
+        logger.info(f"Scraping Telegram channels: {len(channels)}")
+        
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+        semaphore = asyncio.Semaphore(max(1, settings.TELEGRAM_MAX_CONCURRENT_CHANNELS))
+        tasks = [
+            asyncio.create_task(self._scrape_channel(channel, cutoff_date, max_items, incremental, semaphore))
+            for channel in channels
+        ]
+        
+        emitted = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                channel, posts, cursor_update = await finished
+                # Limit to max_items; a partly emitted channel would leave a hole under its cursor
+                if emitted + len(posts) > max_items:
+                    logger.info(f"Telegram item cap reached; {channel['username']} left for the next run")
+                    continue
+                
+                # Only advance the cursor once the messages are emitted
+                if cursor_update:
+                    await asyncio.to_thread(cursor_store.update, "telegram", channel["username"], **cursor_update)
+                if not posts:
+                    continue
+                emitted += len(posts)
+                yield posts
+                if emitted >= max_items:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _scrape_channel(
+        self,
+        channel: Dict[str, Any],
+        cutoff_date: datetime,
+        limit: int,
+        incremental: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[Dict[str, Any], List[PostRecord], Dict[str, Any]]:
+        """
+        Fetch a channel's newest messages, paging back until the cursor or
+        cutoff, then (incremental) page through the gaps earlier runs left open
+        
+        Returns:
+            Tuple of (channel, posts newest first, cursor fields to store once the posts are emitted)
+        """
+        username = channel["username"]
+        cursor = cursor_store.get("telegram", username)
+        previous_newest = cursor.get("last_message_id")
+        gaps: List[Dict[str, Any]] = [dict(gap) for gap in cursor.get("gaps", [])]
+        posts: List[PostRecord] = []
+        fresh: Dict[str, Any] = {"before": None}
+        
+        async with semaphore:
+            try:
+                await self._walk(
+                    channel,
+                    cutoff_date,
+                    limit,
+                    previous_newest if incremental else None,
+                    settings.TELEGRAM_MAX_PAGES_PER_CHANNEL,
+                    fresh,
+                )
+                posts = list(fresh["posts"])
+                pages_left = settings.TELEGRAM_MAX_PAGES_PER_CHANNEL - fresh["pages"]
+                
+                # Newest gap first
+                for gap in list(gaps) if incremental else []:
+                    if pages_left <= 0 or len(posts) >= limit:
+                        break
+                    walk: Dict[str, Any] = {"before": gap["before"]}
+                    await self._walk(channel, cutoff_date, limit - len(posts), gap["floor"], pages_left, walk)
+                    posts.extend(walk["posts"])
+                    pages_left -= walk["pages"]
+                    if walk["complete"]:
+                        gaps.remove(gap)
+                    else:
+                        gap["before"] = walk["before"]
+            
+            except Exception as e:
+                logger.error(f"Error scraping Telegram channel {username}: {e}")
+        
+        return channel, posts, self._cursor_update(channel, posts, previous_newest, gaps, fresh, cursor.get("gaps", []))
+    
+    def _cursor_update(
+        self,
+        channel: Dict[str, Any],
+        posts: List[PostRecord],
+        previous_newest: Optional[int],
+        gaps: List[Dict[str, Any]],
+        fresh: Dict[str, Any],
+        stored_gaps: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Cursor fields after a scrape: the new high-water mark and the gaps still open"""
+        if not posts:
+            return {"gaps": gaps} if gaps != stored_gaps else {}
+        
+        update: Dict[str, Any] = {}
+        newest_id = max(p.metadata["message_id"] for p in posts)
+        if previous_newest is None or newest_id > previous_newest:
+            update["last_message_id"] = newest_id
+        # Paging stopped before it got back to the previous high-water mark
+        if (
+            previous_newest is not None
+            and fresh.get("posts")
+            and not fresh["complete"]
+            and fresh["before"] - 1 > previous_newest
+        ):
+            gaps = [{"before": fresh["before"], "floor": previous_newest}] + gaps
+            if len(gaps) > MAX_GAPS_PER_CHANNEL:
+                logger.warning(
+                    f"Telegram channel {channel['username']} has more than {MAX_GAPS_PER_CHANNEL} unfilled gaps; "
+                    f"messages {gaps[-1]['floor'] + 1}-{gaps[-1]['before'] - 1} are not fetched"
+                )
+                gaps = gaps[:MAX_GAPS_PER_CHANNEL]
+        update["gaps"] = gaps
+        return update
+    
+    async def _walk(
+        self,
+        channel: Dict[str, Any],
+        cutoff_date: datetime,
+        limit: int,
+        since_id: Optional[int],
+        max_pages: int,
+        walk: Dict[str, Any],
+    ) -> None:
+        """
+        Page a channel back from message id walk["before"] (None: its newest message)
+        
+        Fills walk with "posts" (newest first), "pages" (fetched) and
+        "complete" (since_id, the cutoff or the channel's first message was
+        reached). Otherwise (page or item cap, HTTP error) walk["before"] is
+        where the next walk picks up; it stays current if this one raises.
+        """
+        walk.update(posts=[], pages=0, complete=False)
+        posts = walk["posts"]
+        while walk["pages"] < max(1, max_pages) and len(posts) < limit:
+            page = await self._fetch_page(channel["username"], walk["before"])
+            if page is None:
+                return
+            walk["pages"] += 1
+            messages = page["messages"]
+            if not messages:
+                walk["complete"] = True
+                return
+            
+            for message in reversed(messages):
+                if since_id is not None and message["id"] <= since_id:
+                    walk["complete"] = True  # Already seen by a previous scrape
+                    return
+                if len(posts) >= limit:
+                    return
+                post = self._to_post(message, channel, page["title"])
+                if post is not None and post.date_iso < cutoff_date:
+                    walk["complete"] = True
+                    return
+                walk["before"] = message["id"]
+                if post is not None:
+                    posts.append(post)
+            
+            if messages[0]["id"] <= 1:
+                walk["complete"] = True
+                return
+    
+    async def iter_history(
+        self,
+        channel: Dict[str, Any],
+        start: datetime,
+        end: datetime,
+        before: Optional[int] = None,
+        max_pages: int = 100,
+    ) -> AsyncIterator[Tuple[List[PostRecord], Optional[int]]]:
+        """
+        Walk a channel back from message id before (or its newest message) to start (backfill)
+        
+        Yields (posts dated in [start, end), before id of the next page) for
+        every page; the next id is None once start or the channel's first
+        message is reached, so callers can checkpoint and resume mid-walk.
+        """
+        username = channel["username"]
+        for _ in range(max(1, max_pages)):
+            page = await self._fetch_page(username, before)
+            if page is None:
+                raise RuntimeError(f"Failed to fetch Telegram channel {username}")
+            messages = page["messages"]
+            if not messages:
+                yield [], None
+                return
+            
+            posts = []
+            reached_start = False
+            for message in reversed(messages):
+                post = self._to_post(message, channel, page["title"])
+                if post is None:
+                    continue
+                if post.date_iso < start:
+                    reached_start = True
+                    break
+                if post.date_iso < end:
+                    posts.append(post)
+            
+            before = None if reached_start or messages[0]["id"] <= 1 else messages[0]["id"]
+            yield posts, before
+            if before is None:
+                return
+    
+    async def _fetch_page(self, username: str, before: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Fetch and parse one web preview page of messages older than before (None on HTTP errors)"""
+        response = await outbound.request(
+            "GET",
+            f"{self.base_url}/{username}",
+            params={"before": before} if before else None,
+            headers={"User-Agent": USER_AGENT},
+        )
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch Telegram channel {username}: HTTP {response.status_code}")
+            return None
+        
+        # CPU-bound HTML parsing off the event loop
+        return await asyncio.to_thread(parse_channel_page, response.text)
+    
+    def _to_post(self, message: Dict[str, Any], channel: Dict[str, Any], title: Optional[str]) -> Optional[PostRecord]:
+        """Convert a parsed message; media-only messages (no text) are skipped"""
+        if not message["text"] or not message["date_iso"]:
+            return None
+        try:
+            date_iso = datetime.fromisoformat(message["date_iso"].replace("Z", "+00:00"))
+            if date_iso.tzinfo is None:
+                date_iso = date_iso.replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        
+        username = channel["username"]
+        return PostRecord(
+            id=f"telegram_{username}_{message['id']}",
+            source=SourceType.TELEGRAM,
+            source_id=username,
+            source_name=title or username,
+            title=None,
+            text=message["text"],
+            date_iso=date_iso,
+            url=message["url"],
+            metadata={
+                "message_id": message["id"],
+                "views": message["views"],
+            },
+        )
@@ -3,14 +3,35 @@ Twitter scraper service using RapidAPI
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple, Collection
 from datetime import datetime, timedelta
-import httpx
+import asyncio
 from app.core.config import settings
-from app.schemas.scraping import ScrapedPost, SourceType
+from app.core.outbound import outbound, RequestBudget
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services import sources_store
+from app.services.cursor_store import cursor_store
 
 logger = logging.getLogger(__name__)
 
+# Lower scrapes first; unknown types go last
+ACCOUNT_TYPE_PRIORITY = {"news": 0, "organization": 1, "person": 2, "other": 3}
+
+# Timeline pages fetched per account and run (new tweets and gaps together)
+MAX_PAGES_PER_ACCOUNT = 3
+
+# Unfilled gaps kept per account; beyond this the oldest is dropped (and logged)
+MAX_GAPS_PER_ACCOUNT = 5
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Tweet ids are numeric strings; None if missing or malformed"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class TwitterScraper:
     """Twitter scraper using RapidAPI (twitter154). Uses accounts from sources store only (no hardcoded list)."""
@@ -24,80 +45,265 @@ class TwitterScraper:
             "x-rapidapi-host": self.api_host,
             "x-rapidapi-key": self.api_key,
         }
+        self._accounts = sources_store.SourceSnapshot("twitter_accounts", build=self._build_accounts)
+    
+    @staticmethod
+    def _build_accounts(stored) -> List[Dict[str, Any]]:
+        """Accounts with a user_id, in the shape the scraper uses"""
+        return [
+            {
+                "user_id": str(a["user_id"]),
+                "username": a["username"],
+                "display_name": a.get("display_name") or a["username"],
+                "account_type": a.get("account_type", "person"),
+            }
+            for a in stored
+            if a.get("user_id")
+        ]
     
-    def _get_accounts(self) -> List[Dict[str, Any]]:
+    def get_accounts(self) -> List[Dict[str, Any]]:
         """Load accounts from sources store (DB). Only enabled accounts with user_id are used for scraping."""
         try:
-            from app.services import sources_store
-            stored = sources_store.get_twitter_accounts()
-            accounts = [
-                {
-                    "user_id": str(a["user_id"]),
-                    "username": a["username"],
-                    "display_name": a.get("display_name") or a["username"],
-                }
-                for a in stored
-                if a.get("enabled", True) and a.get("user_id")
-            ]
-            return accounts
+            return self._accounts.get()
         except Exception as e:
             logger.warning(f"Could not load Twitter accounts from store: {e}")
             return []
 
-    async def scrape(self, days_back: int, max_items: int) -> List[ScrapedPost]:
+    async def scrape(self, days_back: int, max_items: int, incremental: bool = True) -> List[PostRecord]:
         """Scrape Twitter accounts using RapidAPI (accounts from sources store)."""
-        accounts = self._get_accounts()
+        all_posts = []
+        async for batch in self.stream(days_back, max_items, incremental):
+            all_posts.extend(batch)
+        logger.info(f"Scraped {len(all_posts)} Twitter posts")
+        return all_posts
+    
+    async def stream(
+        self,
+        days_back: int,
+        max_items: int,
+        incremental: bool = True,
+        keys: Optional[Collection[str]] = None,
+    ) -> AsyncIterator[List[PostRecord]]:
+        """
+        Yield tweets in batches (one per account) in priority order.
+        
+        Accounts are scraped concurrently (TWITTER_MAX_CONCURRENT_ACCOUNTS) in
+        priority order under a per-run RapidAPI request budget
+        (TWITTER_REQUEST_BUDGET_PER_RUN), so the most valuable accounts are
+        fetched first when the budget runs out. Batches are emitted in that
+        same order, so max_items goes to the highest-priority accounts rather
+        than the fastest ones. Each account is fetched with at most the room
+        the accounts before it left under max_items; once there is none,
+        accounts still waiting for a slot are never fetched.
+        
+        With incremental=True each account stops at the newest tweet id seen by
+        the previous scrape; the high-water mark is advanced either way. When
+        paging stops early (page, item or request caps) above the previous
+        high-water mark, the continuation token is kept as a gap in the
+        account's cursor and later incremental runs page on from it. An
+        account fetched alongside others whose tweets then overflow max_items
+        is not emitted and keeps its cursor, so no tweet ends up below a
+        cursor unseen; later accounts that still fit are emitted.
+        keys limits the run to the accounts with those usernames.
+        """
+        accounts = self.get_accounts()
+        if keys is not None:
+            accounts = [a for a in accounts if a["username"] in keys]
+        accounts = self.prioritize(accounts)
         logger.info(f"Scraping Twitter accounts: {len(accounts)}")
         
         if not self.api_key or self.api_key == "your_rapidapi_key_here":
             logger.warning("RapidAPI key not configured. Returning mock data.")
-            return self._get_mock_data(days_back, max_items)
+            yield self._get_mock_data(days_back, max_items)
+            return
         
-        all_posts = []
         from datetime import timezone
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+        budget = RequestBudget(settings.TWITTER_REQUEST_BUDGET_PER_RUN)
+        # Semaphore waiters are served FIFO, so tasks start in priority order
+        semaphore = asyncio.Semaphore(max(1, settings.TWITTER_MAX_CONCURRENT_ACCOUNTS))
+        fetched = [0] * len(accounts)
+        
+        async def _fetch(index: int, account: Dict[str, str]):
+            async with semaphore:
+                # Only fetch what can still be emitted after the higher-priority accounts
+                room = max_items - sum(fetched[:index])
+                if room <= 0:
+                    return account, [], {}
+                result = await self._scrape_account(account, cutoff_date, room, incremental, budget)
+            fetched[index] = len(result[1])
+            return result
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for account in accounts:
-                try:
-                    posts = await self._scrape_user_tweets(
-                        client, 
-                        account, 
-                        cutoff_date, 
-                        max_items
+        tasks = [asyncio.create_task(_fetch(index, account)) for index, account in enumerate(accounts)]
+        
+        emitted = 0
+        try:
+            for index, task in enumerate(tasks):
+                account, posts, cursor_update = await task
+                # Limit to max_items; a partly emitted account would leave a hole under its cursor
+                if emitted + len(posts) > max_items:
+                    logger.info(f"@{account['username']} would overflow the Twitter item cap; left for the next run")
+                    fetched[index] = 0
+                    continue
+                
+                # Only advance the cursor once the tweets are emitted
+                if cursor_update:
+                    await asyncio.to_thread(cursor_store.update, "twitter", account["user_id"], **cursor_update)
+                if not posts:
+                    continue
+                emitted += len(posts)
+                yield posts
+                if emitted >= max_items:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if budget.exhausted:
+            logger.warning(f"Twitter request budget ({budget.limit}) exhausted; lower-priority accounts skipped")
+    
+    def prioritize(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order accounts by type (news first), then by most recent new tweet"""
+        cursors = cursor_store.get_all("twitter")
+        by_activity = sorted(
+            accounts,
+            key=lambda a: cursors.get(a["user_id"], {}).get("last_new_at", ""),
+            reverse=True,
+        )
+        return sorted(by_activity, key=lambda a: ACCOUNT_TYPE_PRIORITY.get(a.get("account_type"), len(ACCOUNT_TYPE_PRIORITY)))
+    
+    async def _scrape_account(
+        self,
+        account: Dict[str, str],
+        cutoff_date: datetime,
+        limit: int,
+        incremental: bool,
+        budget: RequestBudget,
+    ) -> Tuple[Dict[str, str], List[PostRecord], Dict[str, Any]]:
+        """
+        Scrape one account: tweets newer than its cursor first, then
+        (incremental) the gaps earlier runs left open
+        
+        Returns:
+            Tuple of (account, posts newest first, cursor fields to store once the posts are emitted)
+        """
+        cursor = cursor_store.get("twitter", account["user_id"])
+        previous_newest = _to_int(cursor.get("newest_id"))
+        gaps: List[Dict[str, Any]] = [dict(gap) for gap in cursor.get("gaps", [])]
+        posts: List[PostRecord] = []
+        paging: Dict[str, Any] = {}
+        try:
+            async for page in self._iter_user_tweets(
+                account, 
+                cutoff_date, 
+                limit,
+                since_id=previous_newest if incremental else None,
+                budget=budget,
+                paging=paging,
+            ):
+                posts.extend(page)
+            pages_left = MAX_PAGES_PER_ACCOUNT - paging["pages"]
+            
+            # Page on below tweets that earlier runs could not reach, newest gap first
+            for gap in list(gaps) if incremental else []:
+                if pages_left <= 0 or len(posts) >= limit:
+                    break
+                gap_paging: Dict[str, Any] = {}
+                async for page in self._iter_user_tweets(
+                    account,
+                    cutoff_date,
+                    limit - len(posts),
+                    since_id=_to_int(gap["floor"]),
+                    budget=budget,
+                    continuation_token=gap["token"],
+                    max_pages=pages_left,
+                    paging=gap_paging,
+                ):
+                    posts.extend(page)
+                pages_left -= gap_paging["pages"]
+                if gap_paging["complete"]:
+                    gaps.remove(gap)
+                elif gap_paging["failed"] and not gap_paging["pages"]:
+                    logger.warning(
+                        f"Continuation token for @{account['username']} rejected; "
+                        f"tweets above id {gap['floor']} in that gap are not fetched"
                     )
-                    all_posts.extend(posts)
-                    
-                    if len(all_posts) >= max_items:
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"Error scraping Twitter account {account['username']}: {e}")
+                    gaps.remove(gap)
+                else:
+                    gap["token"] = gap_paging["token"]
+                
+        except Exception as e:
+            logger.error(f"Error scraping Twitter account {account['username']}: {e}")
         
-        # Limit to max_items
-        all_posts = all_posts[:max_items]
-        logger.info(f"Scraped {len(all_posts)} Twitter posts")
-        return all_posts
+        return account, posts, self._cursor_update(account, posts, previous_newest, gaps, paging)
     
-    async def _scrape_user_tweets(
+    def _cursor_update(
+        self,
+        account: Dict[str, str],
+        posts: List[PostRecord],
+        previous_newest: Optional[int],
+        gaps: List[Dict[str, Any]],
+        paging: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Cursor fields after a scrape: the new high-water mark and the gaps still open"""
+        ids = [i for i in (_to_int(p.metadata.get("tweet_id")) for p in posts) if i is not None]
+        if not ids:
+            return {"gaps": gaps} if gaps != cursor_store.get("twitter", account["user_id"]).get("gaps", []) else {}
+        
+        newest_id = max(ids)
+        update: Dict[str, Any] = {}
+        if previous_newest is None or newest_id > previous_newest:
+            update = {"newest_id": str(newest_id), "last_new_at": datetime.utcnow().isoformat() + "Z"}
+        # Paging stopped before it got back to the previous high-water mark
+        if (
+            previous_newest is not None
+            and not paging.get("complete", True)
+            and paging.get("token")
+            and min(ids) > previous_newest
+        ):
+            gaps = [{"token": paging["token"], "floor": str(previous_newest)}] + gaps
+            if len(gaps) > MAX_GAPS_PER_ACCOUNT:
+                logger.warning(
+                    f"@{account['username']} has more than {MAX_GAPS_PER_ACCOUNT} unfilled gaps; "
+                    f"tweets above id {gaps[-1]['floor']} in the oldest one are not fetched"
+                )
+                gaps = gaps[:MAX_GAPS_PER_ACCOUNT]
+        update["gaps"] = gaps
+        return update
+
+    async def _iter_user_tweets(
         self, 
-        client: httpx.AsyncClient, 
         account: Dict[str, str],
         cutoff_date: datetime,
-        limit: int
-    ) -> List[ScrapedPost]:
-        """Scrape tweets from a specific user"""
-        posts = []
-        continuation_token = None
+        limit: int,
+        since_id: Optional[int] = None,
+        budget: Optional[RequestBudget] = None,
+        continuation_token: Optional[str] = None,
+        max_pages: int = MAX_PAGES_PER_ACCOUNT,
+        paging: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[List[PostRecord]]:
+        """
+        Yield tweets from a specific user, one page at a time, newer than since_id
+        
+        Starts at continuation_token when given. paging, when given, is filled
+        with "pages" (requests answered), "complete" (since_id, the cutoff or
+        the end of the timeline was reached), "token" (continuation token of
+        the next unfetched page) and "failed" (a request errored).
+        """
+        paging = paging if paging is not None else {}
+        paging.update(pages=0, complete=False, token=continuation_token, failed=False)
+        fetched = 0
         page = 0
-        max_pages = 3  # Limit pagination
         
-        while page < max_pages and len(posts) < limit:
+        while page < max_pages and fetched < limit:
+            if budget is not None and not budget.try_spend():
+                break
             try:
                 # Build request payload
                 payload = {
                     "user_id": account["user_id"],
-                    "limit": min(20, limit - len(posts))
+                    "limit": min(20, limit - fetched)
                 }
                 
                 # Choose endpoint based on whether we have continuation token
@@ -107,8 +313,9 @@ class TwitterScraper:
                 else:
                     endpoint = f"{self.base_url}/user/medias"
                 
-                # Make API request
-                response = await client.post(
+                # Make API request (rate-limited and retried per host)
+                response = await outbound.request(
+                    "POST",
                     endpoint,
                     headers=self.headers,
                     json=payload
@@ -116,6 +323,7 @@ class TwitterScraper:
                 
                 if response.status_code != 200:
                     logger.error(f"API error {response.status_code}: {response.text}")
+                    paging["failed"] = True
                     break
                 
                 data = response.json()
@@ -123,25 +331,93 @@ class TwitterScraper:
                 # Parse tweets from response
                 tweets = self._parse_tweets(data, account)
                 
-                for tweet in tweets:
-                    if tweet.date_iso < cutoff_date:
-                        return posts  # Stop if we've gone past cutoff date
-                    posts.append(tweet)
-                
-                # Get continuation token for next page
-                continuation_token = data.get("continuation_token")
-                if not continuation_token:
-                    break
-                
-                page += 1
-                
             except Exception as e:
                 logger.error(f"Error fetching tweets for {account['username']}: {e}")
+                paging["failed"] = True
                 break
+            
+            paging["pages"] += 1
+            posts = []
+            reached_cutoff = False
+            for tweet in tweets:
+                if tweet.date_iso < cutoff_date:
+                    reached_cutoff = True  # Stop if we've gone past cutoff date
+                    break
+                if since_id is not None:
+                    tweet_id = _to_int(tweet.metadata.get("tweet_id"))
+                    if tweet_id is not None and tweet_id <= since_id:
+                        reached_cutoff = True  # Already seen by a previous scrape
+                        break
+                posts.append(tweet)
+            
+            # Get continuation token for next page
+            continuation_token = data.get("continuation_token")
+            paging["token"] = continuation_token
+            paging["complete"] = reached_cutoff or not continuation_token
+            
+            if posts:
+                fetched += len(posts)
+                yield posts
+            if paging["complete"]:
+                return
+            
+            page += 1
+    
+    async def iter_range(
+        self,
+        account: Dict[str, str],
+        start: datetime,
+        end: datetime,
+        max_pages: int,
+        budget: Optional[RequestBudget] = None,
+        continuation_token: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[List[PostRecord], Optional[str]]]:
+        """
+        Walk an account's tweets dated in [start, end), one page at a time (backfill)
         
-        return posts
+        Uses the search endpoint (from:<username> between two dates), so any
+        slice of history is reached directly instead of paging back through
+        everything newer. The API takes whole days; tweets outside the exact
+        range are dropped.
+        
+        Yields (posts, continuation token of the next page) for every page,
+        starting at continuation_token when given; the token is None once
+        the slice is exhausted, so callers can checkpoint and resume a slice
+        cut short by max_pages or the budget.
+        """
+        end_day = end.date() if end.time() == datetime.min.time() else end.date() + timedelta(days=1)
+        params = {
+            "query": f"from:{account['username']}",
+            "section": "latest",
+            "limit": 20,
+            "start_date": start.strftime("%Y-%m-%d"),
+            "end_date": end_day.strftime("%Y-%m-%d"),
+        }
+        
+        for _ in range(max(1, max_pages)):
+            if budget is not None and not budget.try_spend():
+                return
+            if continuation_token:
+                endpoint = f"{self.base_url}/search/search/continuation"
+                params = {**params, "continuation_token": continuation_token}
+            else:
+                endpoint = f"{self.base_url}/search/search"
+            response = await outbound.request("GET", endpoint, headers=self.headers, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"API error {response.status_code}: {response.text[:200]}")
+            
+            data = response.json()
+            tweets = self._parse_tweets(data, account)
+            posts = [t for t in tweets if start <= t.date_iso < end]
+            
+            continuation_token = data.get("continuation_token")
+            if not tweets or not continuation_token or min(t.date_iso for t in tweets) < start:
+                continuation_token = None
+            yield posts, continuation_token
+            if continuation_token is None:
+                return
     
-    def _parse_tweets(self, data: Dict[str, Any], account: Dict[str, str]) -> List[ScrapedPost]:
+    def _parse_tweets(self, data: Dict[str, Any], account: Dict[str, str]) -> List[PostRecord]:
         """Parse tweets from API response"""
         posts = []
         
@@ -163,12 +439,14 @@ class TwitterScraper:
         
         return posts
     
-    def _parse_tweet_result(self, tweet: Dict[str, Any], account: Dict[str, str]) -> Optional[ScrapedPost]:
+    def _parse_tweet_result(self, tweet: Dict[str, Any], account: Dict[str, str]) -> Optional[PostRecord]:
         """Parse a single tweet result from RapidAPI response"""
         try:
             # Extract fields from the simplified response structure
             tweet_id = tweet.get("tweet_id", "")
             text = tweet.get("text", "")
+            if not isinstance(text, str):
+                return None
             created_at_str = tweet.get("creation_date", "")
             
             # Parse Twitter date format: "Tue Apr 08 20:40:19 +0000 2025"
@@ -189,7 +467,7 @@ class TwitterScraper:
             media_urls = tweet.get("media_url", [])
             video_url = tweet.get("video_url")
             
-            post = ScrapedPost(
+            post = PostRecord(
                 id=f"twitter_{tweet_id}",
                 source=SourceType.TWITTER,
                 source_id=username,
@@ -199,6 +477,7 @@ class TwitterScraper:
                 date_iso=created_at,
                 url=f"https://twitter.com/{username}/status/{tweet_id}",
                 metadata={
+                    "tweet_id": tweet_id,
                     "likes": likes,
                     "retweets": retweets,
                     "replies": replies,
@@ -216,13 +495,13 @@ class TwitterScraper:
             return None
     
     
-    def _get_mock_data(self, days_back: int, max_items: int) -> List[ScrapedPost]:
+    def _get_mock_data(self, days_back: int, max_items: int) -> List[PostRecord]:
         """Get mock data for testing"""
         posts = []
         base_time = datetime.utcnow() - timedelta(hours=2)
-        accounts = self._get_accounts()
+        accounts = self.get_accounts()
         for i, account in enumerate(accounts[:min(len(accounts), max_items)]):
-            post = ScrapedPost(
+            post = PostRecord(
                 id=f"twitter_mock_{i}",
                 source=SourceType.TWITTER,
                 source_id=account["username"],
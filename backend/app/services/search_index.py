@@ -0,0 +1,290 @@
+"""
+Full-text search over recent scraped posts
+In-memory inverted index with BM25 ranking, updated as posts are persisted
+and covering the last SEARCH_INDEX_DAYS days. Postings are append-only
+arrays scored with numpy, so a query touches only its terms' postings.
+"""
+
+import logging
+import re
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in into is it its of on or our she "
+    "so than that the their them then there these they this to was we were what when which who will "
+    "with would you your".split()
+)
+_SOURCES = list(SourceType)
+_SOURCE_CODES = {source: code for code, source in enumerate(_SOURCES)}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Title terms count this many times towards a post's term frequencies
+TITLE_WEIGHT = 2
+# Compact once this share of the indexed posts is deleted or expired
+COMPACT_RATIO = 0.25
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded word tokens without stopwords and single characters"""
+    return [t for t in _TOKEN_RE.findall(text.casefold()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _to_ts(value: datetime) -> int:
+    """Epoch milliseconds (UTC). Naive datetimes are treated as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class SearchIndex:
+    """
+    Incrementally maintained BM25 index keyed by post id
+
+    Documents get sequential numbers; per-document columns (alive flag,
+    source, source id, date, length) are kept in typed arrays and every
+    term has a postings array of document numbers with term frequencies.
+    Re-indexing a post or expiring it only clears its alive flag; postings
+    of dead documents are dropped by an occasional compaction.
+    """
+
+    def __init__(self, window_days: int = 7):
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._terms: Dict[str, int] = {}
+        self._postings: List[array] = []  # term id -> document numbers
+        self._frequencies: List[array] = []  # term id -> term frequency per posting
+        self._post_ids: List[str] = []
+        self._doc_by_post: Dict[str, int] = {}
+        self._alive = array("B")
+        self._source = array("B")
+        self._source_id = array("I")
+        self._date = array("q")
+        self._length = array("I")
+        self._source_id_codes: Dict[str, int] = {}
+        self._live = 0
+        self._total_length = 0
+
+    def add_many(self, posts: Iterable[PostRecord]) -> int:
+        """
+        Index (or re-index) posts dated inside the window
+
+        Returns:
+            Number of posts indexed
+        """
+        cutoff = _to_ts(datetime.now(timezone.utc) - timedelta(days=self.window_days))
+        prepared = []
+        for post in posts:
+            date_ts = _to_ts(post.date_iso)
+            if date_ts < cutoff:
+                continue
+            counts: Dict[str, int] = {}
+            for term in tokenize(post.title or ""):
+                counts[term] = counts.get(term, 0) + TITLE_WEIGHT
+            for term in tokenize(post.text):
+                counts[term] = counts.get(term, 0) + 1
+            prepared.append((post, date_ts, counts))
+
+        with self._lock:
+            for post, date_ts, counts in prepared:
+                self._add(post, date_ts, counts)
+            self._expire(cutoff)
+        return len(prepared)
+
+    def _add(self, post: PostRecord, date_ts: int, counts: Dict[str, int]) -> None:
+        previous = self._doc_by_post.get(post.id)
+        if previous is not None:
+            self._kill(previous)
+
+        doc = len(self._post_ids)
+        self._post_ids.append(post.id)
+        self._doc_by_post[post.id] = doc
+        length = sum(counts.values())
+        self._alive.append(1)
+        self._source.append(_SOURCE_CODES[post.source])
+        self._source_id.append(self._source_id_codes.setdefault(post.source_id, len(self._source_id_codes)))
+        self._date.append(date_ts)
+        self._length.append(length)
+        self._live += 1
+        self._total_length += length
+
+        for term, tf in counts.items():
+            term_id = self._terms.get(term)
+            if term_id is None:
+                term_id = self._terms[term] = len(self._postings)
+                self._postings.append(array("I"))
+                self._frequencies.append(array("H"))
+            self._postings[term_id].append(doc)
+            self._frequencies[term_id].append(min(tf, 65535))
+
+    def _kill(self, doc: int) -> None:
+        if self._alive[doc]:
+            self._alive[doc] = 0
+            self._live -= 1
+            self._total_length -= self._length[doc]
+            del self._doc_by_post[self._post_ids[doc]]
+
+    def _expire(self, cutoff: int) -> None:
+        """Drop posts older than the window and compact when enough are dead"""
+        if self._post_ids:
+            dates = np.frombuffer(self._date, dtype=np.int64)
+            alive = np.frombuffer(self._alive, dtype=np.uint8)
+            expired = np.nonzero((dates < cutoff) & (alive == 1))[0]
+            del dates, alive  # Release the buffers before the arrays are written to
+            for doc in expired.tolist():
+                self._kill(doc)
+
+        dead = len(self._post_ids) - self._live
+        if dead > 1000 and dead > COMPACT_RATIO * len(self._post_ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live documents and drop dead postings"""
+        started = time.monotonic()
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+
+        terms, postings, frequencies = {}, [], []
+        for term, term_id in self._terms.items():
+            docs = np.frombuffer(self._postings[term_id], dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                continue
+            terms[term] = len(postings)
+            postings.append(array("I", remap[docs[keep]].astype(np.uint32).tobytes()))
+            frequencies.append(array("H", np.frombuffer(self._frequencies[term_id], dtype=np.uint16)[keep].tobytes()))
+
+        def _keep(column: array) -> array:
+            values = np.frombuffer(column, dtype=np.dtype(column.typecode))[alive]
+            return array(column.typecode, values.tobytes())
+
+        post_ids = [post_id for post_id, live in zip(self._post_ids, alive.tolist()) if live]
+        source, source_id, date, length = _keep(self._source), _keep(self._source_id), _keep(self._date), _keep(self._length)
+        del alive
+
+        self._terms, self._postings, self._frequencies = terms, postings, frequencies
+        self._post_ids = post_ids
+        self._doc_by_post = {post_id: doc for doc, post_id in enumerate(post_ids)}
+        self._alive = array("B", bytes([1]) * len(post_ids))
+        self._source, self._source_id, self._date, self._length = source, source_id, date, length
+        logger.info(f"Search index compacted to {len(post_ids)} posts in {(time.monotonic() - started) * 1000:.0f}ms")
+
+    def search(
+        self,
+        query: str,
+        source: Optional[SourceType] = None,
+        source_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Rank indexed posts against a query with BM25
+
+        Args:
+            query: Free text; every term may match (OR), better matches rank higher
+            source: Filter by source type
+            source_id: Filter by account / feed / topic
+            since: Only posts dated at or after this time
+            until: Only posts dated before this time
+            limit: Page size
+            offset: Number of ranked results to skip
+
+        Returns:
+            Tuple of ([(post id, score), ...] best first, total number of matches)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            term_ids = [self._terms[t] for t in terms if t in self._terms]
+            if not term_ids or not self._live:
+                return [], 0
+            source_id_code = None
+            if source_id is not None:
+                source_id_code = self._source_id_codes.get(source_id)
+                if source_id_code is None:
+                    return [], 0
+
+            count = len(self._post_ids)
+            lengths = np.frombuffer(self._length, dtype=np.uint32)
+            average_length = max(self._total_length / self._live, 1.0)
+            alive = np.frombuffer(self._alive, dtype=np.uint8) == 1
+            scores = np.zeros(count, dtype=np.float64)
+            for term_id in term_ids:
+                docs = np.frombuffer(self._postings[term_id], dtype=np.uint32)
+                tf = np.frombuffer(self._frequencies[term_id], dtype=np.uint16).astype(np.float64)
+                # Postings of re-indexed and expired posts stay until compaction; they are not in df
+                df = int(np.count_nonzero(alive[docs]))
+                idf = np.log(1 + (self._live - df + 0.5) / (df + 0.5))
+                norm = K1 * (1 - B + B * lengths[docs] / average_length)
+                # A document appears once per term, so fancy-index += is safe
+                scores[docs] += idf * tf * (K1 + 1) / (tf + norm)
+
+            mask = alive & (scores > 0)
+            if source is not None:
+                mask &= np.frombuffer(self._source, dtype=np.uint8) == _SOURCE_CODES[source]
+            if source_id_code is not None:
+                mask &= np.frombuffer(self._source_id, dtype=np.uint32) == source_id_code
+            if since is not None or until is not None:
+                dates = np.frombuffer(self._date, dtype=np.int64)
+                if since is not None:
+                    mask &= dates >= _to_ts(since)
+                if until is not None:
+                    mask &= dates < _to_ts(until)
+
+            matches = np.nonzero(mask)[0]
+            total = int(matches.size)
+            wanted = offset + limit
+            if total == 0 or offset >= total:
+                return [], total
+            match_scores = scores[matches]
+            if wanted < total:
+                # Everything tied with the wanted-th best score is a candidate, so the
+                # tie-break below decides the page boundary, not argpartition's order
+                kth = np.partition(match_scores, total - wanted)[total - wanted]
+                top = np.nonzero(match_scores >= kth)[0]
+            else:
+                top = np.arange(total)
+            # Best score first; newer posts (higher doc number) break ties
+            order = top[np.lexsort((-matches[top], -match_scores[top]))][offset:wanted]
+            return [(self._post_ids[doc], float(scores[doc])) for doc in matches[order].tolist()], total
+
+    def load(self, batches: Iterable[List[PostRecord]]) -> int:
+        """Index posts from the post store (startup); returns posts indexed"""
+        started = time.monotonic()
+        indexed = 0
+        for batch in batches:
+            indexed += self.add_many(batch)
+        logger.info(f"Search index loaded {indexed} posts in {time.monotonic() - started:.1f}s")
+        return indexed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "posts": self._live,
+                "dead": len(self._post_ids) - self._live,
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._postings),
+                "window_days": self.window_days,
+            }
+
+
+# Global instance
+search_index = SearchIndex(window_days=settings.SEARCH_INDEX_DAYS)
@@ -0,0 +1,195 @@
+"""
+SQLite backend for the sources store (SOURCES_BACKEND=sqlite)
+One row per source with unique indexes on id and on each kind's key
+(username / URL), so add, toggle and delete are single indexed statements.
+Existing data/sources.json files are imported on first use.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from app.core.config import settings
+from app.core.sqlite import SQLiteDatabase
+from app.services.sources_store import UNIQUE_KEYS, unique_key, _sources_path, _bump
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    unique_key TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sources_id ON sources (id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sources_kind_key ON sources (kind, unique_key);
+CREATE INDEX IF NOT EXISTS idx_sources_kind_seq ON sources (kind, seq);
+"""
+
+_INSERT = "INSERT INTO sources (kind, id, unique_key, enabled, data) VALUES (?, ?, ?, ?, ?)"
+
+
+def _db_path() -> Path:
+    if settings.SOURCES_DB_PATH:
+        return Path(settings.SOURCES_DB_PATH)
+    return _sources_path().with_name("sources.db")
+
+
+def _row(kind: str, item: Dict[str, Any]) -> tuple:
+    return (
+        kind,
+        item["id"],
+        unique_key(kind, item),
+        int(bool(item.get("enabled", True))),
+        json.dumps(item),
+    )
+
+
+def _to_item(data: str, enabled: int) -> Dict[str, Any]:
+    item = json.loads(data)
+    item["enabled"] = bool(enabled)
+    return item
+
+
+class SQLiteSourcesBackend:
+    """Sources kept in SQLite; same interface as JSONSourcesBackend"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.db = SQLiteDatabase(path or _db_path(), _SCHEMA)
+        self._imported = False
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self.db.connect()
+        if not self._imported:
+            self._imported = True
+            if conn.execute("SELECT 1 FROM sources LIMIT 1").fetchone() is None:
+                json_path = _sources_path()
+                if json_path.exists():
+                    self.import_json(json_path)
+        return conn
+
+    @contextmanager
+    def batch(self):
+        """Apply several mutations in one transaction (one commit)"""
+        conn = self._connect()
+        if getattr(self._local, "in_batch", False):
+            yield
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.in_batch = True
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.in_batch = False
+
+    @contextmanager
+    def _write(self):
+        """Own transaction, or a savepoint when inside batch() so one failed op keeps the rest"""
+        conn = self._connect()
+        if not getattr(self._local, "in_batch", False):
+            with conn:
+                yield conn
+            return
+        conn.execute("SAVEPOINT op")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK TO op")
+            conn.execute("RELEASE op")
+            raise
+        conn.execute("RELEASE op")
+
+    def refresh(self) -> None:
+        """Changes are made through this process, so the version counter is already current"""
+
+    def list(self, kind: str) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT data, enabled FROM sources WHERE kind = ? ORDER BY seq", (kind,)
+        ).fetchall()
+        return [_to_item(data, enabled) for data, enabled in rows]
+
+    def insert(self, kind: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            with self._write() as conn:
+                conn.execute(_INSERT, _row(kind, item))
+        except sqlite3.IntegrityError as e:
+            if "unique_key" in str(e):
+                raise ValueError(UNIQUE_KEYS[kind][1])
+            raise ValueError(f"Duplicate source id {item['id']}")
+        _bump()
+        return item
+
+    def insert_many(self, kind: str, items: List[Dict[str, Any]]) -> None:
+        with self._write() as conn:
+            conn.executemany(_INSERT.replace("INSERT", "INSERT OR IGNORE", 1), [_row(kind, x) for x in items])
+        _bump()
+
+    def delete(self, kind: str, id: str) -> None:
+        with self._write() as conn:
+            conn.execute("DELETE FROM sources WHERE kind = ? AND id = ?", (kind, id))
+        _bump()
+
+    def toggle(self, kind: str, id: str) -> Optional[Dict[str, Any]]:
+        with self._write() as conn:
+            row = conn.execute(
+                "UPDATE sources SET enabled = 1 - enabled WHERE kind = ? AND id = ? RETURNING data, enabled",
+                (kind, id),
+            ).fetchone()
+        if row is None:
+            return None
+        _bump()
+        return _to_item(*row)
+
+    def import_json(self, path: Path) -> Dict[str, int]:
+        """
+        Migrate a sources.json file into the database
+
+        Duplicate ids are renamed and duplicate keys (username / URL) are
+        skipped, so re-running an import is harmless.
+
+        Returns:
+            Number of rows imported per kind
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        conn = self.db.connect()
+        seen_ids = {row[0] for row in conn.execute("SELECT id FROM sources")}
+        imported: Dict[str, int] = {}
+        with conn:
+            for kind in UNIQUE_KEYS:
+                count = 0
+                for item in data.get(kind, []):
+                    item = dict(item)
+                    base_id = item.get("id") or kind
+                    item["id"], n = base_id, 1
+                    while item["id"] in seen_ids:
+                        item["id"], n = f"{base_id}_{n}", n + 1
+                    cursor = conn.execute(_INSERT.replace("INSERT", "INSERT OR IGNORE", 1), _row(kind, item))
+                    if cursor.rowcount:
+                        seen_ids.add(item["id"])
+                        count += 1
+                imported[kind] = count
+
+        _bump()
+        logger.info(f"Imported sources from {path}: {imported}")
+        return imported
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else _sources_path()
+    print(SQLiteSourcesBackend().import_json(source))
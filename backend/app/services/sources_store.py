@@ -1,17 +1,36 @@
 """
 Sources store: single source of truth for Telegram channels, Twitter accounts,
-RSS feeds, and Polymarket topics. Persisted as JSON under backend/data.
+RSS feeds, and Polymarket topics. Persisted as JSON under backend/data,
+served from an in-memory cache and written back atomically, or in SQLite
+with SOURCES_BACKEND=sqlite (see sources_sqlite.py).
 """
 
+import asyncio
+import atexit
 import json
 import logging
+import os
 import re
+import stat
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Tuple, Callable, TypeVar, Mapping
 from datetime import datetime
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Read once at import: os.umask can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 # Default channels/accounts/feeds/topics used when store is empty (seeds)
 DEFAULT_TELEGRAM_CHANNELS = [
     {"username": "coindesk", "url": "https://t.me/coindesk", "category": "crypto"},
@@ -40,267 +59,547 @@ DEFAULT_POLYMARKET_TOPICS = [
     {"name": "Sports", "keywords": ["nfl", "nba", "football"], "category": "sports"},
 ]
 
+DEFAULTS = {
+    "telegram_channels": DEFAULT_TELEGRAM_CHANNELS,
+    "twitter_accounts": DEFAULT_TWITTER_ACCOUNTS,
+    "rss_feeds": DEFAULT_RSS_FEEDS,
+    "polymarket_topics": DEFAULT_POLYMARKET_TOPICS,
+}
+
 
 def _sources_path() -> Path:
     base = Path(__file__).resolve().parent.parent.parent
     return base / "data" / "sources.json"
 
 
-def _ensure_dir() -> None:
-    _sources_path().parent.mkdir(parents=True, exist_ok=True)
+def _empty() -> Dict[str, Any]:
+    return {
+        "telegram_channels": [],
+        "twitter_accounts": [],
+        "rss_feeds": [],
+        "polymarket_topics": [],
+    }
+
+
+# In-memory copy of sources.json. Reloaded only when the file's (mtime, size)
+# changes on disk; mutations are applied here and written back in batches.
+_lock = threading.RLock()
+_cache: Optional[Dict[str, Any]] = None
+_cache_signature: Optional[Tuple[int, int]] = None
+_dirty = False
+_flush_timer: Optional[threading.Timer] = None
+_version = 0
+
+
+def _bump() -> None:
+    global _version
+    with _lock:
+        _version += 1
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def _load() -> Dict[str, Any]:
-    _ensure_dir()
+    global _cache, _cache_signature
+    with _lock:
+        path = _sources_path()
+        signature = _signature(path)
+        if _cache is not None and (_dirty or signature == _cache_signature):
+            return _cache
+
+        if signature is None:
+            _cache = _empty()
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _cache = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load sources.json: {e}")
+                _cache = _empty()
+        _cache_signature = signature
+        _bump()
+        return _cache
+
+
+def _write(data: Dict[str, Any]) -> None:
+    """Atomically replace sources.json: temp file, fsync, rename (keeping the file's mode)"""
+    global _cache_signature
     path = _sources_path()
-    if not path.exists():
-        return {
-            "telegram_channels": [],
-            "twitter_accounts": [],
-            "rss_feeds": [],
-            "polymarket_topics": [],
-        }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".sources.", suffix=".tmp")
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        logger.warning(f"Could not load sources.json: {e}")
-        return {
-            "telegram_channels": [],
-            "twitter_accounts": [],
-            "rss_feeds": [],
-            "polymarket_topics": [],
-        }
+        # mkstemp creates the file 0600
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _cache_signature = _signature(path)
 
 
 def _save(data: Dict[str, Any]) -> None:
-    _ensure_dir()
-    with open(_sources_path(), "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    """Mark the cache dirty; bursts of mutations are coalesced into one write"""
+    global _dirty, _flush_timer
+    with _lock:
+        _dirty = True
+        delay = settings.SOURCES_WRITE_DELAY_SECONDS
+        if delay <= 0:
+            flush()
+            return
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(delay, flush)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def flush() -> None:
+    """Write pending changes to disk now (called on shutdown)"""
+    global _dirty, _flush_timer
+    with _lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _dirty or _cache is None:
+            return
+        try:
+            _write(_cache)
+            _dirty = False
+        except Exception as e:
+            logger.error(f"Could not save sources.json: {e}")
+
+
+atexit.register(flush)
+
+
+# Unique key per kind (None = no uniqueness) and the error raised on a clash
+UNIQUE_KEYS = {
+    "telegram_channels": ("username", "Channel already exists"),
+    "twitter_accounts": ("username", "Account already exists"),
+    "rss_feeds": ("url", "RSS feed already exists"),
+    "polymarket_topics": (None, None),
+}
+
+
+def unique_key(kind: str, item: Dict[str, Any]) -> Optional[str]:
+    """Value that must be unique within a kind (Twitter usernames are case-insensitive)"""
+    field = UNIQUE_KEYS[kind][0]
+    if field is None:
+        return None
+    value = item.get(field) or ""
+    return value.lower() if kind == "twitter_accounts" else value
+
+
+class JSONSourcesBackend:
+    """Sources kept in data/sources.json (cached, written atomically)"""
+
+    @contextmanager
+    def batch(self):
+        """Apply several mutations under one lock and persist them with a single write"""
+        with _lock:
+            try:
+                yield
+            finally:
+                flush()
+
+    def refresh(self) -> None:
+        _load()
+
+    def list(self, kind: str) -> List[Dict[str, Any]]:
+        return _load().get(kind, [])
+
+    def insert(self, kind: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        with _lock:
+            data = _load()
+            key = unique_key(kind, item)
+            if key is not None:
+                for existing in data.get(kind, []):
+                    if unique_key(kind, existing) == key:
+                        raise ValueError(UNIQUE_KEYS[kind][1])
+            data.setdefault(kind, []).append(item)
+            _save(data)
+            _bump()
+        return item
+
+    def insert_many(self, kind: str, items: List[Dict[str, Any]]) -> None:
+        with _lock:
+            data = _load()
+            data.setdefault(kind, []).extend(items)
+            _save(data)
+            _bump()
+
+    def delete(self, kind: str, id: str) -> None:
+        with _lock:
+            data = _load()
+            data[kind] = [x for x in data.get(kind, []) if x.get("id") != id]
+            _save(data)
+            _bump()
+
+    def toggle(self, kind: str, id: str) -> Optional[Dict[str, Any]]:
+        with _lock:
+            data = _load()
+            for x in data.get(kind, []):
+                if x.get("id") == id:
+                    x["enabled"] = not x.get("enabled", True)
+                    _save(data)
+                    _bump()
+                    return x
+        return None
+
+
+_backend = None
+
+
+def _get_backend():
+    """JSON file by default; SOURCES_BACKEND=sqlite for large source lists"""
+    global _backend
+    if _backend is None:
+        if settings.SOURCES_BACKEND == "sqlite":
+            from app.services.sources_sqlite import SQLiteSourcesBackend
+            _backend = SQLiteSourcesBackend()
+        else:
+            _backend = JSONSourcesBackend()
+    return _backend
+
+
+def ensure_seeded() -> None:
+    """Add the default channels/accounts/feeds/topics to any empty kind (run at startup)"""
+    seeds = {
+        "telegram_channels": lambda x: new_telegram_channel(x["url"]),
+        "twitter_accounts": lambda x: new_twitter_account(
+            x["username"], x["display_name"], x.get("account_type", "person"), x.get("user_id")
+        ),
+        "rss_feeds": lambda x: new_rss_feed(x["name"], x["url"], x["category"]),
+        "polymarket_topics": lambda x: new_polymarket_topic(x["name"], x["keywords"], x["category"]),
+    }
+    with batch():
+        for kind, seed in seeds.items():
+            if not _get_backend().list(kind):
+                _get_backend().insert_many(kind, [seed(x) for x in DEFAULTS[kind]])
+
+
+def version() -> int:
+    """Counter bumped by every change, including edits to sources.json on disk"""
+    _get_backend().refresh()
+    return _version
+
+
+class SourceSnapshot:
+    """
+    Immutable, enabled-only view of one kind of source for the scrapers
+
+    Rebuilt only when the store version changes. `build` turns the enabled
+    items into whatever the scraper precomputes from them (e.g. a keyword
+    matcher), so that work is also skipped while nothing changes.
+    """
+
+    def __init__(self, kind: str, build: Optional[Callable[[Tuple[Mapping[str, Any], ...]], Any]] = None):
+        self.kind = kind
+        self.build = build
+        self.version: Optional[int] = None
+        self._value: Any = None
+
+    def get(self) -> Any:
+        current = version()
+        if current != self.version:
+            items = tuple(
+                MappingProxyType(dict(x)) for x in _get_backend().list(self.kind) if x.get("enabled", True)
+            )
+            self._value = self.build(items) if self.build else items
+            self.version = current
+            logger.debug(f"Rebuilt {self.kind} snapshot at version {current}: {len(items)} enabled")
+        return self._value
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _new_id(prefix: str) -> str:
+    """Timestamp-ordered id with a random suffix, unique even within the same second"""
+    return f"{prefix}_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+
+
+def batch():
+    """
+    Group mutations into one transaction / one write, e.g. in bulk scripts:
+
+        with sources_store.batch():
+            for name, url in feeds:
+                sources_store.add_rss_feed(name, url)
+    """
+    return _get_backend().batch()
+
+
+# ----- Serialized writes -----
+# Endpoints submit mutations to a single writer task instead of calling the
+# functions below directly. The writer drains whatever is queued, applies it
+# in one batch off the event loop and persists once per batch, so concurrent
+# requests never lose each other's changes.
+_WRITER_BATCH_SIZE = 256
+_write_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+
+
+async def apply(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a sources_store mutation through the writer task and await its result
+
+    Exceptions raised by the mutation (e.g. ValueError for duplicates) are
+    re-raised here.
+    """
+    global _write_queue, _writer_task
+    if _writer_task is None or _writer_task.done():
+        if _writer_task is not None and not _writer_task.cancelled() and _writer_task.exception():
+            logger.error(f"Sources writer died: {_writer_task.exception()}; restarting it")
+        previous, _write_queue = _write_queue, asyncio.Queue()
+        # Mutations still queued for a dead writer would otherwise never complete
+        while previous is not None and not previous.empty():
+            _write_queue.put_nowait(previous.get_nowait())
+        _writer_task = asyncio.create_task(_writer_loop(_write_queue))
+    future = asyncio.get_running_loop().create_future()
+    await _write_queue.put((fn, args, kwargs, future))
+    return await future
+
+
+async def stop_writer() -> None:
+    """Apply anything still queued and stop the writer task (called on shutdown)"""
+    global _writer_task
+    if _writer_task is None:
+        return
+    await _write_queue.join()
+    _writer_task.cancel()
+    try:
+        await _writer_task
+    except asyncio.CancelledError:
+        pass
+    _writer_task = None
+
+
+def _apply_batch(ops: List[tuple]) -> List[tuple]:
+    results = []
+    with batch():
+        for fn, args, kwargs, _ in ops:
+            try:
+                results.append((fn(*args, **kwargs), None))
+            except Exception as e:
+                results.append((None, e))
+    return results
+
+
+async def _writer_loop(queue: asyncio.Queue) -> None:
+    while True:
+        ops = [await queue.get()]
+        while len(ops) < _WRITER_BATCH_SIZE and not queue.empty():
+            ops.append(queue.get_nowait())
+        try:
+            results = await asyncio.to_thread(_apply_batch, ops)
+        except asyncio.CancelledError:
+            # The batch may or may not have been applied; its callers must not wait forever
+            for _, _, _, future in ops:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Sources write batch failed: {e}")
+            results = [(None, e)] * len(ops)
+        for (_, _, _, future), (result, error) in zip(ops, results):
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            queue.task_done()
 
 
 # ----- Telegram -----
 def get_telegram_channels() -> List[Dict[str, Any]]:
-    data = _load()
-    channels = data.get("telegram_channels", [])
-    if not channels:
-        for i, ch in enumerate(DEFAULT_TELEGRAM_CHANNELS):
-            channels.append({
-                "id": f"tg_{int(datetime.utcnow().timestamp())}_{i}",
-                "url": ch["url"],
-                "username": ch["username"],
-                "added_at": datetime.utcnow().isoformat() + "Z",
-                "enabled": True,
-            })
-        data["telegram_channels"] = channels
-        _save(data)
-    return channels
+    return _get_backend().list("telegram_channels")
 
 
-def add_telegram_channel(url: str) -> Dict[str, Any]:
-    data = _load()
+def new_telegram_channel(url: str, enabled: bool = True) -> Dict[str, Any]:
     match = re.search(r"t\.me/([a-zA-Z0-9_]+)", url)
     username = match.group(1) if match else url.strip().strip("/").split("/")[-1]
     if not username:
         raise ValueError("Invalid Telegram URL")
-    for ch in data.get("telegram_channels", []):
-        if ch.get("username") == username:
-            raise ValueError("Channel already exists")
-    channel = {
-        "id": f"tg_{int(datetime.utcnow().timestamp())}",
+    return {
+        "id": _new_id("tg"),
         "url": url if url.startswith("http") else f"https://t.me/{username}",
         "username": username,
-        "added_at": datetime.utcnow().isoformat() + "Z",
-        "enabled": True,
+        "added_at": _now(),
+        "enabled": enabled,
     }
-    data.setdefault("telegram_channels", []).append(channel)
-    _save(data)
-    return channel
+
+
+def add_telegram_channel(url: str) -> Dict[str, Any]:
+    return _get_backend().insert("telegram_channels", new_telegram_channel(url))
 
 
 def delete_telegram_channel(id: str) -> None:
-    data = _load()
-    data["telegram_channels"] = [c for c in data.get("telegram_channels", []) if c.get("id") != id]
-    _save(data)
+    _get_backend().delete("telegram_channels", id)
 
 
 def toggle_telegram_channel_enabled(id: str) -> Optional[Dict[str, Any]]:
-    data = _load()
-    for c in data.get("telegram_channels", []):
-        if c.get("id") == id:
-            c["enabled"] = not c.get("enabled", True)
-            _save(data)
-            return c
-    return None
+    return _get_backend().toggle("telegram_channels", id)
 
 
 # ----- Twitter -----
 def get_twitter_accounts() -> List[Dict[str, Any]]:
-    data = _load()
-    accounts = data.get("twitter_accounts", [])
-    if not accounts:
-        # Seed defaults so scraping works out of the box
-        for i, acc in enumerate(DEFAULT_TWITTER_ACCOUNTS):
-            accounts.append({
-                "id": f"tw_{int(datetime.utcnow().timestamp())}_{i}",
-                "username": acc["username"],
-                "display_name": acc["display_name"],
-                "account_type": acc.get("account_type", "person"),
-                "user_id": acc.get("user_id"),
-                "added_at": datetime.utcnow().isoformat() + "Z",
-                "enabled": True,
-            })
-        data["twitter_accounts"] = accounts
-        _save(data)
-    return accounts
+    return _get_backend().list("twitter_accounts")
 
 
-def add_twitter_account(
+def new_twitter_account(
     username: str,
     display_name: Optional[str] = None,
     account_type: str = "person",
     user_id: Optional[str] = None,
     enabled: bool = True,
 ) -> Dict[str, Any]:
-    data = _load()
     username = username.lstrip("@").strip()
-    for a in data.get("twitter_accounts", []):
-        if a.get("username", "").lower() == username.lower():
-            raise ValueError("Account already exists")
-    account = {
-        "id": f"tw_{int(datetime.utcnow().timestamp())}",
+    return {
+        "id": _new_id("tw"),
         "username": username,
         "display_name": display_name or username,
         "account_type": account_type,
         "user_id": user_id,
-        "added_at": datetime.utcnow().isoformat() + "Z",
+        "added_at": _now(),
         "enabled": enabled,
     }
-    data.setdefault("twitter_accounts", []).append(account)
-    _save(data)
-    return account
+
+
+def add_twitter_account(
+    username: str,
+    display_name: Optional[str] = None,
+    account_type: str = "person",
+    user_id: Optional[str] = None,
+    enabled: bool = True,
+) -> Dict[str, Any]:
+    account = new_twitter_account(username, display_name, account_type, user_id, enabled)
+    return _get_backend().insert("twitter_accounts", account)
 
 
 def delete_twitter_account(id: str) -> None:
-    data = _load()
-    data["twitter_accounts"] = [a for a in data.get("twitter_accounts", []) if a.get("id") != id]
-    _save(data)
+    _get_backend().delete("twitter_accounts", id)
 
 
 def toggle_twitter_account_enabled(id: str) -> Optional[Dict[str, Any]]:
-    data = _load()
-    for a in data.get("twitter_accounts", []):
-        if a.get("id") == id:
-            a["enabled"] = not a.get("enabled", True)
-            _save(data)
-            return a
-    return None
+    return _get_backend().toggle("twitter_accounts", id)
 
 
 # ----- RSS -----
 def get_rss_feeds() -> List[Dict[str, Any]]:
-    data = _load()
-    feeds = data.get("rss_feeds", [])
-    if not feeds:
-        for i, feed in enumerate(DEFAULT_RSS_FEEDS):
-            feeds.append({
-                "id": f"rss_{int(datetime.utcnow().timestamp())}_{i}",
-                "name": feed["name"],
-                "url": feed["url"],
-                "category": feed["category"],
-                "added_at": datetime.utcnow().isoformat() + "Z",
-                "enabled": True,
-            })
-        data["rss_feeds"] = feeds
-        _save(data)
-    return feeds
+    return _get_backend().list("rss_feeds")
 
 
-def add_rss_feed(name: str, url: str, category: str = "general", enabled: bool = True) -> Dict[str, Any]:
-    data = _load()
-    url = url.strip()
-    for f in data.get("rss_feeds", []):
-        if f.get("url") == url:
-            raise ValueError("RSS feed already exists")
-    feed = {
-        "id": f"rss_{int(datetime.utcnow().timestamp())}",
+def new_rss_feed(name: str, url: str, category: str = "general", enabled: bool = True) -> Dict[str, Any]:
+    return {
+        "id": _new_id("rss"),
         "name": name,
-        "url": url,
+        "url": url.strip(),
         "category": category,
-        "added_at": datetime.utcnow().isoformat() + "Z",
+        "added_at": _now(),
         "enabled": enabled,
     }
-    data.setdefault("rss_feeds", []).append(feed)
-    _save(data)
-    return feed
+
+
+def add_rss_feed(name: str, url: str, category: str = "general", enabled: bool = True) -> Dict[str, Any]:
+    return _get_backend().insert("rss_feeds", new_rss_feed(name, url, category, enabled))
 
 
 def delete_rss_feed(id: str) -> None:
-    data = _load()
-    data["rss_feeds"] = [f for f in data.get("rss_feeds", []) if f.get("id") != id]
-    _save(data)
+    _get_backend().delete("rss_feeds", id)
 
 
 def toggle_rss_feed_enabled(id: str) -> Optional[Dict[str, Any]]:
-    data = _load()
-    for f in data.get("rss_feeds", []):
-        if f.get("id") == id:
-            f["enabled"] = not f.get("enabled", True)
-            _save(data)
-            return f
-    return None
+    return _get_backend().toggle("rss_feeds", id)
 
 
 # ----- Polymarket -----
 def get_polymarket_topics() -> List[Dict[str, Any]]:
-    data = _load()
-    topics = data.get("polymarket_topics", [])
-    if not topics:
-        for i, topic in enumerate(DEFAULT_POLYMARKET_TOPICS):
-            topics.append({
-                "id": f"pm_{int(datetime.utcnow().timestamp())}_{i}",
-                "name": topic["name"],
-                "keywords": topic["keywords"],
-                "category": topic["category"],
-                "added_at": datetime.utcnow().isoformat() + "Z",
-                "enabled": True,
-            })
-        data["polymarket_topics"] = topics
-        _save(data)
-    return topics
+    return _get_backend().list("polymarket_topics")
 
 
-def add_polymarket_topic(
+def new_polymarket_topic(
     name: str,
     keywords: List[str],
     category: str = "other",
     enabled: bool = True,
 ) -> Dict[str, Any]:
-    data = _load()
-    topic = {
-        "id": f"pm_{int(datetime.utcnow().timestamp())}",
+    return {
+        "id": _new_id("pm"),
         "name": name,
         "keywords": list(keywords),
         "category": category,
-        "added_at": datetime.utcnow().isoformat() + "Z",
+        "added_at": _now(),
         "enabled": enabled,
     }
-    data.setdefault("polymarket_topics", []).append(topic)
-    _save(data)
-    return topic
+
+
+def add_polymarket_topic(
+    name: str,
+    keywords: List[str],
+    category: str = "other",
+    enabled: bool = True,
+) -> Dict[str, Any]:
+    return _get_backend().insert("polymarket_topics", new_polymarket_topic(name, keywords, category, enabled))
 
 
 def delete_polymarket_topic(id: str) -> None:
-    data = _load()
-    data["polymarket_topics"] = [t for t in data.get("polymarket_topics", []) if t.get("id") != id]
-    _save(data)
+    _get_backend().delete("polymarket_topics", id)
 
 
 def toggle_polymarket_topic_enabled(id: str) -> Optional[Dict[str, Any]]:
-    data = _load()
-    for t in data.get("polymarket_topics", []):
-        if t.get("id") == id:
-            t["enabled"] = not t.get("enabled", True)
-            _save(data)
-            return t
-    return None
+    return _get_backend().toggle("polymarket_topics", id)
+
+
+# ----- Bulk -----
+def list_sources(kind: str) -> List[Dict[str, Any]]:
+    """All sources of a kind (e.g. "rss_feeds"), without seeding defaults"""
+    return _get_backend().list(kind)
+
+
+def dedupe_key(kind: str, item: Dict[str, Any]) -> str:
+    """Key used to drop duplicates on bulk import (topics dedupe by name)"""
+    key = unique_key(kind, item)
+    return key if key is not None else (item.get("name") or "").strip().lower()
+
+
+def import_sources(kind: str, items: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Add many new sources of one kind with a single write
+
+    Duplicates, against the store or earlier items in the same call, are
+    dropped with one hash-set lookup each.
+
+    Returns:
+        Per item, True if added or False if it was a duplicate
+    """
+    with batch():
+        seen = {dedupe_key(kind, x) for x in _get_backend().list(kind)}
+        added: List[Dict[str, Any]] = []
+        results: List[bool] = []
+        for item in items:
+            key = dedupe_key(kind, item)
+            is_new = key not in seen
+            if is_new:
+                seen.add(key)
+                added.append(item)
+            results.append(is_new)
+        if added:
+            _get_backend().insert_many(kind, added)
+    return results
@@ -13,14 +13,27 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import asyncio
 import logging
 from typing import AsyncGenerator
 
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.core.http_client import http_clients
+from app.core.outbound import outbound
+from app.core.retention import process_rss_bytes
 from app.api.v1.router import api_router
 from app.services.ai_curator.engine import AICuratorEngine
 from app.services import sources_store
+from app.services.scraping.feed_parser import shutdown_parser_pool
+from app.services.scraping.jobs import scrape_jobs
+from app.services.scraping.scheduler import ingestion_scheduler
+from app.services.scraping.backfill import backfill_manager
+from app.services.corpus import corpus_exporter
+from app.services.scraping.orchestrator import posts_retention
+from app.services.post_store import post_store
+from app.services.search_index import search_index
 
 # Setup logging
 setup_logging()
@@ -46,15 +59,36 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug Mode: {settings.DEBUG}")
     
+    # Shared outbound HTTP connection pools
+    await http_clients.start()
+    
     # Seed sources store if empty (creates backend/data/sources.json with defaults)
     try:
-        sources_store.get_telegram_channels()
-        sources_store.get_twitter_accounts()
-        sources_store.get_rss_feeds()
-        sources_store.get_polymarket_topics()
+        sources_store.ensure_seeded()
         logger.info("✅ Sources store ready (channels, accounts, feeds, topics)")
     except Exception as e:
         logger.warning("Sources store seed skipped: %s", e)
+    
+    # Search index over recent posts, loaded from the post store in the background
+    if settings.SEARCH_INDEX_ENABLED:
+        since = datetime.utcnow() - timedelta(days=settings.SEARCH_INDEX_DAYS)
+        app.state.search_loader = asyncio.create_task(
+            asyncio.to_thread(search_index.load, post_store.iter_since(since))
+        )
+    
+    # Continuous ingestion (per-source adaptive polling)
+    if settings.INGEST_ENABLED:
+        await ingestion_scheduler.start()
+        logger.info("✅ Ingestion scheduler started")
+    
+    # Pick up backfills interrupted by the last shutdown from their checkpoints
+    if settings.BACKFILL_RESUME_ON_STARTUP:
+        try:
+            resumed = backfill_manager.resume_interrupted()
+            if resumed:
+                logger.info(f"✅ Resumed {len(resumed)} interrupted backfill(s)")
+        except Exception as e:
+            logger.warning(f"Backfill resume skipped: {e}")
 
     # Initialize AI Curator Engine
     global ai_curator_engine
@@ -75,6 +109,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         await ai_curator_engine.stop()
         logger.info("✅ AI Curator Engine stopped")
     
+    await ingestion_scheduler.stop()
+    await scrape_jobs.shutdown()
+    await backfill_manager.shutdown()
+    await corpus_exporter.shutdown()
+    
+    await http_clients.aclose()
+    logger.info("✅ HTTP client pools closed")
+    
+    shutdown_parser_pool()
+    
+    await sources_store.stop_writer()
+    sources_store.flush()
+    
     logger.info("✅ Backend shutdown complete")
 
 
@@ -114,6 +161,13 @@ async def health_check():
         "version": settings.API_VERSION,
         "ai_curator_enabled": settings.AI_CURATOR_ENABLED,
         "ai_curator_status": "running" if ai_curator_engine and ai_curator_engine.is_running else "stopped",
+        "http_pools": http_clients.stats(),
+        "outbound": outbound.stats(),
+        "memory": {
+            "rss_bytes": process_rss_bytes(),
+            "posts": posts_retention.stats(),
+            "signals": ai_curator_engine.watchtower.signals.stats() if ai_curator_engine else None,
+        },
     }
 
 
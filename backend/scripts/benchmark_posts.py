@@ -0,0 +1,107 @@
+"""
+Benchmark: scraped posts as Pydantic models vs compact records
+Builds N posts the way the scrapers do, keeps them for the run and
+serializes them as /scraping/scrape does, reporting throughput and peak RSS.
+Each representation runs in its own process so peak RSS is comparable.
+
+Usage (from backend/):
+    python scripts/benchmark_posts.py [--posts 50000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.schemas.scraping import ScrapedPost, SourceType  # noqa: E402
+from app.services.records import PostRecord  # noqa: E402
+
+FEEDS = [f"Feed {i}" for i in range(200)]
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _build(impl: str, count: int) -> list:
+    cls = ScrapedPost if impl == "model" else PostRecord
+    now = datetime.now(timezone.utc)
+    posts = []
+    for i in range(count):
+        # Fresh strings per post, as they come out of a parsed feed
+        name = "".join(FEEDS[i % len(FEEDS)])
+        posts.append(cls(
+            id=f"rss_{name}_{i}",
+            source=SourceType.RSS,
+            source_id=name,
+            source_name=name,
+            title=f"Headline number {i}",
+            text=f"Story {i} " + "lorem ipsum dolor sit amet " * 8,
+            date_iso=now - timedelta(seconds=i),
+            url=f"https://example.com/{i}",
+            metadata={"category": "general", "author": None},
+        ))
+    return posts
+
+
+def _serialize(impl: str, posts: list) -> int:
+    if impl == "model":
+        # Dumped models returned from the endpoint, encoded again by FastAPI
+        return len(json.dumps(jsonable_encoder({"posts": [p.model_dump(mode="json") for p in posts]})))
+    # JSON-ready dicts sent as a JSONResponse (no second encoding pass)
+    return len(json.dumps({"posts": [p.to_dict() for p in posts]}))
+
+
+def run(impl: str, count: int) -> dict:
+    baseline_kb = _rss_kb()
+    started = time.perf_counter()
+    posts = _build(impl, count)
+    built = time.perf_counter()
+    retained_kb = _rss_kb() - baseline_kb
+    size = _serialize(impl, posts)
+    done = time.perf_counter()
+    return {
+        "impl": impl,
+        "posts": count,
+        "build_posts_per_s": round(count / (built - started)),
+        "serialize_posts_per_s": round(count / (done - built)),
+        "total_s": round(done - started, 3),
+        "retained_mb": round(retained_kb / 1024, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "json_bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--impl", choices=["model", "record"])
+    args = parser.parse_args()
+
+    if args.impl:
+        print(json.dumps(run(args.impl, args.posts)))
+        return
+
+    for impl in ("model", "record"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--impl", impl, "--posts", str(args.posts)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        print(" ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Shared test setup
+Points every on-disk store at a temporary directory before the app is
+imported, and turns off the background services.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+TELEGRAM_PAGES = Path(__file__).resolve().parent / "fixtures" / "telegram"
+
+_STATE_DIR = Path(tempfile.mkdtemp(prefix="backend-tests-"))
+
+os.environ.update({
+    "SCRAPE_STATE_PATH": str(_STATE_DIR / "scrape_state.db"),
+    "POST_STORE_PATH": str(_STATE_DIR / "posts.db"),
+    "POLYMARKET_MIRROR_PATH": str(_STATE_DIR / "polymarket.db"),
+    "SOURCES_DB_PATH": str(_STATE_DIR / "sources.db"),
+    "CORPUS_PATH": str(_STATE_DIR / "corpus"),
+    "AI_CURATOR_ENABLED": "False",
+    "INGEST_ENABLED": "False",
+    "CORPUS_EXPORT_ENABLED": "False",
+    "SEARCH_INDEX_ENABLED": "False",
+    "BACKFILL_RESUME_ON_STARTUP": "False",
+})
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def run_async():
+    """Run a coroutine on a fresh event loop, closing the pooled HTTP clients after it"""
+    from app.core.http_client import http_clients
+
+    def _run(coro):
+        async def _main():
+            try:
+                return await coro
+            finally:
+                await http_clients.aclose()
+        return asyncio.run(_main())
+
+    return _run
+
+
+@pytest.fixture
+def cursor_store(tmp_path, monkeypatch):
+    """An empty cursor store in place of the global one"""
+    from app.services import cursor_store as module
+    store = module.CursorStore(tmp_path / "scrape_state.db")
+    monkeypatch.setattr(module, "cursor_store", store)
+    return store
+
+
+class _PreviewHandler(SimpleHTTPRequestHandler):
+    """/<channel>?before=<id> -> <channel>_before_<id>.html, /<channel> -> <channel>.html"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        before = parse_qs(url.query).get("before")
+        name = url.path.strip("/") + (f"_before_{before[0]}" if before else "") + ".html"
+        page = TELEGRAM_PAGES / name
+        self.server.requests.append(url.path + (f"?before={before[0]}" if before else ""))
+        if not page.is_file():
+            self.send_error(404)
+            return
+        body = page.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def preview_server(monkeypatch):
+    """Serves the Telegram web preview fixtures; TELEGRAM_PREVIEW_BASE_URL points at it"""
+    from app.core.config import settings
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PreviewHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "TELEGRAM_PREVIEW_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+    server.server_close()
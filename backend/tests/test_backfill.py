@@ -0,0 +1,139 @@
+"""
+Backfill tests
+A backfill is run several times over the same range with a one-page cap per
+unit; every run has to pick up where the previous one's checkpoint left off.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.schemas.scraping import SourceType, BackfillRequest
+from app.services.scraping import backfill, telegram_scraper, twitter_scraper
+from app.services.scraping.backfill import BackfillManager
+from app.services.scraping.orchestrator import scraping_orchestrator
+
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+END = datetime(2025, 3, 2, tzinfo=timezone.utc)
+CHANNEL = {"id": "tg_test", "username": "testchannel", "url": "https://t.me/testchannel", "enabled": True}
+ACCOUNT = {"user_id": "42", "username": "testaccount", "display_name": "Test Account", "account_type": "news"}
+
+# Search pages of the fake Twitter API keyed by the continuation token that requests them
+TWEET_PAGES = {
+    None: ([(1, "23:00", "Central bank holds rates steady"), (2, "22:00", "Oil futures slide after inventory report")], "p2"),
+    "p2": ([(3, "21:00", "Election polls tighten in swing states")], "p3"),
+    "p3": ([(4, "20:00", "Chipmaker beats quarterly earnings estimates")], None),
+}
+
+
+class _Response:
+    def __init__(self, data):
+        self.status_code = 200
+        self.text = ""
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def state(cursor_store, monkeypatch):
+    for module in (backfill, telegram_scraper, twitter_scraper):
+        monkeypatch.setattr(module, "cursor_store", cursor_store)
+    return cursor_store
+
+
+async def _backfill(source: SourceType):
+    """One run of the backfill, as a fresh process would do it"""
+    job = BackfillManager().submit(BackfillRequest(sources=[source], start=START, end=END))
+    await job.task
+    return job
+
+
+def test_telegram_channel_resumes_from_checkpointed_page(state, preview_server, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "BACKFILL_TELEGRAM_MAX_PAGES_PER_CHANNEL", 1)
+    monkeypatch.setattr(scraping_orchestrator.telegram_scraper, "base_url", settings.TELEGRAM_PREVIEW_BASE_URL)
+    monkeypatch.setattr(scraping_orchestrator.telegram_scraper, "get_channels", lambda: [CHANNEL])
+
+    first = run_async(_backfill(SourceType.TELEGRAM))
+    assert first.status == "incomplete"
+    assert first.error == "1 units stopped at their page cap; resume to continue"
+    assert state.get(first.checkpoint_source, "telegram:testchannel") == {"done": False, "posts": 19, "before": 41}
+
+    second = run_async(_backfill(SourceType.TELEGRAM))
+    assert second.id == first.id
+    assert second.status == "incomplete"
+    assert state.get(first.checkpoint_source, "telegram:testchannel") == {"done": False, "posts": 39, "before": 21}
+
+    third = run_async(_backfill(SourceType.TELEGRAM))
+    assert third.status == "completed"
+    assert third.error is None
+    assert third.progress["telegram"].model_dump() == {"units": 1, "done": 1, "failed": 0, "posts": 59}
+
+    # Every page was fetched exactly once
+    assert preview_server.requests == ["/testchannel", "/testchannel?before=41", "/testchannel?before=21"]
+
+
+@pytest.fixture
+def twitter_api(monkeypatch):
+    """Serves TWEET_PAGES; returns the (endpoint, continuation token) of every request"""
+    monkeypatch.setattr(scraping_orchestrator.twitter_scraper, "api_key", "test-key")
+    monkeypatch.setattr(scraping_orchestrator.twitter_scraper, "get_accounts", lambda: [ACCOUNT])
+    requested = []
+
+    async def _request(method, url, **kwargs):
+        token = kwargs["params"].get("continuation_token")
+        requested.append((url.rsplit("/", 1)[-1], token))
+        tweets, next_token = TWEET_PAGES[token]
+        results = [
+            {
+                "tweet_id": str(tweet_id),
+                "text": text,
+                "creation_date": f"Sat Mar 01 {time}:00 +0000 2025",
+                "user": {"username": ACCOUNT["username"], "name": ACCOUNT["display_name"]},
+            }
+            for tweet_id, time, text in tweets
+        ]
+        return _Response({"results": results, "continuation_token": next_token})
+
+    monkeypatch.setattr(outbound, "request", _request)
+    return requested
+
+
+def test_twitter_slice_resumes_from_continuation_token(state, twitter_api, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "BACKFILL_TWITTER_MAX_PAGES_PER_SLICE", 1)
+    key = "twitter:testaccount:2025-03-01"
+
+    first = run_async(_backfill(SourceType.TWITTER))
+    assert first.status == "incomplete"
+    assert state.get(first.checkpoint_source, key) == {"done": False, "posts": 2, "token": "p2"}
+
+    second = run_async(_backfill(SourceType.TWITTER))
+    assert second.status == "incomplete"
+    assert state.get(first.checkpoint_source, key) == {"done": False, "posts": 3, "token": "p3"}
+
+    third = run_async(_backfill(SourceType.TWITTER))
+    assert third.status == "completed"
+    assert third.progress["twitter"].model_dump() == {"units": 1, "done": 1, "failed": 0, "posts": 4}
+    assert twitter_api == [("search", None), ("continuation", "p2"), ("continuation", "p3")]
+
+
+def test_exhausted_request_budget_leaves_the_slice_pending(state, twitter_api, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "BACKFILL_TWITTER_REQUEST_BUDGET", 0)
+    key = "twitter:testaccount:2025-03-01"
+
+    stopped = run_async(_backfill(SourceType.TWITTER))
+    assert stopped.status == "incomplete"
+    assert stopped.error == "Twitter request budget (0) exhausted; resume to continue"
+    assert stopped.progress["twitter"].model_dump() == {"units": 1, "done": 0, "failed": 0, "posts": 0}
+    assert state.get(stopped.checkpoint_source, key) == {}
+    assert twitter_api == []
+
+    monkeypatch.setattr(settings, "BACKFILL_TWITTER_REQUEST_BUDGET", 10)
+    resumed = run_async(_backfill(SourceType.TWITTER))
+    assert resumed.id == stopped.id
+    assert resumed.status == "completed"
+    assert resumed.error is None
+    assert resumed.progress["twitter"].model_dump() == {"units": 1, "done": 1, "failed": 0, "posts": 4}
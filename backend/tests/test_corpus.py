@@ -0,0 +1,155 @@
+"""
+Corpus export tests
+Posts go through a post store and an exporter under the test's temporary
+directory; the clock compaction uses is driven by the test.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services import corpus
+from app.services.corpus import MANIFEST_NAME, CorpusExporter, CorpusReader, _arrow
+from app.services.post_store import PostStore
+from app.services.records import PostRecord
+
+GRACE = 100
+# Past days only are compacted
+DATE = (datetime.now(timezone.utc) - timedelta(days=2)).replace(hour=12, minute=0, second=0, microsecond=0)
+
+
+def _post(post_id: str, text: str, **metadata) -> PostRecord:
+    return PostRecord(
+        id=post_id,
+        source=SourceType.RSS,
+        source_id="Wire",
+        source_name="Wire",
+        text=text,
+        date_iso=DATE,
+        url=f"https://example.com/{post_id}",
+        metadata=metadata,
+    )
+
+
+class _Clock:
+    """Ahead of the post store's clock, so every upsert is already settled for the exporter"""
+
+    def __init__(self):
+        self.now = time.time() + 60
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path, cursor_store, monkeypatch):
+    instance = PostStore(tmp_path / "posts.db")
+    monkeypatch.setattr(corpus, "post_store", instance)
+    monkeypatch.setattr(corpus, "cursor_store", cursor_store)
+    monkeypatch.setattr(settings, "CORPUS_COMPACTION_GRACE_SECONDS", GRACE)
+    return instance
+
+
+@pytest.fixture
+def exporter(tmp_path, store):
+    return CorpusExporter(root=tmp_path / "corpus")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    instance = _Clock()
+    monkeypatch.setattr(corpus.time, "time", instance)
+    return instance
+
+
+def _upsert(store, *posts):
+    store.upsert_many(posts)
+    # A later change never shares a changed_ts millisecond with an earlier export
+    time.sleep(0.01)
+
+
+def _texts(exporter):
+    table = CorpusReader(exporter.root).scan(columns=["id", "text"])
+    return dict(zip(table.column("id").to_pylist(), table.column("text").to_pylist()))
+
+
+def _day_dir(exporter):
+    return exporter.root / "source=rss" / f"day={DATE.strftime('%Y-%m-%d')}"
+
+
+def test_export_appends_only_changed_posts(store, exporter, cursor_store):
+    _upsert(store, _post("rss_a", "Rates held"), _post("rss_b", "Oil slides"))
+    assert exporter.export(settle_ms=0)["rows"] == 2
+    watermark = cursor_store.get("corpus", "export")
+    assert watermark["id"] == "rss_b"
+
+    # Seen again with the same content: nothing to export, the watermark stays
+    _upsert(store, _post("rss_a", "Rates held"))
+    assert exporter.export(settle_ms=0)["rows"] == 0
+    assert cursor_store.get("corpus", "export") == watermark
+
+    _upsert(store, _post("rss_a", "Rates held steady"), _post("rss_c", "Chips beat"))
+    assert exporter.export(settle_ms=0)["rows"] == 2
+    assert _texts(exporter) == {"rss_a": "Rates held steady", "rss_b": "Oil slides", "rss_c": "Chips beat"}
+
+
+def test_watermark_from_before_changed_ts_is_honoured(store, exporter, cursor_store):
+    _upsert(store, _post("rss_a", "Rates held"))
+    cursor_store.set("corpus", "export", {"last_seen_ts": int(time.time() * 1000), "id": "~"})
+
+    assert exporter.export(settle_ms=0)["rows"] == 0
+
+    _upsert(store, _post("rss_b", "Oil slides"))
+    assert exporter.export(settle_ms=0)["rows"] == 1
+
+
+def test_compaction_keeps_replaced_parts_for_the_grace_period(store, exporter, clock):
+    _upsert(store, _post("rss_a", "Rates held"))
+    exporter.export(settle_ms=0)
+    _upsert(store, _post("rss_b", "Oil slides"), _post("rss_a", "Rates held steady"))
+    assert exporter.export(settle_ms=0)["compacted_partitions"] == 1
+
+    day_dir = _day_dir(exporter)
+    parts = sorted(p.name for p in day_dir.glob("part-*.parquet"))
+    (compacted,) = [p.name for p in day_dir.glob("compacted-*.parquet")]
+    assert corpus._read_manifest(day_dir) == {compacted: {"replaces": parts, "at": clock.now}}
+    # Readers skip the replaced parts, which stay on disk for scans already under way
+    assert [p.name for p in corpus._live_files(day_dir)] == [compacted]
+    assert _arrow().parquet.read_table(day_dir / compacted).num_rows == 2
+
+    clock.now += GRACE
+    exporter.export(settle_ms=0)
+    assert list(day_dir.glob("part-*.parquet")) == []
+    assert compacted in corpus._read_manifest(day_dir)
+
+    clock.now += GRACE
+    exporter.export(settle_ms=0)
+    assert not (day_dir / MANIFEST_NAME).exists()
+    assert _texts(exporter) == {"rss_a": "Rates held steady", "rss_b": "Oil slides"}
+
+
+def test_compaction_whose_file_never_appeared_keeps_its_parts(store, exporter, clock):
+    _upsert(store, _post("rss_a", "Rates held"))
+    exporter.export(settle_ms=0)
+    _upsert(store, _post("rss_b", "Oil slides"))
+    exporter.export(settle_ms=0)
+
+    # As if the process died between writing the manifest and the compacted file
+    day_dir = _day_dir(exporter)
+    (compacted,) = day_dir.glob("compacted-*.parquet")
+    compacted.unlink()
+    parts = sorted(p.name for p in day_dir.glob("part-*.parquet"))
+    assert len(parts) == 2
+
+    clock.now += GRACE
+    exporter.export(settle_ms=0)
+
+    # The orphaned entry is gone, its parts survived and were compacted again
+    manifest = corpus._read_manifest(day_dir)
+    assert compacted.name not in manifest
+    assert [entry["replaces"] for entry in manifest.values()] == [parts]
+    assert sorted(p.name for p in day_dir.glob("part-*.parquet")) == parts
+    assert _texts(exporter) == {"rss_a": "Rates held", "rss_b": "Oil slides"}
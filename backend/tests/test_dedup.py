@@ -0,0 +1,56 @@
+"""
+Near-duplicate index tests
+"""
+
+from datetime import datetime, timezone
+
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services.scraping.dedup import NearDuplicateIndex
+
+DATE = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+QUESTION = "Will the Federal Reserve cut interest rates at the June meeting?"
+
+
+def _post(source: SourceType, post_id: str, text: str, **metadata) -> PostRecord:
+    return PostRecord(
+        id=post_id,
+        source=source,
+        source_id=f"{source.value}-feed",
+        source_name=source.value.title(),
+        text=text,
+        date_iso=DATE,
+        url=f"https://example.com/{post_id}",
+        metadata=metadata,
+    )
+
+
+def test_near_duplicates_fold_into_the_first_post():
+    index = NearDuplicateIndex()
+    first = _post(SourceType.RSS, "rss_1", "Oil prices slide after a surprise build in US crude inventories")
+
+    assert index.add(first) == (True, first)
+    assert index.add(_post(SourceType.TWITTER, "twitter_1", first.text + " this week")) == (False, first)
+    # The same member seen again by a later scrape is not counted twice
+    index.add(_post(SourceType.TWITTER, "twitter_1", first.text + " this week"))
+    assert index.add(_post(SourceType.RSS, "rss_2", "Chipmaker beats quarterly earnings estimates"))[0] is True
+
+    assert first.metadata["duplicate_count"] == 1
+    assert [s["id"] for s in first.metadata["sources"]] == ["rss_1", "twitter_1"]
+    assert len(index) == 2
+
+
+def test_polymarket_market_is_one_cluster_per_topic_across_polls():
+    index = NearDuplicateIndex()
+    rates = _post(SourceType.POLYMARKET, "polymarket_rates_501", QUESTION, market_id="501", volume=10)
+    economy = _post(SourceType.POLYMARKET, "polymarket_economy_501", QUESTION, market_id="501")
+
+    assert index.add(rates)[0] is True
+    assert index.add(economy)[0] is True
+
+    # Re-polled: folds into its own cluster with the fresh fields instead of starting another
+    repolled = _post(SourceType.POLYMARKET, "polymarket_rates_501", QUESTION, market_id="501", volume=25)
+    assert index.add(repolled) == (False, rates)
+    assert rates.metadata["volume"] == 25
+    assert "duplicate_count" not in rates.metadata
+    assert len(index) == 2
@@ -0,0 +1,25 @@
+"""
+Outbound HTTP client registry tests
+"""
+
+from app.core.http_client import HTTPClientRegistry, POLYMARKET_GAMMA_HOST
+
+
+def test_only_configured_hosts_get_their_own_pool(run_async):
+    registry = HTTPClientRegistry()
+
+    async def _clients():
+        try:
+            gamma = registry.get(f"https://{POLYMARKET_GAMMA_HOST}/markets")
+            telegram = registry.get("https://t.me/s/somechannel")
+            others = {registry.get(f"https://proof-{i}.example.com/post") for i in range(50)}
+            return gamma, telegram, others, sorted(registry.stats())
+        finally:
+            await registry.aclose()
+
+    gamma, telegram, others, hosts = run_async(_clients())
+
+    assert gamma is not telegram
+    assert len(others) == 1
+    assert others.isdisjoint({gamma, telegram})
+    assert hosts == sorted(["*", POLYMARKET_GAMMA_HOST, "t.me"])
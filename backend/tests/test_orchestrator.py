@@ -0,0 +1,158 @@
+"""
+Scraping orchestrator tests
+Runs stream_all over fake scrapers that yield fixed batches, so only the
+merging, progress and dedup logic is exercised.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services.scraping import orchestrator as orchestrator_module
+from app.services.scraping.orchestrator import ScrapeRun, ScrapingOrchestrator
+
+DATE = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+STORY = "Central bank holds interest rates steady as inflation cools across the euro area"
+
+
+def _post(source: SourceType, post_id: str, text: str) -> PostRecord:
+    return PostRecord(
+        id=f"{source.value}_{post_id}",
+        source=source,
+        source_id=f"{source.value}-feed",
+        source_name=source.value.title(),
+        title=None,
+        text=text,
+        date_iso=DATE,
+        url=f"https://example.com/{source.value}/{post_id}",
+        metadata={},
+    )
+
+
+class _FakeScraper:
+    """Yields the given batches, then raises error if one is given"""
+
+    def __init__(self, *batches, error=None, on_stream=None):
+        self.batches = batches
+        self.error = error
+        self.on_stream = on_stream
+
+    async def stream(self, days_back, max_items, incremental):
+        if self.on_stream is not None:
+            self.on_stream()
+        for batch in self.batches:
+            yield list(batch)
+        if self.error:
+            raise RuntimeError(self.error)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    instance = ScrapingOrchestrator()
+    monkeypatch.setattr(instance, "scrapers", {})
+    return instance
+
+
+async def _events(orchestrator, sources, run=None):
+    return [event async for event in orchestrator.stream_all(sources, run=run or ScrapeRun())]
+
+
+def test_done_reports_failure_only_when_every_source_failed(orchestrator, run_async):
+    orchestrator.scrapers[SourceType.RSS] = _FakeScraper(error="feed down")
+    orchestrator.scrapers[SourceType.TELEGRAM] = _FakeScraper(error="preview down")
+
+    done = run_async(_events(orchestrator, [SourceType.RSS, SourceType.TELEGRAM]))[-1]
+    assert done["type"] == "done"
+    assert done["success"] is False
+    assert sorted(e["source"] for e in done["errors"]) == ["rss", "telegram"]
+
+    orchestrator.scrapers[SourceType.TELEGRAM] = _FakeScraper([_post(SourceType.TELEGRAM, "1", "Rates held steady")])
+    done = run_async(_events(orchestrator, [SourceType.RSS, SourceType.TELEGRAM]))[-1]
+    assert done["success"] is True
+    assert done["total"] == 1
+    assert [e["source"] for e in done["errors"]] == ["rss"]
+
+
+def test_progress_reports_current_source(orchestrator, run_async):
+    run = ScrapeRun()
+    seen = []
+    orchestrator.scrapers[SourceType.RSS] = _FakeScraper(on_stream=lambda: seen.append(run.progress.current_source))
+
+    run_async(_events(orchestrator, [SourceType.RSS], run))
+
+    assert seen == ["rss"]
+    assert run.progress.current_source is None
+    assert run.progress.status == "completed"
+
+
+class _PostStore:
+    def __init__(self):
+        self.batches = []
+
+    def upsert_many(self, posts):
+        self.batches.append(posts)
+        return len(posts)
+
+
+@pytest.fixture
+def persisted(monkeypatch):
+    store = _PostStore()
+    monkeypatch.setattr(orchestrator_module, "post_store", store)
+    return store
+
+
+def _posts_events(events):
+    return [(e["source"], [p.id for p in e["posts"]]) for e in events if e["type"] == "posts"]
+
+
+def test_carried_representative_keeps_its_own_source(orchestrator, persisted, run_async):
+    orchestrator.dedup_index = orchestrator.new_dedup_index()
+    orchestrator.scrapers[SourceType.RSS] = _FakeScraper([_post(SourceType.RSS, "1", STORY)])
+    run_async(_events(orchestrator, [SourceType.RSS]))
+
+    # Not requested: the RSS representative is only reported as updated
+    orchestrator.scrapers[SourceType.TWITTER] = _FakeScraper([_post(SourceType.TWITTER, "1", STORY + " today")])
+    run = ScrapeRun()
+    events = run_async(_events(orchestrator, [SourceType.TWITTER], run))
+    assert _posts_events(events) == []
+    assert [[p.id for p in e["posts"]] for e in events if e["type"] == "duplicates"] == [["rss_1"]]
+    assert events[-1]["stats"] == {"twitter": 0}
+    assert events[-1]["duplicates"] == 1
+    assert list(run.posts) == []
+
+    # Requested: it is carried into the run under RSS
+    orchestrator.scrapers[SourceType.TWITTER] = _FakeScraper([_post(SourceType.TWITTER, "2", "Breaking: " + STORY)])
+    events = run_async(_events(orchestrator, [SourceType.TWITTER, SourceType.RSS]))
+    assert ("rss", ["rss_1"]) in _posts_events(events)
+    assert ("twitter", ["rss_1"]) not in _posts_events(events)
+    assert events[-1]["stats"] == {"twitter": 0, "rss": 1}
+    assert events[-1]["duplicates"] == 2
+
+
+def test_persist_hands_snapshots_to_the_worker_threads(orchestrator, persisted, run_async):
+    representative = _post(SourceType.RSS, "1", STORY)
+    representative.metadata["sources"] = [{"source": "rss", "source_id": "rss-feed", "id": "rss_1"}]
+
+    run_async(orchestrator.persist([representative]))
+
+    (stored,), = persisted.batches
+    assert stored is not representative
+    assert stored.metadata == representative.metadata
+    assert stored.metadata["sources"] is not representative.metadata["sources"]
+
+
+def test_representative_is_re_measured_when_a_later_run_extends_it(orchestrator, persisted, run_async):
+    orchestrator.dedup_index = orchestrator.new_dedup_index()
+    orchestrator.scrapers[SourceType.RSS] = _FakeScraper([_post(SourceType.RSS, "1", STORY)])
+    first = ScrapeRun()
+    run_async(_events(orchestrator, [SourceType.RSS], first))
+    before = first.posts.bytes
+
+    orchestrator.scrapers[SourceType.TWITTER] = _FakeScraper([_post(SourceType.TWITTER, "1", STORY + " today")])
+    run_async(_events(orchestrator, [SourceType.TWITTER]))
+
+    (representative,) = first.posts
+    assert representative.metadata["duplicate_count"] == 1
+    assert first.posts.bytes == representative.approx_bytes() > before
@@ -0,0 +1,90 @@
+"""
+Polymarket scraper tests
+The Gamma catalog is served by a fake outbound.request into a mirror under
+the test's temporary directory.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.services.polymarket_mirror import PolymarketMirror
+from app.services.scraping import polymarket_scraper
+from app.services.scraping.polymarket_scraper import PolymarketScraper
+
+PAGE_SIZE = 2
+CATALOG_SIZE = 5
+
+
+def _market(n: int) -> dict:
+    updated = datetime(2025, 3, 1, tzinfo=timezone.utc) - timedelta(minutes=n)
+    return {
+        "id": str(100 + CATALOG_SIZE - n),
+        "slug": f"bitcoin-market-{n}",
+        "question": f"Will bitcoin close above {n}0k?",
+        "description": "Resolves on the daily close",
+        "active": True,
+        "closed": False,
+        "volume": 1000 - n,
+        "endDate": "2025-12-31T00:00:00Z",
+        "updatedAt": updated.isoformat().replace("+00:00", "Z"),
+    }
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def mirror(tmp_path, cursor_store, monkeypatch):
+    instance = PolymarketMirror(tmp_path / "polymarket.db")
+    monkeypatch.setattr(polymarket_scraper, "polymarket_mirror", instance)
+    monkeypatch.setattr(polymarket_scraper, "cursor_store", cursor_store)
+    monkeypatch.setattr(settings, "POLYMARKET_CATALOG_PAGE_SIZE", PAGE_SIZE)
+
+    async def _request(method, url, params=None, **kwargs):
+        offset = params["offset"]
+        return _Response([_market(n) for n in range(offset, min(offset + params["limit"], CATALOG_SIZE))])
+
+    monkeypatch.setattr(outbound, "request", _request)
+    return instance
+
+
+@pytest.fixture
+def scraper(mirror, monkeypatch):
+    instance = PolymarketScraper()
+    topics = instance._build_topics([{"name": "Crypto", "keywords": ["bitcoin"]}])
+    monkeypatch.setattr(instance, "get_topics", lambda: topics)
+    return instance
+
+
+def test_stopping_at_max_items_releases_the_sync_lock(scraper, mirror, run_async, monkeypatch):
+    # Holding on to the refresh generator stands in for a garbage collection that has not run yet
+    generators = []
+    refresh = mirror.refresh
+
+    def _refresh():
+        generators.append(refresh())
+        return generators[-1]
+
+    monkeypatch.setattr(mirror, "refresh", _refresh)
+
+    async def _scrape():
+        posts = [post async for batch in scraper.stream(1, 1) for post in batch]
+        return posts, mirror._lock.locked(), mirror.sync_state()
+
+    posts, locked, state = run_async(_scrape())
+
+    assert len(posts) == 1
+    assert locked is False
+    # The pass was cut after its first page and resumes from there
+    assert state["pass"]["offset"] == PAGE_SIZE
+    assert run_async(mirror.sync()) == CATALOG_SIZE - PAGE_SIZE
@@ -0,0 +1,51 @@
+"""
+Bounded retention tests
+Items are lists measured by their length, so growing one in place changes its size.
+"""
+
+from app.core.retention import BoundedBuffer, RetentionPool
+
+
+def _buffer(**kwargs) -> BoundedBuffer:
+    return BoundedBuffer(size_of=len, **kwargs)
+
+
+def test_resize_re_measures_items_that_grew_in_place():
+    buffer = _buffer(max_bytes=10)
+    first, second = [1, 2], [3]
+    buffer.extend([first, second])
+    assert buffer.bytes == 3
+
+    first.extend([4, 5])
+    buffer.resize([first, [6, 7, 8]])
+    assert buffer.bytes == 5
+
+    # Past the budget: the oldest goes
+    second.extend(range(6))
+    buffer.resize([second])
+    assert list(buffer) == [second]
+    assert (buffer.bytes, buffer.evicted) == (7, 1)
+
+    # Evicted items are not counted again
+    first.append(9)
+    buffer.resize([first])
+    assert buffer.bytes == 7
+
+
+def test_pool_resize_reaches_every_buffer_holding_the_item():
+    pool = RetentionPool("test", max_bytes=8)
+    old, new = _buffer(pool=pool), _buffer(pool=pool)
+    shared = [1]
+    old.extend([[0, 0], shared])
+    new.append(shared)
+    assert pool.stats()["bytes"] == 4
+
+    shared.extend([2, 3])
+    pool.resize([shared])
+    assert (old.bytes, new.bytes) == (5, 3)
+
+    # The pool gives up the oldest buffer's oldest items first
+    shared.append(4)
+    pool.resize([shared])
+    assert list(old) == [shared]
+    assert pool.stats()["bytes"] == 8
@@ -0,0 +1,72 @@
+"""
+RSS scraper tests
+Feeds are served by a fake outbound.request and parsed in a worker thread.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.services.scraping import rss_scraper
+from app.services.scraping.rss_scraper import RSSScraper
+
+FEEDS = [
+    {"name": f"Feed {n}", "url": f"https://feeds.example.com/{n}.xml", "category": "general", "enabled": True}
+    for n in range(3)
+]
+ITEMS_PER_FEED = 3
+
+
+def _feed_xml(n: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    items = "".join(
+        f"<item><title>Feed {n} story {i}</title><link>https://example.com/{n}/{i}</link>"
+        f"<guid>feed-{n}-{i}</guid><description>Story {i} of feed {n}</description>"
+        f"<pubDate>{format_datetime(now - timedelta(hours=i))}</pubDate></item>"
+        for i in range(ITEMS_PER_FEED)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {n}</title>{items}</channel></rss>'.encode()
+
+
+class _Response:
+    def __init__(self, body: bytes):
+        self.status_code = 200
+        self.headers = {"content-type": "application/rss+xml", "etag": '"v1"'}
+        self.content = body
+
+
+@pytest.fixture
+def scraper(cursor_store, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_PARSER_WORKERS", -1)
+    monkeypatch.setattr(rss_scraper, "cursor_store", cursor_store)
+
+    async def _request(method, url, **kwargs):
+        return _Response(_feed_xml(int(url.rsplit("/", 1)[-1].split(".")[0])))
+
+    monkeypatch.setattr(outbound, "request", _request)
+    instance = RSSScraper()
+    monkeypatch.setattr(instance, "get_feeds", lambda: FEEDS)
+    return instance
+
+
+async def _collect(scraper, max_items):
+    return [batch async for batch in scraper.stream(2, max_items, incremental=True)]
+
+
+def test_max_items_caps_posts_and_keeps_cut_feeds_unread(scraper, cursor_store, run_async):
+    batches = run_async(_collect(scraper, max_items=5))
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    # Only the feed emitted in full advanced its cursor; the cut one and the one not reached are read again
+    cursors = cursor_store.get_all("rss")
+    assert len(cursors) == 1
+    (url, cursor), = cursors.items()
+    assert {post.source_id for post in batches[0]} == {next(f["name"] for f in FEEDS if f["url"] == url)}
+    assert cursor["etag"] == '"v1"'
+
+    again = run_async(_collect(scraper, max_items=100))
+    assert sum(len(batch) for batch in again) == 2 * ITEMS_PER_FEED
+    assert len(cursor_store.get_all("rss")) == len(FEEDS)
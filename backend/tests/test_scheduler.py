@@ -0,0 +1,104 @@
+"""
+Ingestion scheduler tests
+One pass over due targets against a fake orchestrator that replays fixed
+scrape events.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services.scraping import scheduler
+from app.services.scraping.scheduler import IngestionScheduler
+
+DATE = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def _post(source: SourceType, source_id: str, n: int) -> PostRecord:
+    return PostRecord(
+        id=f"{source.value}_{source_id}_{n}",
+        source=source,
+        source_id=source_id,
+        source_name=source_id,
+        text=f"Post {n} from {source_id}",
+        date_iso=DATE,
+        url=f"https://example.com/{source_id}/{n}",
+    )
+
+
+class _Orchestrator:
+    """Replays the given events and records what it was asked to scrape"""
+
+    def __init__(self, events):
+        self.events = events
+        self.calls = []
+
+    async def stream_all(self, sources, days_back, max_items, incremental, run, targets):
+        self.calls.append((sorted(s.value for s in sources), {s.value: sorted(k) for s, k in targets.items()}))
+        for event in self.events:
+            yield event
+
+
+@pytest.fixture
+def state(cursor_store, monkeypatch):
+    monkeypatch.setattr(scheduler, "cursor_store", cursor_store)
+    return cursor_store
+
+
+def _targets(instance, *keys):
+    for source, source_key in keys:
+        instance.targets[f"{source.value}:{source_key}"] = scheduler.PollTarget(
+            f"{source.value}:{source_key}", 900, 60, 21600, source=source, source_key=source_key,
+        )
+    return list(instance.targets.values())
+
+
+def test_new_posts_are_counted_against_their_own_target(state, run_async):
+    events = [
+        # The API spells the username with another case than the stored account
+        {"type": "posts", "source": "twitter", "posts": [_post(SourceType.TWITTER, "macrodesk", n) for n in range(2)]},
+        {"type": "posts", "source": "rss", "posts": [_post(SourceType.RSS, "Wire", 0)]},
+        # A representative carried from a feed that is not due this pass
+        {"type": "posts", "source": "rss", "posts": [_post(SourceType.RSS, "Desk", 0)]},
+        {"type": "source_done", "source": "twitter", "status": "completed", "error": None},
+        {"type": "source_done", "source": "rss", "status": "completed", "error": None},
+    ]
+    instance = IngestionScheduler(_Orchestrator(events))
+    targets = _targets(
+        instance,
+        (SourceType.TWITTER, "MacroDesk"),
+        (SourceType.TWITTER, "quiet"),
+        (SourceType.RSS, "Wire"),
+    )
+
+    run_async(instance._poll_sources(targets))
+
+    assert instance.orchestrator.calls == [(["rss", "twitter"], {"rss": ["Wire"], "twitter": ["MacroDesk", "quiet"]})]
+    assert {t.key: t.new_items for t in targets} == {"twitter:MacroDesk": 2, "twitter:quiet": 0, "rss:Wire": 1}
+    assert all(t.polls == 1 and not t.in_flight for t in targets)
+    # Nothing new: the quiet account is polled half as often
+    assert instance.targets["twitter:quiet"].interval == 1800
+    assert state.get("ingest", "rss:Wire")["interval"] == instance.targets["rss:Wire"].interval
+
+
+def test_failed_source_backs_off_only_targets_without_new_posts(state, run_async):
+    events = [
+        {"type": "posts", "source": "telegram", "posts": [_post(SourceType.TELEGRAM, "markets", 0)]},
+        {"type": "source_done", "source": "telegram", "status": "error", "error": "preview down"},
+    ]
+    instance = IngestionScheduler(_Orchestrator(events))
+    targets = _targets(instance, (SourceType.TELEGRAM, "markets"), (SourceType.TELEGRAM, "rates"))
+
+    run_async(instance._poll_sources(targets))
+
+    markets, rates = targets
+    assert (markets.new_items, markets.last_error) == (1, None)
+    assert (rates.new_items, rates.last_error) == (0, "preview down")
+    assert rates.interval == min(900 * 2, settings.INGEST_MAX_INTERVAL_SECONDS)
+
+
+def test_ingestion_is_off_by_default():
+    assert type(settings).model_fields["INGEST_ENABLED"].default is False
@@ -0,0 +1,79 @@
+"""
+Scraping API tests
+POST /scrape over fake scrapers on the global orchestrator.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import scraping
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services.scraping import orchestrator as orchestrator_module
+from app.services.scraping.orchestrator import scraping_orchestrator
+
+DATE = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+STORY = "Central bank holds interest rates steady as inflation cools across the euro area"
+
+
+def _post(post_id: str, text: str) -> PostRecord:
+    return PostRecord(
+        id=f"rss_{post_id}",
+        source=SourceType.RSS,
+        source_id="Wire",
+        source_name="Wire",
+        text=text,
+        date_iso=DATE,
+        url=f"https://example.com/{post_id}",
+        metadata={"feed_category": "economy"},
+    )
+
+
+class _FakeScraper:
+    def __init__(self, *batches):
+        self.batches = batches
+
+    async def stream(self, days_back, max_items, incremental):
+        for batch in self.batches:
+            yield list(batch)
+
+
+class _PostStore:
+    def upsert_many(self, posts):
+        return len(posts)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "post_store", _PostStore())
+    monkeypatch.setattr(scraping_orchestrator, "dedup_index", scraping_orchestrator.new_dedup_index())
+    monkeypatch.setattr(scraping_orchestrator, "last_run", scraping_orchestrator.last_run)
+    app = FastAPI()
+    app.include_router(scraping.router, prefix="/scraping")
+    with TestClient(app) as instance:
+        yield instance
+
+
+def test_scrape_returns_posts_with_duplicates_folded_in(client, monkeypatch):
+    monkeypatch.setattr(scraping_orchestrator, "scrapers", {
+        SourceType.RSS: _FakeScraper([_post("1", STORY)], [_post("2", STORY + " today"), _post("3", "Oil prices slide")]),
+    })
+
+    response = client.post("/scraping/scrape", json={"sources": ["rss"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"success", "total", "duplicates", "stats", "errors", "posts"}
+    assert (body["success"], body["total"], body["duplicates"], body["stats"], body["errors"]) == (
+        True, 2, 1, {"rss": 2}, None,
+    )
+    first, second = body["posts"]
+    assert set(first) == {"id", "source", "source_id", "source_name", "title", "text", "date_iso", "url", "metadata"}
+    assert (first["id"], first["source"], first["date_iso"]) == ("rss_1", "rss", "2025-03-01T12:00:00Z")
+    # The representative is reported as it stands after the later batch folded into it
+    assert first["metadata"]["duplicate_count"] == 1
+    assert [s["id"] for s in first["metadata"]["sources"]] == ["rss_1", "rss_2"]
+    assert second["id"] == "rss_3"
@@ -0,0 +1,56 @@
+"""
+Search index tests
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.schemas.scraping import SourceType
+from app.services.records import PostRecord
+from app.services.search_index import SearchIndex
+
+
+def _post(n: int, text: str, source: SourceType = SourceType.RSS) -> PostRecord:
+    return PostRecord(
+        id=f"post_{n}",
+        source=source,
+        source_id="Wire",
+        source_name="Wire",
+        text=text,
+        date_iso=datetime.now(timezone.utc) - timedelta(hours=1),
+        url=f"https://example.com/{n}",
+    )
+
+
+def _pages(index: SearchIndex, query: str, size: int, **filters):
+    ids, offset = [], 0
+    while True:
+        page, total = index.search(query, limit=size, offset=offset, **filters)
+        if not page:
+            return ids, total
+        ids.extend(post_id for post_id, _ in page)
+        offset += size
+
+
+def test_pages_of_tied_scores_neither_repeat_nor_skip_posts():
+    index = SearchIndex()
+    # Twenty equally scored posts, between one better and one worse match
+    index.add_many([_post(n, "Oil prices slide") for n in range(20)])
+    index.add_many([_post(20, "Oil prices, oil prices"), _post(21, "Oil prices slide after a long and quiet trading session")])
+
+    for size in (1, 3, 7, 20):
+        ids, total = _pages(index, "oil prices", size)
+        assert total == 22
+        assert ids == ["post_20", *(f"post_{n}" for n in range(19, -1, -1)), "post_21"]
+
+
+def test_tie_order_is_stable_across_filters_and_re_indexing():
+    index = SearchIndex()
+    index.add_many([_post(n, "Rates held steady", SourceType.RSS if n % 2 else SourceType.TELEGRAM) for n in range(10)])
+
+    ids, total = _pages(index, "rates", 3, source=SourceType.RSS)
+    assert (ids, total) == (["post_9", "post_7", "post_5", "post_3", "post_1"], 5)
+
+    # Re-indexed posts count as the newest
+    index.add_many([_post(3, "Rates held steady")])
+    ids, _ = _pages(index, "rates", 4, source=SourceType.RSS)
+    assert ids == ["post_3", "post_9", "post_7", "post_5", "post_1"]
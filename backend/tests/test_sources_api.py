@@ -0,0 +1,114 @@
+"""
+Sources API tests
+Bulk import/export and toggling through the sources router, backed by a
+JSON sources store under the test's temporary directory.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import sources
+from app.core.config import settings
+from app.services import sources_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "sources.json"
+    monkeypatch.setattr(sources_store, "_sources_path", lambda: path)
+    monkeypatch.setattr(settings, "SOURCES_BACKEND", "json")
+    monkeypatch.setattr(settings, "SOURCES_WRITE_DELAY_SECONDS", 0)
+    for name, value in (
+        ("_cache", None), ("_cache_signature", None), ("_dirty", False), ("_backend", None),
+        ("_write_queue", None), ("_writer_task", None),
+    ):
+        monkeypatch.setattr(sources_store, name, value)
+    app = FastAPI()
+    app.include_router(sources.router, prefix="/sources")
+    with TestClient(app) as instance:
+        yield instance
+
+
+def _ndjson(*records) -> str:
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records)
+
+
+def test_import_reports_added_duplicate_and_invalid_rows(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOURCES_IMPORT_BATCH_SIZE", 2)
+    body = _ndjson(
+        {"name": "Wire", "url": "https://wire.example.com/rss"},
+        {"name": "Desk", "url": "https://desk.example.com/rss", "enabled": "no"},
+        "{not json",
+        {"name": "Wire copy", "url": "https://wire.example.com/rss"},
+        {"url": "https://nameless.example.com/rss"},
+        {"name": "Markets", "url": "https://markets.example.com/rss", "category": "finance"},
+    )
+
+    result = client.post("/sources/rss/import", content=body).json()
+
+    assert (result["total"], result["added"], result["duplicate"], result["invalid"]) == (6, 3, 1, 2)
+    assert [(r["row"], r["status"]) for r in result["rows"]] == [
+        (1, "added"), (2, "added"), (3, "invalid"), (4, "duplicate"), (5, "invalid"), (6, "added"),
+    ]
+    assert result["rows_truncated"] is False
+    feeds = sources_store.get_rss_feeds()
+    assert [(f["name"], f["enabled"]) for f in feeds] == [("Wire", True), ("Desk", False), ("Markets", True)]
+    # The duplicate sat in a later batch than the row it repeats
+    assert "id" not in result["rows"][3]
+
+
+def test_import_report_is_capped_but_counts_are_not(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOURCES_IMPORT_MAX_REPORT_ROWS", 2)
+    body = _ndjson(*({"url": f"https://t.me/channel{n}"} for n in range(5)))
+
+    result = client.post("/sources/telegram/import", content=body).json()
+
+    assert result["added"] == 5
+    assert [r["row"] for r in result["rows"]] == [1, 2]
+    assert result["rows_truncated"] is True
+    assert len(sources_store.get_telegram_channels()) == 5
+
+
+def test_oversized_upload_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOURCES_IMPORT_MAX_BYTES", 64)
+    body = _ndjson(*({"url": f"https://t.me/channel{n}"} for n in range(5)))
+
+    response = client.post("/sources/telegram/import", content=body)
+
+    assert response.status_code == 413
+    assert sources_store.get_telegram_channels() == []
+
+    def chunks():
+        yield body.encode()
+
+    # Without a Content-Length the body is cut off while streaming
+    response = client.post("/sources/telegram/import", content=chunks())
+    assert response.status_code == 413
+    assert "stopped after adding 0 sources" in response.json()["detail"]
+
+
+def test_csv_export_round_trips_through_import(client, tmp_path, monkeypatch):
+    body = 'name,keywords,category\nRates,"fed;rate cut",economy\nOil,opec,commodities\n'
+    assert client.post("/sources/polymarket/import?format=csv", content=body).json()["added"] == 2
+
+    exported = client.get("/sources/polymarket/export?format=csv").text
+    assert exported.splitlines()[0].startswith("id,")
+
+    # Into an empty store, the export brings back the same topics
+    monkeypatch.setattr(sources_store, "_sources_path", lambda: tmp_path / "other.json")
+    monkeypatch.setattr(sources_store, "_cache", None)
+    result = client.post("/sources/polymarket/import?format=csv", content=exported).json()
+    assert result["added"] == 2
+    topics = sources_store.get_polymarket_topics()
+    assert [(t["name"], t["keywords"]) for t in topics] == [("Rates", ["fed", "rate cut"]), ("Oil", ["opec"])]
+
+
+def test_toggle_flips_enabled_and_404s_unknown_ids(client):
+    feed = client.post("/sources/rss", json={"name": "Wire", "url": "https://wire.example.com/rss"}).json()
+
+    assert client.patch(f"/sources/rss/{feed['id']}/toggle").json()["enabled"] is False
+    assert sources_store.get_rss_feeds()[0]["enabled"] is False
+    assert client.patch("/sources/rss/rss_missing/toggle").status_code == 404
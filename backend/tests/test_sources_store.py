@@ -0,0 +1,107 @@
+"""
+Sources store tests
+Every test runs against both backends, each kept under the test's
+temporary directory.
+"""
+
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services import sources_sqlite, sources_store
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    path = tmp_path / "sources.json"
+    monkeypatch.setattr(sources_store, "_sources_path", lambda: path)
+    monkeypatch.setattr(sources_sqlite, "_sources_path", lambda: path)
+    monkeypatch.setattr(settings, "SOURCES_BACKEND", request.param)
+    monkeypatch.setattr(settings, "SOURCES_DB_PATH", str(tmp_path / "sources.db"))
+    monkeypatch.setattr(settings, "SOURCES_WRITE_DELAY_SECONDS", 0)
+    for name, value in (("_cache", None), ("_cache_signature", None), ("_dirty", False), ("_backend", None)):
+        monkeypatch.setattr(sources_store, name, value)
+    return sources_store
+
+
+def test_add_toggle_and_delete(store):
+    feed = store.add_rss_feed("Wire", " https://wire.example.com/rss ")
+    channel = store.add_telegram_channel("https://t.me/markets")
+
+    assert [x["url"] for x in store.get_rss_feeds()] == ["https://wire.example.com/rss"]
+    assert [x["username"] for x in store.get_telegram_channels()] == ["markets"]
+
+    with pytest.raises(ValueError, match="RSS feed already exists"):
+        store.add_rss_feed("Wire again", "https://wire.example.com/rss")
+
+    before = store.version()
+    assert store.toggle_rss_feed_enabled(feed["id"])["enabled"] is False
+    assert store.version() > before
+    assert store.get_rss_feeds()[0]["enabled"] is False
+    assert store.toggle_rss_feed_enabled(feed["id"])["enabled"] is True
+    assert store.toggle_rss_feed_enabled("rss_missing") is None
+
+    store.delete_telegram_channel(channel["id"])
+    assert store.get_telegram_channels() == []
+    assert len(store.get_rss_feeds()) == 1
+
+
+def test_twitter_usernames_are_unique_case_insensitively(store):
+    store.add_twitter_account("@Macro_Desk")
+
+    with pytest.raises(ValueError, match="Account already exists"):
+        store.add_twitter_account("macro_desk")
+    assert [x["username"] for x in store.get_twitter_accounts()] == ["Macro_Desk"]
+
+
+def test_import_drops_duplicates_within_and_across_calls(store):
+    store.add_polymarket_topic("Elections", ["election"])
+    items = [
+        store.new_polymarket_topic("Rates", ["fed", "rate cut"]),
+        store.new_polymarket_topic(" elections ", ["vote"]),
+        store.new_polymarket_topic("rates", ["ecb"]),
+        store.new_polymarket_topic("Oil", ["opec"]),
+    ]
+
+    assert store.import_sources("polymarket_topics", items) == [True, False, False, True]
+    assert [x["name"] for x in store.list_sources("polymarket_topics")] == ["Elections", "Rates", "Oil"]
+
+
+def test_snapshot_holds_enabled_sources_until_the_store_changes(store):
+    feed = store.add_rss_feed("Wire", "https://wire.example.com/rss")
+    store.add_rss_feed("Desk", "https://desk.example.com/rss")
+    builds = []
+    snapshot = store.SourceSnapshot("rss_feeds", lambda items: builds.append(items) or [x["name"] for x in items])
+
+    assert snapshot.get() == ["Wire", "Desk"]
+    assert snapshot.get() == ["Wire", "Desk"]
+    assert len(builds) == 1
+
+    store.toggle_rss_feed_enabled(feed["id"])
+    assert snapshot.get() == ["Desk"]
+    assert len(builds) == 2
+
+
+def test_changes_reach_the_backing_file(store, tmp_path):
+    store.add_rss_feed("Wire", "https://wire.example.com/rss")
+
+    if settings.SOURCES_BACKEND == "json":
+        data = json.loads((tmp_path / "sources.json").read_text())
+        assert [x["name"] for x in data["rss_feeds"]] == ["Wire"]
+    else:
+        fresh = sources_sqlite.SQLiteSourcesBackend(tmp_path / "sources.db")
+        assert [x["name"] for x in fresh.list("rss_feeds")] == ["Wire"]
+
+
+def test_sqlite_backend_imports_an_existing_json_file(tmp_path, monkeypatch):
+    path = tmp_path / "sources.json"
+    monkeypatch.setattr(sources_sqlite, "_sources_path", lambda: path)
+    feed = sources_store.new_rss_feed("Wire", "https://wire.example.com/rss")
+    path.write_text(json.dumps({"rss_feeds": [feed, dict(feed, name="Copy")], "twitter_accounts": []}))
+
+    backend = sources_sqlite.SQLiteSourcesBackend(tmp_path / "sources.db")
+
+    # The second entry repeats the first one's URL and is skipped
+    assert backend.list("rss_feeds") == [feed]
+    assert backend.import_json(path) == {kind: 0 for kind in sources_store.UNIQUE_KEYS}
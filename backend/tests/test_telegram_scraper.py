@@ -0,0 +1,100 @@
+"""
+Telegram scraper tests
+Run against the fixture web preview pages served by the preview_server
+fixture.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.scraping import telegram_scraper
+from app.services.scraping.telegram_scraper import TelegramScraper, parse_channel_page
+
+PAGES = Path(__file__).resolve().parent / "fixtures" / "telegram"
+CHANNEL = {"id": "tg_test", "username": "testchannel", "url": "https://t.me/testchannel", "enabled": True}
+DAYS_BACK = (datetime.now(timezone.utc) - datetime(2025, 3, 1, tzinfo=timezone.utc)).days + 1
+
+
+@pytest.fixture
+def scraper(preview_server, cursor_store, monkeypatch):
+    monkeypatch.setattr(telegram_scraper, "cursor_store", cursor_store)
+    instance = TelegramScraper()
+    monkeypatch.setattr(instance, "get_channels", lambda: [CHANNEL])
+    return instance
+
+
+def _message_ids(batches):
+    return [post.metadata["message_id"] for batch in batches for post in batch]
+
+
+async def _collect(scraper, max_items=500, incremental=True):
+    return [batch async for batch in scraper.stream(DAYS_BACK, max_items, incremental)]
+
+
+def test_parse_channel_page():
+    page = parse_channel_page((PAGES / "testchannel.html").read_text(encoding="utf-8"))
+
+    assert page["title"] == "Test Channel"
+    assert [m["id"] for m in page["messages"]] == list(range(41, 61))
+    first = page["messages"][0]
+    assert first["text"] == "Market update #41\nBTC moved 41% on the day"
+    assert first["date_iso"] == "2025-03-01T10:40:00+00:00"
+    assert first["url"] == "https://t.me/testchannel/41"
+    # Media-only message: parsed, but without text
+    assert page["messages"][4]["text"] == ""
+
+
+def test_first_scrape_pages_back_within_page_cap(scraper, preview_server, cursor_store, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_MAX_PAGES_PER_CHANNEL", 2)
+
+    ids = _message_ids(run_async(_collect(scraper)))
+
+    assert ids == [i for i in range(60, 20, -1) if i != 45]
+    assert preview_server.requests == ["/testchannel", "/testchannel?before=41"]
+    # Nothing was seen before this scrape, so there is no gap to fill
+    assert cursor_store.get("telegram", "testchannel") == {"last_message_id": 60, "gaps": []}
+
+
+def test_capped_paging_leaves_gap_that_later_runs_fill(scraper, preview_server, cursor_store, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_MAX_PAGES_PER_CHANNEL", 2)
+    cursor_store.set("telegram", "testchannel", {"last_message_id": 10})
+
+    first = _message_ids(run_async(_collect(scraper)))
+    assert first == [i for i in range(60, 20, -1) if i != 45]
+    assert cursor_store.get("telegram", "testchannel") == {
+        "last_message_id": 60,
+        "gaps": [{"before": 21, "floor": 10}],
+    }
+
+    preview_server.requests.clear()
+    second = _message_ids(run_async(_collect(scraper)))
+    assert second == list(range(20, 10, -1))
+    assert preview_server.requests == ["/testchannel", "/testchannel?before=21"]
+    assert cursor_store.get("telegram", "testchannel") == {"last_message_id": 60, "gaps": []}
+
+    # Every message above the old cursor was emitted exactly once
+    assert sorted(first + second) == [i for i in range(11, 61) if i != 45]
+    assert _message_ids(run_async(_collect(scraper))) == []
+
+
+def test_item_cap_keeps_unreached_messages_as_gap(scraper, cursor_store, run_async):
+    cursor_store.set("telegram", "testchannel", {"last_message_id": 30})
+
+    ids = _message_ids(run_async(_collect(scraper, max_items=10)))
+
+    assert ids == list(range(60, 50, -1))
+    assert cursor_store.get("telegram", "testchannel") == {
+        "last_message_id": 60,
+        "gaps": [{"before": 51, "floor": 30}],
+    }
+
+
+def test_unreachable_page_keeps_cursor(scraper, cursor_store, run_async, monkeypatch):
+    monkeypatch.setattr(scraper, "get_channels", lambda: [{**CHANNEL, "username": "missingchannel"}])
+    cursor_store.set("telegram", "missingchannel", {"last_message_id": 5})
+
+    assert run_async(_collect(scraper)) == []
+    assert cursor_store.get("telegram", "missingchannel") == {"last_message_id": 5}
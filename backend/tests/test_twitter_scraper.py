@@ -0,0 +1,94 @@
+"""
+Twitter scraper tests
+Timelines are served by a fake outbound.request that pages like RapidAPI's
+/user/medias endpoints.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.outbound import outbound
+from app.services.scraping import twitter_scraper
+from app.services.scraping.twitter_scraper import TwitterScraper
+
+# Tweets per account, newest first (ids are unique across accounts)
+TIMELINES = {"1": 5, "2": 5, "3": 2}
+ACCOUNTS = [
+    {"user_id": user_id, "username": f"account{user_id}", "display_name": f"Account {user_id}", "account_type": "news"}
+    for user_id in TIMELINES
+]
+
+
+def _tweet(user_id: str, position: int) -> dict:
+    created = datetime.now(timezone.utc) - timedelta(minutes=position + 1)
+    return {
+        "tweet_id": str(int(user_id) * 1000 - position),
+        "text": f"Account {user_id} tweet {position}",
+        "creation_date": created.strftime("%a %b %d %H:%M:%S %z %Y"),
+        "user": {"username": f"account{user_id}", "name": f"Account {user_id}"},
+    }
+
+
+class _Response:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def scraper(cursor_store, monkeypatch):
+    monkeypatch.setattr(twitter_scraper, "cursor_store", cursor_store)
+
+    async def _request(method, url, json=None, **kwargs):
+        await asyncio.sleep(0.01)
+        user_id, limit = json["user_id"], json["limit"]
+        offset = int(json.get("continuation_token", f"{user_id}:0").split(":")[1])
+        end = min(offset + limit, TIMELINES[user_id])
+        token = f"{user_id}:{end}" if end < TIMELINES[user_id] else None
+        return _Response({"results": [_tweet(user_id, i) for i in range(offset, end)], "continuation_token": token})
+
+    monkeypatch.setattr(outbound, "request", _request)
+    instance = TwitterScraper()
+    instance.api_key = "test-key"
+    monkeypatch.setattr(instance, "get_accounts", lambda: ACCOUNTS)
+    return instance
+
+
+async def _collect(scraper, max_items):
+    return [batch async for batch in scraper.stream(1, max_items, incremental=True)]
+
+
+def _usernames(batches):
+    return [batch[0].source_id for batch in batches]
+
+
+def test_accounts_are_capped_to_the_room_left(scraper, cursor_store, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "TWITTER_MAX_CONCURRENT_ACCOUNTS", 1)
+    cursor_store.set("twitter", "2", {"newest_id": "1990"})
+
+    batches = run_async(_collect(scraper, max_items=8))
+
+    assert _usernames(batches) == ["account1", "account2"]
+    assert [len(batch) for batch in batches] == [5, 3]
+    # account2 was cut at the cap above its old cursor; the rest is a gap for the next run
+    assert cursor_store.get("twitter", "2")["gaps"] == [{"token": "2:3", "floor": "1990"}]
+    assert cursor_store.get("twitter", "3") == {}
+
+
+def test_overflowing_account_does_not_stop_later_ones(scraper, cursor_store, run_async, monkeypatch):
+    monkeypatch.setattr(settings, "TWITTER_MAX_CONCURRENT_ACCOUNTS", 3)
+
+    batches = run_async(_collect(scraper, max_items=8))
+
+    # All three were fetched at once; account2 would overflow and is left for the next run
+    assert _usernames(batches) == ["account1", "account3"]
+    assert cursor_store.get("twitter", "2") == {}
+    assert cursor_store.get("twitter", "3")["newest_id"] == "3000"